@@ -1,5 +1,6 @@
 import os, hashlib, time
 from alerts.alert_state import get_state, fire, rearm
+import vega_paths  # noqa: F401  (src/ first on sys.path)
 from utils.data import get_price, get_breakout_close, get_vix, news_since
 from utils.mail import send_email
 from utils.rules import load_rules, check_rearm_condition
@@ -1,45 +1,31 @@
 # auto_hedging_engine.py — SPY/QQQ/IWM risk scoring + SPXU/SQQQ/RWM triggers
 import os
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 import streamlit as st
 
-POLY_KEY = os.getenv("POLYGON_API_KEY") or os.getenv("POLYGON_KEY")
+import vega_paths  # noqa: F401  (src/ first on sys.path)
+from data.polygon_aggs import get_aggs, get_resampled
+import indicator_kernels as ik
 
-def _poly_url(ticker, mult, span, start, end):
-    return (
-        f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{mult}/{span}/"
-        f"{start.date()}/{end.date()}?adjusted=true&sort=asc&limit=50000&apiKey={POLY_KEY}"
-    )
+POLY_KEY = os.getenv("POLYGON_API_KEY") or os.getenv("POLYGON_KEY")
 
-@st.cache_data(show_spinner=False, ttl=60)
 def fetch_polygon(ticker: str, tf: str):
-    if not POLY_KEY:
-        raise RuntimeError("Missing Polygon API key (set POLYGON_API_KEY or POLYGON_KEY in Render).")
-    ticker = ticker.upper().strip()
+    # shared Polygon aggregates cache: only bars newer than the stored series are downloaded
     now = datetime.now(timezone.utc)
     if tf == "1h":
-        mult, span = 1, "hour"; start = now - timedelta(days=60)
+        # resampled from the 15m series the tradeability meter also uses
+        df = get_resampled(ticker, 15, "minute", "1h", now - timedelta(days=60), api_key=POLY_KEY)
     else:
-        mult, span = 1, "day"; start = now - relativedelta(months=9)
-    url = _poly_url(ticker, mult, span, start, now)
-    r = requests.get(url, timeout=20); r.raise_for_status()
-    data = r.json().get("results", [])
-    if not data:
-        raise RuntimeError(f"No data for {ticker} ({tf}).")
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["t"], unit="ms", utc=True)
-    df.rename(columns={"o":"open","h":"high","l":"low","c":"close","v":"volume"}, inplace=True)
-    return df.set_index("date")[["open","high","low","close","volume"]].sort_index()
+        df = get_aggs(ticker, 1, "day", now - relativedelta(months=9), api_key=POLY_KEY)
+    if df.empty:
+        raise RuntimeError(f"No data for {ticker.upper().strip()} ({tf}).")
+    return df
 
 def atr(df, n=14):
-    h,l,c = df["high"], df["low"], df["close"]
-    pc = c.shift(1)
-    tr = pd.concat([(h-l), (h-pc).abs(), (l-pc).abs()], axis=1).max(axis=1)
-    return tr.rolling(n).mean()
+    return ik.atr(df["high"], df["low"], df["close"], n)
 
 def trend_liquidity_vol(df):
     sma20 = df["close"].rolling(20).mean()
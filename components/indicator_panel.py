@@ -8,6 +8,8 @@ import numpy as np
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 
+import indicator_kernels as ik
+
 # ---------- perf helpers ----------
 
 @st.cache_data(ttl=600, show_spinner=False)
@@ -39,27 +41,20 @@ def _prep_df(df: pd.DataFrame) -> pd.DataFrame:
 
 @st.cache_data(ttl=600, show_spinner=False)
 def _rsi14(close: pd.Series, n: int = 14) -> pd.Series:
-    delta = close.diff()
-    gain = (delta.where(delta > 0, 0.0)).rolling(n).mean()
-    loss = (-delta.where(delta < 0, 0.0)).rolling(n).mean()
-    rs = gain / loss.replace({0: np.nan})
-    rsi = 100 - (100 / (1 + rs))
-    return rsi.fillna(method="bfill")
+    return ik.rsi(close, n, smoothing="sma").bfill()
 
 @st.cache_data(ttl=600, show_spinner=False)
 def _ema(series: pd.Series, n: int) -> pd.Series:
-    return series.ewm(span=n, adjust=False, min_periods=n).mean()
+    return ik.ema(series, n, min_periods=n)
 
 @st.cache_data(ttl=600, show_spinner=False)
 def _sma(series: pd.Series, n: int) -> pd.Series:
-    return series.rolling(n).mean()
+    return ik.sma(series, n)
 
 @st.cache_data(ttl=600, show_spinner=False)
 def _macd(close: pd.Series, fast: int = 12, slow: int = 26, sig: int = 9) -> tuple[pd.Series, pd.Series]:
-    ema_fast = close.ewm(span=fast, adjust=False).mean()
-    ema_slow = close.ewm(span=slow, adjust=False).mean()
-    macd = ema_fast - ema_slow
-    signal = macd.ewm(span=sig, adjust=False).mean()
+    macd = ik.ema(close, fast) - ik.ema(close, slow)
+    signal = ik.ema(macd, sig)
     return macd, signal
 
 @st.cache_data(ttl=600, show_spinner=False)
@@ -72,16 +67,7 @@ def _bbands(close: pd.Series, n: int = 20, k: float = 2.0) -> tuple[pd.Series, p
 
 @st.cache_data(ttl=600, show_spinner=False)
 def _atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
-    prev_close = df["close"].shift(1)
-    tr = pd.concat(
-        [
-            (df["high"] - df["low"]).abs(),
-            (df["high"] - prev_close).abs(),
-            (df["low"] - prev_close).abs(),
-        ],
-        axis=1,
-    ).max(axis=1)
-    return tr.rolling(n).mean()
+    return ik.atr(df["high"], df["low"], df["close"], n)
 
 # ---------- UI + plotting ----------
 
@@ -5,6 +5,11 @@ import os, pandas as pd, numpy as np
 import plotly.graph_objects as go
 import streamlit as st
 
+try:
+    from data.bar_store import store as bar_store
+except Exception:
+    bar_store = None
+
 VST_BANDS = {"green": (1.2, 2.0), "yellow": (0.9, 1.19), "red": (0.0, 0.89)}
 
 def _ma(series: pd.Series, n: int) -> pd.Series:
@@ -18,6 +23,7 @@ def _load_series(symbol: str, metric: str):
       - growth:       {SYMBOL}_growth.csv with columns: date,growth
       - sales_growth: {SYMBOL}_sales_growth.csv with columns: date,sales_growth
     Will resample to weekly (Fri) when frequency > weekly.
+    CSVs are parsed once into the bar store (interval "vv_<metric>") and read back from there.
     """
     base = os.path.join("vault","timeseries","vv")
     # map metric to file suffix
@@ -33,9 +39,12 @@ def _load_series(symbol: str, metric: str):
     if not os.path.exists(path):
         return None
     try:
-        df = pd.read_csv(path)
-        df.columns = [c.lower() for c in df.columns]
-        if "date" not in df.columns or metric not in df.columns:
+        if bar_store is not None:
+            df = bar_store.ingest_csv(path, symbol, f"vv_{metric}")
+        else:
+            df = pd.read_csv(path)
+            df.columns = [c.lower() for c in df.columns]
+        if df is None or "date" not in df.columns or metric not in df.columns:
             return None
         df["date"] = pd.to_datetime(df["date"])
         df = df.sort_values("date").reset_index(drop=True)
@@ -9,7 +9,7 @@ This module is safe to import even without a key (it will just return "unknown"
 import os, datetime as dt, json, time
 from typing import Optional
 
-import requests
+from data.http_client import http_get
 
 POLYGON_KEY = os.getenv("POLYGON_API_KEY")
 
@@ -18,7 +18,7 @@ def _polygon_earnings_date(ticker: str) -> Optional[str]:
         return None
     url = f"https://api.polygon.io/vX/reference/financials?ticker={ticker}&limit=1&apiKey={POLYGON_KEY}"
     try:
-        r = requests.get(url, timeout=6)
+        r = http_get(url, timeout=6)
         if r.status_code != 200:
             return None
         data = r.json()
@@ -27,6 +27,11 @@ import numpy as np
 import pandas as pd
 import requests
 import yfinance as yf
+
+import vega_paths  # noqa: F401  (src/ first on sys.path)
+from data.quotes import download  # single-flight yf.download
+from data.correlation import last_session, relative_strength as served_rs  # nightly return moments
+
 try:
     import yaml
 except Exception:
@@ -245,7 +250,7 @@ def rr(entry: Optional[float], stop: Optional[float], target: Optional[float]) -
 
 def yf_price_series(ticker: str, period: str = "1y", interval: str = "1d") -> Optional[pd.DataFrame]:
     try:
-        df = yf.download(ticker, period=period, interval=interval, progress=False, auto_adjust=True)
+        df = download(ticker, period=period, interval=interval, auto_adjust=True)
         if df is not None and not df.empty:
             return df
     except Exception:
@@ -264,24 +269,40 @@ def next_earnings_days(ticker: str) -> Optional[int]:
         pass
     return None
 
+def _session_return(symbol: str, start: dt.datetime, end: dt.datetime, sessions: int, asof: pd.Timestamp) -> Optional[float]:
+    close = download([symbol], start=start, end=end, auto_adjust=True)["Close"]
+    close = (close.iloc[:, 0] if isinstance(close, pd.DataFrame) else close).dropna()
+    close = close[pd.DatetimeIndex(close.index).tz_localize(None).normalize() <= asof]
+    if len(close) <= sessions:
+        return None
+    return float(close.iloc[-1] / close.iloc[-1 - sessions] - 1.0)
+
 def relative_strength(ticker: str, benchmark: str, sector_etf: str = "", lookback_days: int = 20) -> Tuple[Optional[float], Optional[float]]:
+    """End-of-day RS: the ticker's return minus the benchmark's (and the sector ETF's) over the last
+    `lookback_days` completed sessions, so intraday it reflects the previous close.
+
+    Served from the nightly return-moments state (data.correlation) when it covers every leg
+    through the last completed session; otherwise the same window is computed from downloads.
+    """
+    rs_bmk = served_rs(ticker, benchmark, lookback_days)
+    rs_sector = served_rs(ticker, sector_etf, lookback_days) if sector_etf else None
+    if rs_bmk is not None and (rs_sector is not None or not sector_etf):
+        return (rs_bmk, rs_sector)
     try:
-        end = dt.datetime.now()
-        start = end - dt.timedelta(days=lookback_days * 2)
-        tick = yf.download([ticker], start=start, end=end, progress=False, auto_adjust=True)["Close"]
-        bmk = yf.download([benchmark], start=start, end=end, progress=False, auto_adjust=True)["Close"]
-        if tick.empty or bmk.empty:
+        asof = last_session()
+        # minute-rounded window so concurrent sessions coalesce on the same benchmark download
+        end = dt.datetime.now().replace(second=0, microsecond=0)
+        start = end - dt.timedelta(days=lookback_days * 2 + 14)  # enough calendar days for the sessions
+        tick_ret = _session_return(ticker, start, end, lookback_days, asof)
+        bmk_ret = _session_return(benchmark, start, end, lookback_days, asof)
+        if tick_ret is None or bmk_ret is None:
             return (None, None)
-        tick_ret = tick.pct_change().add(1).prod() - 1
-        bmk_ret = bmk.pct_change().add(1).prod() - 1
-        rs_bmk = tick_ret - bmk_ret
         rs_sector = None
         if sector_etf:
-            sec = yf.download([sector_etf], start=start, end=end, progress=False, auto_adjust=True)["Close"]
-            if not sec.empty:
-                sec_ret = sec.pct_change().add(1).prod() - 1
+            sec_ret = _session_return(sector_etf, start, end, lookback_days, asof)
+            if sec_ret is not None:
                 rs_sector = tick_ret - sec_ret
-        return (rs_bmk, rs_sector)
+        return (tick_ret - bmk_ret, rs_sector)
     except Exception:
         return (None, None)
 
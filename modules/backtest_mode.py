@@ -1,5 +1,88 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
+import numpy as np
+import pandas as pd
+
+# This page lives in the repo-root `modules` package, so `modules.*` is root modules/ here and the
+# engine is imported through the `src` package instead. src/ is appended (not put first, as
+# vega_paths does for entry points) only so the engine's top-level `data` / `indicator_kernels`
+# imports resolve; root packages keep precedence for the rest of the app.
+_SRC = str(Path(__file__).resolve().parents[1] / "src")
+if _SRC not in sys.path:
+    sys.path.append(_SRC)
+
+try:
+    from data.panel import Panel
+    from src.modules.backtest.engine import (HistoryUniverse, load_risk_rules, regime_signals, rulepack_signals,
+                                             simulate, snapshot_decisions)
+    from src.modules.scanner.rulepacks import load_rulepacks
+    _IMPORT_ERROR = None
+except ImportError as _ex:
+    simulate, _IMPORT_ERROR = None, _ex
+
+try:
+    from modules.stay_get.engine import Triggers
+except Exception:
+    Triggers = None
+
+SOURCES = ["Rulepack screens", "Stay Out / Get Back In", "Snapshot decision rule"]
+
+def _show(name, bt):
+    st.subheader(name)
+    s = bt.stats
+    c = st.columns(5)
+    c[0].metric("Trades", s["trades"])
+    c[1].metric("Win rate", f"{s['win_rate']:.0%}" if s["closed"] else "—")
+    c[2].metric("Avg R", f"{s['avg_r']:.2f}" if s["closed"] else "—")
+    c[3].metric("Return", f"{s['return']:.1%}")
+    c[4].metric("Max DD", f"{s['max_drawdown']:.1%}")
+    st.line_chart(bt.equity["equity"])
+    with st.expander("Trades"):
+        st.dataframe(bt.trades, use_container_width=True)
 
 def render():
     st.header('Backtest Mode')
-    st.toggle('Enable Backtest Mode', value=False)
+    if not st.toggle('Enable Backtest Mode', value=False):
+        return
+    if simulate is None:
+        st.info(f"Backtest engine unavailable (src/modules/backtest not importable in this app): {_IMPORT_ERROR}")
+        return
+    rules = load_risk_rules()
+    source = st.selectbox("Signals", SOURCES)
+    c = st.columns(4)
+    years = c[0].number_input("Years", 1, 20, 10)
+    stop_atr = c[1].number_input("Stop (x ATR14)", 0.5, 6.0, 2.0, step=0.5)
+    min_rr = c[2].number_input("Min Reward:Risk", 1.0, 10.0, rules["min_rr"], step=0.5)
+    max_hold = c[3].number_input("Max hold (bars, 0 = none)", 0, 500, 0)
+    start = pd.Timestamp.now().normalize() - pd.DateOffset(years=int(years))
+    sim = dict(stop_atr=stop_atr, min_rr=min_rr, max_hold=int(max_hold) or None)
+
+    if source == SOURCES[0]:
+        region = st.text_input("Region", "US")
+        names = st.multiselect("Rulepacks", list(load_rulepacks()))
+        if st.button("Run backtest") and names:
+            with st.spinner("Replaying the bar store…"):
+                u = HistoryUniverse.load(region, start=start)
+                for key, entries in rulepack_signals(u, load_rulepacks(names=names)).items():
+                    _show(key, simulate(u.panel, entries, **sim))
+    elif source == SOURCES[1]:
+        if Triggers is None:
+            st.info("stay_get triggers unavailable.")
+            return
+        t = Triggers()
+        syms = [s.strip().upper() for s in st.text_input("Trade", "SPY,QQQ").split(",") if s.strip()]
+        st.caption(f"GET_BACK_IN: SPY ≥ {t.spy_get_in} and QQQ ≥ {t.qqq_confirm}; exit on RISK_OFF (SPY ≤ {t.spy_risk2}).")
+        if st.button("Run backtest"):
+            panel = Panel.from_store(sorted(set(syms) | {"SPY", "QQQ"}), "D", start=start)
+            entries, exits = regime_signals(panel, t, syms)
+            _show("Stay Out / Get Back In", simulate(panel, entries, exits, **sim))
+    else:
+        syms = [s.strip().upper() for s in st.text_input("Symbols", "SPY,QQQ,DIA,IWM").split(",") if s.strip()]
+        bench = st.text_input("Benchmark", "SPY").strip().upper()
+        if st.button("Run backtest"):
+            panel = Panel.from_store(sorted(set(syms) | {bench}), "D", start=start)
+            d = snapshot_decisions(panel, bench)
+            traded = np.isin(panel.symbols, syms)  # the benchmark is only an input unless listed
+            _show("🟢 Trade Today / 🔴 Avoid", simulate(panel, (d == 1) & traded, d == -1, **sim))
@@ -19,6 +19,8 @@ from __future__ import annotations
 import os, json, time, pathlib
 from typing import List, Dict, Any
 
+import vega_paths  # noqa: F401  (src/ first on sys.path)
+from data.quotes import quote_snapshot  # batched, single-flight yf.download
 from utils import (
     now_pt,
     in_us_window,
@@ -60,13 +62,18 @@ def pct(ticker: str) -> float | None:
         return None
 
 def fetch_snapshot() -> Dict[str, Any]:
+    # one batched download for all six tickers
+    try:
+        q = quote_snapshot(["SPY", "RSP", "UVXY", "SVIX", "^VIX", "JPY=X"])
+    except Exception:
+        return {k: None for k in ("SPY", "RSP", "UVXY", "SVIX", "VIX", "USDJPY")}
     return {
-        "SPY": pct("SPY"),
-        "RSP": pct("RSP"),
-        "UVXY": pct("UVXY"),
-        "SVIX": pct("SVIX"),
-        "VIX":  last_price("^VIX"),
-        "USDJPY": pct("JPY=X"),
+        "SPY": q["SPY"]["pct"],
+        "RSP": q["RSP"]["pct"],
+        "UVXY": q["UVXY"]["pct"],
+        "SVIX": q["SVIX"]["pct"],
+        "VIX":  q["^VIX"]["last"],
+        "USDJPY": q["JPY=X"]["pct"],
     }
 
 def detect_triggers(d: dict) -> List[str]:
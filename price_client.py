@@ -1,34 +1,32 @@
-# price_client.py — multi-provider quotes (polygon, yfinance) + throttling + cache
-import os, time, requests
-import streamlit as st
+# price_client.py — multi-provider quotes (polygon, yfinance) + rate limiting + cache
+import os
+
+from data.http_client import http_get
+from data.rate_limit import limiter
+from data.quote_cache import quote_cache
 
 # Which providers to use, in order of priority
 PROVIDERS   = [p.strip().lower() for p in os.getenv("PRICE_PROVIDERS", "polygon,yfinance").split(",") if p.strip()]
 POLYGON_KEY = os.getenv("POLYGON_KEY", "")
 
-# Simple per-provider throttle (seconds between calls per symbol)
-_THROTTLE_SEC = float(os.getenv("PRICE_THROTTLE_SEC", "0.6"))
-_last_call = {}  # (provider, symbol) -> timestamp
+# Per-provider token buckets (RATE_LIMIT_POLYGON / RATE_LIMIT_YFINANCE, "<calls>/<seconds>").
+# An empty bucket reroutes to the next provider; only when every provider is out of
+# tokens does get_price wait, and never longer than PRICE_QUEUE_MAX_SEC (0 = don't wait).
+_QUEUE_MAX_SEC = float(os.getenv("PRICE_QUEUE_MAX_SEC", "0"))
 
 
-def _throttle(provider: str, sym: str):
-    """Rate-limit calls per provider/symbol."""
-    k = (provider, sym.upper())
-    now = time.time()
-    if k in _last_call:
-        wait = _THROTTLE_SEC - (now - _last_call[k])
-        if wait > 0:
-            time.sleep(wait)
-    _last_call[k] = time.time()
+class RateLimited(Exception):
+    """Provider bucket is empty; get_price moves on to the next provider."""
 
 
-def _polygon(sym: str):
-    """Fetch last trade price from Polygon.io."""
+def _polygon(sym: str, queued: bool = False):
+    """Fetch last trade price from Polygon.io (queued: the token was already taken by limiter.wait)."""
     if "." in sym or not POLYGON_KEY:
         return None
-    _throttle("polygon", sym)
+    if not queued and not limiter("polygon").try_acquire():
+        raise RateLimited("polygon")
     try:
-        r = requests.get(f"https://api.polygon.io/v2/last/trade/{sym.upper()}?apiKey={POLYGON_KEY}", timeout=6)
+        r = http_get(f"https://api.polygon.io/v2/last/trade/{sym.upper()}?apiKey={POLYGON_KEY}", timeout=6)
         if r.status_code != 200:
             return None
         p = (r.json() or {}).get("results", {}).get("p")
@@ -37,9 +35,10 @@ def _polygon(sym: str):
         return None
 
 
-@st.cache_data(show_spinner=False, ttl=15)
-def _yf_cached(sym_upper: str):
-    """Cached Yahoo Finance quote (last price)."""
+def _yf_quote(sym_upper: str, queued: bool = False):
+    """Yahoo Finance quote (last price)."""
+    if not queued and not limiter("yfinance").try_acquire():
+        raise RateLimited("yfinance")
     try:
         import yfinance as yf
         t = yf.Ticker(sym_upper)
@@ -58,10 +57,9 @@ def _yf_cached(sym_upper: str):
         return None
 
 
-def _yfinance(sym: str):
+def _yfinance(sym: str, queued: bool = False):
     """Fetch last trade price from Yahoo Finance."""
-    _throttle("yfinance", sym)
-    return _yf_cached(sym.upper())
+    return _yf_quote(sym.upper(), queued)
 
 
 # Provider function map
@@ -72,14 +70,29 @@ _PROVIDER_FUN = {
 
 
 def get_price(symbol: str):
-    """Try each provider in order until a price is found."""
+    """Last price from the shared quote cache; misses go to the providers (see _get_price_live)."""
     if not symbol:
         return None
+    return quote_cache.get(symbol, _get_price_live)
+
+
+def _get_price_live(symbol: str):
+    """Try each provider in order until a price is found; rate-limited providers are skipped."""
+    limited = []
     for p in PROVIDERS:
         f = _PROVIDER_FUN.get(p)
         if not f:
             continue
-        price = f(symbol)
+        try:
+            price = f(symbol)
+        except RateLimited:
+            limited.append(p)
+            continue
         if price is not None:
             return price
+    # every provider that could answer was out of tokens: queue briefly on the soonest one
+    if limited and _QUEUE_MAX_SEC > 0:
+        p = min(limited, key=lambda n: limiter(n).wait_time())
+        if limiter(p).wait(_QUEUE_MAX_SEC):
+            return _PROVIDER_FUN[p](symbol, queued=True)
     return None
@@ -16,10 +16,19 @@ except Exception:
         def safe_load(self, *a, **k):
             return {}
     yaml = _YamlShim()  # requires pyyaml
+import vega_paths  # noqa: F401  (src/ first on sys.path)
+from data.quotes import quote_snapshot  # batched, single-flight yf.download
 from utils import now_pt, pct_from_prev_close, last_price, fmt_num
 from email_webhook import broadcast
 
 # ---------- helpers ----------
+def snapshot(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """last/prev_close/pct for all tickers from one batched download ({} on failure)."""
+    try:
+        return quote_snapshot(tickers)
+    except Exception:
+        return {}
+
 def pct(tk: str) -> float | None:
     try:
         return pct_from_prev_close(tk)
@@ -51,8 +60,9 @@ def load_watchlists(path: str = "watchlists.yml") -> Dict[str, List[str]]:
 def top_bottom(tickers: List[str], n: int = 5) -> Tuple[List[Tuple[str, float]], List[Tuple[str, float]]]:
     """Return top and bottom n by % change; skips symbols that return None."""
     vals: List[Tuple[str, float]] = []
+    q = snapshot(tickers)
     for t in tickers:
-        p = pct(t)
+        p = q.get(t, {}).get("pct")
         if p is not None:
             vals.append((t, p))
     if not vals:
@@ -85,22 +95,13 @@ def section_movers(title: str, tickers: List[str], n: int = 5) -> List[str]:
 def main():
     now = now_pt()
 
-    # Core indices & macros
-    data = {
-        "SPY%": pct("SPY"),
-        "DIA%": pct("DIA"),
-        "QQQ%": pct("QQQ"),
-        "^GSPTSE%": pct("^GSPTSE"),   # Canada TSX
-        "^MXX%": pct("^MXX"),         # Mexico IPC
-        "^SPLAC%": pct("^SPLAC"),     # S&P Latin America 40 (proxy; may be delayed)
-        "USDMXN": val("MXN=X"),
-        "USDCAD": val("CAD=X"),
-        "GOLD": val("GC=F"),
-        "SILVER": val("SI=F"),
-        "COPPER": val("HG=F"),
-        "WTI": val("CL=F"),
-        "VIX": val("^VIX"),
-    }
+    # Core indices & macros (one batched download)
+    pct_tk = ["SPY", "DIA", "QQQ", "^GSPTSE", "^MXX", "^SPLAC"]  # TSX, Mexico IPC, S&P LA40 proxy (may be delayed)
+    val_tk = {"USDMXN": "MXN=X", "USDCAD": "CAD=X", "GOLD": "GC=F", "SILVER": "SI=F",
+              "COPPER": "HG=F", "WTI": "CL=F", "VIX": "^VIX"}
+    q = snapshot(pct_tk + list(val_tk.values()))
+    data = {f"{tk}%": q.get(tk, {}).get("pct") for tk in pct_tk}
+    data.update({k: q.get(tk, {}).get("last") for k, tk in val_tk.items()})
 
     # Load regional watchlists
     wl = load_watchlists("watchlists.yml")
@@ -0,0 +1,35 @@
+# scripts/eodhd_bulk_refresh.py
+# Schedules: run once after each region's close (Render cron / Actions).
+# Pulls each exchange's last trading day in a single EODHD request and fans the rows out
+# into the per-symbol bar store, so scanner pages and /report/* only read local data.
+#
+#   python scripts/eodhd_bulk_refresh.py --region USA
+#   python scripts/eodhd_bulk_refresh.py --exchange US --exchange TO
+
+import argparse, json, os, sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from data.eodhd_adapter import bulk_refresh, bulk_refresh_symbols
+from data.regions import REGIONS
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--region", action="append", default=[], help=f"one of {list(REGIONS)} (repeatable)")
+    parser.add_argument("--exchange", action="append", default=[], help="EODHD exchange code, e.g. US, TO (repeatable)")
+    parser.add_argument("--date", default=None, help="session date YYYY-MM-DD (default: last trading day)")
+    args = parser.parse_args()
+
+    results = []
+    regions = args.region or ([] if args.exchange else list(REGIONS))
+    universe = sorted({s for region in regions for s in REGIONS[region]})
+    if universe:
+        # one request per exchange across all selected regions
+        results += bulk_refresh_symbols(universe, date=args.date)
+    for ex in args.exchange:
+        results.append(bulk_refresh(ex, date=args.date))
+    for r in results:
+        print(json.dumps(r))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import argparse, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+_SRC = str(ROOT / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+from data.liquidity import liquid_symbols
+from data.regions import load_regions, region_symbols
+from data.correlation import COV_DIR, COV_WINDOW, update_moments
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly return moments (covariance / beta / RS) per region")
+    parser.add_argument("--region", nargs="*", help="config/regions.yaml regions (default: all)")
+    parser.add_argument("--window", type=int, default=COV_WINDOW, help="trailing return window in bars")
+    args = parser.parse_args()
+    for region in args.region or list((load_regions().get("regions") or {})):
+        t0 = time.time()
+        syms = liquid_symbols(region, region_symbols(region, "D"))
+        st = update_moments(region, syms, window=args.window)
+        print(f"{region}: {len(st.symbols)} symbols through {st.dates[-1] if st.dates else '-'} ({time.time() - t0:.2f}s)")
+    print(f"Return moments written to {COV_DIR}")
+
+if __name__ == "__main__":
+    main()
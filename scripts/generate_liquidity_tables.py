@@ -0,0 +1,26 @@
+import argparse, os, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+_SRC = str(ROOT / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+from data.liquidity import build_liquidity, write_liquidity, LIQUIDITY_DIR
+from data.regions import load_regions
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly per-region liquidity prefilter tables (ADV, turnover, spread)")
+    parser.add_argument("--region", nargs="*", help="config/regions.yaml regions (default: all)")
+    args = parser.parse_args()
+    cfg = load_regions()
+    for region in args.region or list((cfg.get("regions") or {})):
+        t0 = time.time()
+        table = build_liquidity(region, settings=cfg)
+        write_liquidity(region, table)
+        n_pass = int((table["pass"] | table["pass_through"]).sum()) if len(table) else 0
+        print(f"{region}: {n_pass}/{len(table)} symbols liquid ({time.time() - t0:.2f}s)")
+    print(f"Liquidity tables written to {LIQUIDITY_DIR}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import argparse, os, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+_SRC = str(ROOT / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+from modules.scanner.rulepacks import load_fields
+from modules.scanner.scores import update_scores, SCORES_DIR
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily cross-sectional Vega scores (rt/rs/rv/ci/vst) per region")
+    parser.add_argument("--region", nargs="*", default=["US"])
+    args = parser.parse_args()
+    fields = load_fields()
+    for region in args.region:
+        t0 = time.time()
+        scores = update_scores(region, fields=fields if len(fields.columns) else None)
+        print(f"{region}: {len(scores)} symbols scored in {time.time() - t0:.2f}s")
+    print(f"Score tables written to {SCORES_DIR}")
+
+if __name__ == "__main__":
+    main()
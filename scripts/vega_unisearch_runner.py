@@ -1,7 +1,15 @@
-import argparse, os, json, time, yaml, datetime
+import argparse, os, sys, json, time, yaml, datetime
 from pathlib import Path
 
+import pandas as pd
+
 ROOT = Path(__file__).resolve().parents[1]
+_SRC = str(ROOT / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+from modules.scanner.rulepacks import load_rulepacks
+from modules.scanner.sweep import sweep, SHARD_SIZE
 
 def load_yaml(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -9,42 +17,60 @@ def load_yaml(path):
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--region", default="US")
+    parser.add_argument("--region", nargs="*", default=["US"], help="regions or groups, e.g. US CA MX EU APAC")
     parser.add_argument("--profile", default="SmartMoney_NA_Level2")
+    parser.add_argument("--rules", nargs="*", help="rule file stems (default: all)")
+    parser.add_argument("--mode", nargs="*", help="modes for multi-mode rules (default: all)")
+    parser.add_argument("--start", default=None, help="first bar date loaded into the panel")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="process pool size (1 = in-process)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="symbols per shard")
     args = parser.parse_args()
 
     regions = load_yaml(ROOT / "config" / "regions.yaml")
-    tv = load_yaml(ROOT / "config" / "tradingview_prefilters.yaml")
-    scores = load_yaml(ROOT / "modules" / "rules" / "_vega_scores.yaml")
+    rules = load_rulepacks(names=args.rules)
 
-    # Discover rules
-    rules_dir = ROOT / "modules" / "rules"
-    rule_files = [p for p in rules_dir.glob("*.yaml") if p.name != "_vega_scores.yaml"]
+    t0 = time.time()
+    runs = sweep(args.region, rules, args.mode, workers=args.workers, shard_size=args.shard_size, start=args.start)
+    wall = time.time() - t0
+
+    outdir = ROOT / "outputs"
+    (outdir / "screens").mkdir(parents=True, exist_ok=True)
+    for run in runs:
+        by_rule = {}
+        for r in run.results:
+            by_rule.setdefault(r.screen.rule, []).append(r.table.assign(mode=r.screen.mode))
+        for rule, tables in by_rule.items():
+            pd.concat(tables, ignore_index=True).to_csv(outdir / "screens" / f"{run.region}_{rule}.csv", index=False)
 
-    # Skeleton "plan" (no data pulls here)
-    plan = {
+    summary = {
         "ts": datetime.datetime.utcnow().isoformat()+"Z",
-        "region": args.region,
         "tv_profile": args.profile,
-        "region_settings": regions["regions"].get(args.region, {}),
-        "rules": [p.name for p in rule_files],
-        "notes": [
-            "This runner is a skeleton. Replace with your data client to compute signals.",
-            "Vega Smart Money A-to-Z and earnings blackout are enforced in the main app.",
-        ],
+        "workers": args.workers,
+        "timing_sec": {"wall": round(wall, 3)},
+        "regions": [{
+            "region": run.region,
+            "region_settings": regions["regions"].get(run.region, {}),
+            "universe": run.universe,
+            "shards": run.shards,
+            "timing_sec": {k: round(v, 3) for k, v in run.seconds.items() if k != "wall"},
+            "screens": [{"rule": r.screen.rule, "name": r.screen.name, "mode": r.screen.mode,
+                         "passed": r.passed, "selected": len(r.table), "missing_fields": sorted(r.missing)}
+                        for r in run.results],
+        } for run in runs],
+        "notes": ["Vega Smart Money A-to-Z and earnings blackout are enforced in the main app."],
     }
-
-    outdir = ROOT / "outputs"
-    outdir.mkdir(parents=True, exist_ok=True)
     with open(outdir / "last_run_summary.json", "w", encoding="utf-8") as f:
-        json.dump(plan, f, indent=2)
-
-    print("Planned run for region:", args.region)
-    print("Rules:", len(rule_files))
-    for p in rule_files:
-        print(" -", p.name)
-    print("TV Profile:", args.profile)
-    print("Output written to outputs/last_run_summary.json")
+        json.dump(summary, f, indent=2)
+
+    for run in runs:
+        print(f"Region {run.region}: {run.universe} symbols in {run.shards} shards, "
+              f"load {run.seconds['load']:.2f}s, screens {run.seconds['screens']:.2f}s (cpu)")
+        for r in run.results:
+            extra = f"  (missing: {', '.join(sorted(r.missing))})" if r.missing else ""
+            print(f" - {r.screen.rule}{'' if r.screen.mode == 'default' else ':' + r.screen.mode}: "
+                  f"{len(r.table)}/{r.passed}{extra}")
+    print(f"Sweep finished in {wall:.2f}s with {args.workers} worker(s)")
+    print("Output written to outputs/last_run_summary.json and outputs/screens/<REGION>_<rule>.csv")
 
 if __name__ == "__main__":
     main()
@@ -11,15 +11,37 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 # --- Domain logic imports ---
-from modules.scanner.patterns import rising_wedge, falling_wedge, bearish_setup_score
+from modules.scanner.patterns import scan_latest
 from data.regions import REGIONS
-from data.eodhd_adapter import get_eod_prices_csv
+from data.eodhd_adapter import get_eod_prices_csv, bulk_refresh_symbols
+from data.fetch_async import fetch_all
+from data.rate_limit import stats as rate_limit_stats
+from data.quote_cache import quote_cache
 
 CHATGPT_CONTROL_TOKEN = os.getenv("CHATGPT_CONTROL_TOKEN", "").strip()
 
 app = FastAPI(title="Vega API", version="1.0.0")
 
 # --------------------------------------------------------------------
+def _close_6m(sym: str) -> pd.Series:
+    df = get_eod_prices_csv(sym, period="6m")
+    col = "adjusted_close" if "adjusted_close" in df.columns else "close"
+    return df.set_index("date")[col]
+
+
+def _scan(region: str, score) -> list:
+    # fetch the region concurrently, evaluate all patterns in one batch, report in universe order
+    results = fetch_all(REGIONS.get(region, []), _close_6m, provider="eodhd")
+    table = scan_latest({sym: res.value for sym, res in results.items() if res.ok}, lookback=60, window=20)
+    rows = []
+    for sym, res in results.items():
+        if res.ok:
+            rows.append({"Symbol": sym, **score(table.loc[sym])})
+        else:
+            rows.append({"Symbol": sym, "Error": str(res.error)[:200]})
+    return rows
+
+
 def _check_auth(request: Request):
     tok = request.headers.get("X-Control-Token", "")
     if not CHATGPT_CONTROL_TOKEN or tok != CHATGPT_CONTROL_TOKEN:
@@ -32,19 +54,31 @@ def health():
     return {"ok": True}
 
 
+@app.get("/health/rate_limits")
+def health_rate_limits():
+    # How often each provider's token bucket rerouted or delayed a call in this process
+    return rate_limit_stats()
+
+
+@app.get("/health/quote_cache")
+def health_quote_cache():
+    # Shared quote cache hit/miss counters for this process
+    return quote_cache.stats()
+
+
+@app.post("/jobs/bulk_refresh")
+def jobs_bulk_refresh(request: Request, region: str = "USA"):
+    # One EODHD request per exchange; subsequent /report/* calls read the local bar store.
+    _check_auth(request)
+    if region not in REGIONS:
+        raise HTTPException(status_code=404, detail=f"unknown region {region}")
+    return JSONResponse(bulk_refresh_symbols(REGIONS[region]))
+
+
 @app.get("/report/rising_wedge")
 def report_rising(request: Request, region: str = "USA"):
     _check_auth(request)
-    syms = REGIONS.get(region, [])
-    rows = []
-    for sym in syms:
-        try:
-            df = get_eod_prices_csv(sym, period="6m")
-            col = "adjusted_close" if "adjusted_close" in df.columns else "close"
-            s = df.set_index("date")[col]
-            rows.append({"Symbol": sym, "Match": bool(rising_wedge(s, 60))})
-        except Exception as ex:
-            rows.append({"Symbol": sym, "Error": str(ex)[:200]})
+    rows = _scan(region, lambda r: {"Match": bool(r["rising_wedge"])})
     out = pd.DataFrame(rows)
     if "Match" in out.columns:
         out = out[out["Match"] == True]
@@ -54,16 +88,7 @@ def report_rising(request: Request, region: str = "USA"):
 @app.get("/report/falling_wedge")
 def report_falling(request: Request, region: str = "USA"):
     _check_auth(request)
-    syms = REGIONS.get(region, [])
-    rows = []
-    for sym in syms:
-        try:
-            df = get_eod_prices_csv(sym, period="6m")
-            col = "adjusted_close" if "adjusted_close" in df.columns else "close"
-            s = df.set_index("date")[col]
-            rows.append({"Symbol": sym, "Match": bool(falling_wedge(s, 60))})
-        except Exception as ex:
-            rows.append({"Symbol": sym, "Error": str(ex)[:200]})
+    rows = _scan(region, lambda r: {"Match": bool(r["falling_wedge"])})
     out = pd.DataFrame(rows)
     if "Match" in out.columns:
         out = out[out["Match"] == True]
@@ -73,16 +98,7 @@ def report_falling(request: Request, region: str = "USA"):
 @app.get("/report/downside_setups")
 def report_downside(request: Request, region: str = "USA"):
     _check_auth(request)
-    syms = REGIONS.get(region, [])
-    rows = []
-    for sym in syms:
-        try:
-            df = get_eod_prices_csv(sym, period="6m")
-            col = "adjusted_close" if "adjusted_close" in df.columns else "close"
-            s = df.set_index("date")[col]
-            rows.append({"Symbol": sym, "BearishScore": float(bearish_setup_score(s, 20))})
-        except Exception as ex:
-            rows.append({"Symbol": sym, "Error": str(ex)[:200]})
+    rows = _scan(region, lambda r: {"BearishScore": float(r["bearish_score"])})
     out = pd.DataFrame(rows)
     if "BearishScore" in out.columns:
         out = out.sort_values("BearishScore", ascending=False)
@@ -1,26 +1,52 @@
+import os
+import pandas as pd
 from flask import Flask, request, jsonify
-from modules.risk.risk_scoring import full_report
+from modules.risk.risk_scoring import full_report, batch_report
 from data.eodhd_adapter import get_eod_prices_csv
+from data.fetch_async import fetch_all
+from data.quote_cache import QuoteCache, QUOTE_TTL
+
+# benchmark closes are shared by every request for the same (benchmark, period)
+RISK_BENCH_TTL = float(os.getenv("RISK_BENCH_TTL", "900"))
+_bench_cache = QuoteCache(max_entries=64, ttl={c: RISK_BENCH_TTL for c in QUOTE_TTL})
 
 app = Flask(__name__)
 
+def _closes(symbol: str, period: str) -> pd.Series:
+    df = get_eod_prices_csv(symbol, period=period)
+    col = "adjusted_close" if "adjusted_close" in df.columns else "close"
+    return df.set_index("date")[col]
+
+def _benchmark(symbol: str, period: str) -> pd.Series|None:
+    if not symbol:
+        return None
+    return _bench_cache.get(symbol, lambda s: _closes(s, period), ns=f"closes:{period}")
+
 @app.get("/risk/score")
 def risk_score():
     symbol = request.args.get("symbol", "SPY")
     benchmark = request.args.get("benchmark", "SPY")
     period = request.args.get("period", "1y")
 
-    df = get_eod_prices_csv(symbol, period=period)
-    col = "adjusted_close" if "adjusted_close" in df.columns else "close"
-    prices = df.set_index("date")[col]
+    prices = _closes(symbol, period)
+    return jsonify(full_report(prices, _benchmark(benchmark, period)))
 
-    bench_prices = None
-    if benchmark:
-        bf = get_eod_prices_csv(benchmark, period=period)
-        bcol = "adjusted_close" if "adjusted_close" in bf.columns else "close"
-        bench_prices = bf.set_index("date")[bcol]
+@app.get("/risk/batch")
+def risk_batch():
+    # ?symbols=AAPL,MSFT,... scored in one pass and ranked by composite score
+    symbols = [s.strip() for s in request.args.get("symbols", "").split(",") if s.strip()]
+    benchmark = request.args.get("benchmark", "SPY")
+    period = request.args.get("period", "1y")
 
-    return jsonify(full_report(prices, bench_prices))
+    results = fetch_all(symbols, lambda s: _closes(s, period), provider="eodhd")
+    closes = {s: r.value for s, r in results.items() if r.ok}
+    errors = {s: str(r.error)[:200] for s, r in results.items() if not r.ok}
+    if not closes:
+        return jsonify({"scores": [], "errors": errors})
+    table = batch_report(pd.DataFrame(closes).sort_index().ffill(), _benchmark(benchmark, period))
+    table = table.sort_values("score", ascending=False).rename_axis("symbol").reset_index()
+    return jsonify({"scores": table.astype(object).where(table.notna(), None).to_dict(orient="records"),
+                    "errors": errors})
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8088)
@@ -0,0 +1,173 @@
+"""
+Columnar bar store for Vega Cockpit
+- One Arrow IPC (Feather v2) file per (interval, symbol) under data_cache/bars/.
+- Typed columns: date as timestamp[ns], prices float32, volume int64.
+- Range reads, appends (merge on date) and memory-mapped column access for scans.
+- CSV sources (data/ohlc, vault/timeseries) are ingested once and re-read from here.
+- One source per interval partition: "D" is EODHD daily, "yf_1d" the chart feed's yfinance
+  daily, "poly_<mult><span>" Polygon, "csv_<interval>" / "vv_<metric>" CSV seeds, and
+  "<base>@<rule>" series resampled from one of those.
+"""
+from __future__ import annotations
+import os, threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+BAR_STORE_DIR = Path(os.getenv("VEGA_BAR_STORE", Path(__file__).resolve().parents[2] / "data_cache" / "bars"))
+
+PRICE_COLS = ["open", "high", "low", "close", "adjusted_close"]
+INT_COLS = ["volume"]
+
+_locks: dict[Path, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+def _widen(a: np.ndarray) -> np.ndarray:
+    """float32 -> float64 rounded to float32's ~7 significant digits (126.42f reads back as 126.42)."""
+    x = a.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mag = np.floor(np.log10(np.abs(x)))
+    scale = np.power(10.0, 6 - np.where(np.isfinite(mag), mag, 0))
+    return np.round(x * scale) / scale
+
+def _safe(name: str) -> str:
+    return str(name).upper().replace(":", "_").replace("/", "_")
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    """Normalize a bar frame (date column or DatetimeIndex) into the typed Arrow schema."""
+    d = df
+    if "date" not in d.columns:
+        d = d.rename(columns={"time": "date"}) if "time" in d.columns else d.rename_axis("date").reset_index()
+    dates = pd.to_datetime(d["date"])
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+    arrays, fields = [pa.array(dates.to_numpy(dtype="datetime64[ns]"))], [pa.field("date", pa.timestamp("ns"))]
+    for c in d.columns:
+        if c == "date":
+            continue
+        if c in INT_COLS:
+            arrays.append(pa.array(pd.to_numeric(d[c], errors="coerce").fillna(0).to_numpy(dtype=np.int64)))
+            fields.append(pa.field(c, pa.int64()))
+        elif pd.api.types.is_numeric_dtype(d[c]) or c in PRICE_COLS:
+            arrays.append(pa.array(pd.to_numeric(d[c], errors="coerce").to_numpy(dtype=np.float32)))
+            fields.append(pa.field(c, pa.float32()))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+class BarStore:
+    def __init__(self, root: str | Path = BAR_STORE_DIR):
+        self.root = Path(root)
+
+    def path(self, symbol: str, interval: str = "D") -> Path:
+        return self.root / _safe(interval) / f"{_safe(symbol)}.arrow"
+
+    def exists(self, symbol: str, interval: str = "D") -> bool:
+        return self.path(symbol, interval).exists()
+
+    def symbols(self, interval: str = "D") -> list[str]:
+        d = self.root / _safe(interval)
+        return sorted(p.stem for p in d.glob("*.arrow")) if d.exists() else []
+
+    def _read_table(self, path: Path) -> pa.Table:
+        with pa.memory_map(str(path), "r") as src:
+            return ipc.open_file(src).read_all()
+
+    def read(self, symbol: str, interval: str = "D", start=None, end=None,
+             columns: list[str] | None = None) -> pd.DataFrame:
+        """Bars for symbol as a DataFrame with a 'date' column, optionally limited to [start, end]."""
+        p = self.path(symbol, interval)
+        if not p.exists():
+            return pd.DataFrame(columns=["date"] + (columns or []))
+        tbl = self._read_table(p)
+        if columns:
+            tbl = tbl.select(["date"] + [c for c in columns if c in tbl.column_names and c != "date"])
+        if start is not None or end is not None:
+            dates = tbl.column("date").to_numpy()
+            lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start), "ns")) if start is not None else 0
+            hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end), "ns"), side="right") if end is not None else len(dates)
+            tbl = tbl.slice(lo, max(hi - lo, 0))
+        df = tbl.to_pandas()
+        for c in df.columns:
+            if df[c].dtype == np.float32:
+                df[c] = _widen(df[c].to_numpy())
+        return df
+
+    def read_arrays(self, symbol: str, interval: str = "D") -> dict[str, np.ndarray]:
+        """Zero-copy column views over the memory-mapped file (for scans over many symbols)."""
+        p = self.path(symbol, interval)
+        if not p.exists():
+            return {}
+        tbl = self._read_table(p)
+        return {c: tbl.column(c).to_numpy() for c in tbl.column_names}
+
+    def last_date(self, symbol: str, interval: str = "D") -> pd.Timestamp | None:
+        p = self.path(symbol, interval)
+        if not p.exists():
+            return None
+        dates = self._read_table(p).column("date")
+        return pd.Timestamp(dates[len(dates) - 1].as_py()) if len(dates) else None
+
+    def write(self, symbol: str, df: pd.DataFrame, interval: str = "D") -> Path:
+        """Replace the stored bars for symbol."""
+        p = self.path(symbol, interval)
+        with _lock_for(p):
+            self._write_unlocked(p, _to_table(df))
+        return p
+
+    def append(self, symbol: str, df: pd.DataFrame, interval: str = "D") -> Path:
+        """Merge new bars into the stored series; rows with an existing date replace the old bar."""
+        p = self.path(symbol, interval)
+        with _lock_for(p):
+            new = _to_table(df).to_pandas()
+            if p.exists():
+                new = pd.concat([self._read_table(p).to_pandas(), new], ignore_index=True)
+            new = new.drop_duplicates("date", keep="last").sort_values("date")
+            self._write_unlocked(p, _to_table(new))
+        return p
+
+    def delete(self, symbol: str, interval: str = "D") -> None:
+        p = self.path(symbol, interval)
+        if p.exists():
+            p.unlink()
+
+    def _write_unlocked(self, path: Path, tbl: pa.Table) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, tbl.schema) as w:
+            w.write_table(tbl)
+        os.replace(tmp, path)
+
+    def ingest_csv(self, csv_path: str | Path, symbol: str, interval: str = "D",
+                   date_col: str = "date") -> pd.DataFrame | None:
+        """Load a CSV through the store: parse it once, then serve the typed copy until the CSV changes."""
+        csv_path = Path(csv_path)
+        p = self.path(symbol, interval)
+        if p.exists() and (not csv_path.exists() or p.stat().st_mtime >= csv_path.stat().st_mtime):
+            return self.read(symbol, interval)
+        if not csv_path.exists():
+            return None
+        df = pd.read_csv(csv_path)
+        df.columns = [c.lower() for c in df.columns]
+        if date_col not in df.columns:
+            return None
+        df = df.rename(columns={date_col: "date"})
+        df["date"] = pd.to_datetime(df["date"])
+        df = df.sort_values("date").reset_index(drop=True)
+        self.write(symbol, df, interval)
+        return self.read(symbol, interval)
+
+store = BarStore()
+
+def read_bars(symbol: str, interval: str = "D", start=None, end=None) -> pd.DataFrame:
+    return store.read(symbol, interval, start=start, end=end)
+
+def append_bars(symbol: str, df: pd.DataFrame, interval: str = "D") -> Path:
+    return store.append(symbol, df, interval)
+
+def last_bar_date(symbol: str, interval: str = "D") -> pd.Timestamp | None:
+    return store.last_date(symbol, interval)
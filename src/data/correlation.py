@@ -0,0 +1,272 @@
+"""
+Return covariance / beta / correlation / relative-strength service for a universe plus benchmarks
+- ReturnMoments keeps, over a trailing window of daily returns, the pairwise sufficient
+  statistics for every (symbol, symbol) pair: common-bar counts, sums, sums of squares and
+  cross products (masked matmuls, so late listings pair only on the bars both have).
+- A new bar is a rank-1 update (add the new row, subtract the one leaving the window): O(M^2)
+  per day instead of re-aligning M^2 pandas pairs; a full rebuild every REBUILD_EVERY updates
+  clears accumulated rounding.
+- cov / corr / beta / relative_strength are O(1) lookups; beta_table() and corr_matrix() read
+  whole blocks at once.
+- State lives in data_cache/covariance/<NAME>/ as .npy arrays plus meta.json; load() maps the
+  arrays read-only, so app processes serve lookups without loading the matrices.
+- Served values are end-of-day: relative_strength() answers only while the state is current
+  through the last completed session (last_session()), and None otherwise.
+"""
+from __future__ import annotations
+import json, os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .bar_store import store as _bars, BarStore
+from .panel import Panel
+from .regions import REGION_EXCHANGES
+from .resample import SESSIONS
+
+COV_DIR = Path(os.getenv("VEGA_COV_DIR", Path(__file__).resolve().parents[2] / "data_cache" / "covariance"))
+COV_WINDOW = int(os.getenv("VEGA_COV_WINDOW", "252"))
+REBUILD_EVERY = 63
+# local regular-session close per exchange (default 16:00)
+SESSION_CLOSE = {"MX": "15:00", "SA": "17:00", "L": "16:30", "DE": "17:30", "F": "17:30", "PA": "17:30",
+                 "AS": "17:30", "SW": "17:30", "T": "15:30", "HK": "16:00", "AX": "16:00", "NS": "15:30", "BO": "15:30"}
+BENCHMARKS = ["SPY", "QQQ", "IWM", "DIA", "XLK", "XLF", "XLV", "XLE", "XLY", "XLI", "XLU", "XLB", "XLRE", "XLC", "XLP"]
+
+_ARRAYS = ("returns", "closes", "n", "sx", "sxx", "sxy")
+
+class ReturnMoments:
+    def __init__(self, symbols: list[str], window: int = COV_WINDOW):
+        self.symbols = list(symbols)
+        self._col = {s: i for i, s in enumerate(self.symbols)}
+        self.window = window
+        m = len(self.symbols)
+        self.dates: list[str] = []                   # date of each returns row
+        self.returns = np.empty((0, m))              # last `window` returns (NaN = no bar)
+        self.closes = np.empty((0, m))               # last `window`+1 closes (forward-filled)
+        self.n = np.zeros((m, m)); self.sx = np.zeros((m, m))
+        self.sxx = np.zeros((m, m)); self.sxy = np.zeros((m, m))
+        self.updates = 0                             # rank-1 updates since the last rebuild
+
+    # ---- building / updating -----------------------------------------------------
+    @classmethod
+    def from_closes(cls, closes: pd.DataFrame, window: int = COV_WINDOW) -> "ReturnMoments":
+        """closes: dates x symbols (NaN before a symbol's first bar)."""
+        st = cls(list(closes.columns), window)
+        c = closes.ffill().to_numpy(dtype=float)[-(window + 1):]
+        st.closes = c
+        st.returns = _returns(c)
+        st.dates = [pd.Timestamp(d).isoformat() for d in closes.index[-len(st.returns):]] if len(st.returns) else []
+        st._rebuild()
+        return st
+
+    def _rebuild(self) -> None:
+        r = self.returns
+        m = ~np.isnan(r)
+        x = np.where(m, r, 0.0)
+        mf = m.astype(float)
+        self.n, self.sx, self.sxx, self.sxy = mf.T @ mf, x.T @ mf, (x * x).T @ mf, x.T @ x
+        self.updates = 0
+
+    def _rank1(self, r: np.ndarray, sign: float) -> None:
+        m = ~np.isnan(r)
+        x = np.where(m, r, 0.0)
+        mf = m.astype(float)
+        self.n += sign * np.outer(mf, mf)
+        self.sx += sign * np.outer(x, mf)
+        self.sxx += sign * np.outer(x * x, mf)
+        self.sxy += sign * np.outer(x, x)
+
+    def update(self, date, closes: np.ndarray) -> None:
+        """Append one day of closes (aligned to self.symbols; NaN = no bar that day)."""
+        d = pd.Timestamp(date).isoformat()
+        if self.dates and d <= self.dates[-1]:
+            raise ValueError(f"bar {d} is not newer than {self.dates[-1]}")
+        c = np.asarray(closes, dtype=float).copy()
+        if len(self.closes):
+            prev = self.closes[-1]
+            c = np.where(np.isnan(c), prev, c)  # carry the last close over a missing bar
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r = c / prev - 1.0
+        else:
+            r = np.full(len(c), np.nan)
+        self.closes = np.vstack([self.closes, c])[-(self.window + 1):]
+        if len(self.returns) >= self.window:
+            self._rank1(self.returns[0], -1.0)
+        self.returns = np.vstack([self.returns, r])[-self.window:]
+        self.dates = (self.dates + [d])[-self.window:]
+        self._rank1(r, 1.0)
+        self.updates += 1
+        if self.updates >= REBUILD_EVERY:
+            self._rebuild()
+
+    # ---- lookups (O(1)) ------------------------------------------------------------
+    def _ij(self, a: str, b: str) -> tuple[int, int]:
+        return self._col[a], self._col[b]
+
+    def cov(self, a: str, b: str) -> float:
+        """Sample covariance of daily returns over the bars both symbols have."""
+        i, j = self._ij(a, b)
+        n = self.n[i, j]
+        return float((self.sxy[i, j] - self.sx[i, j] * self.sx[j, i] / n) / (n - 1)) if n > 1 else np.nan
+
+    def _var(self, i: int, j: int) -> float:
+        """Variance of i's returns over the bars shared with j."""
+        n = self.n[i, j]
+        return float((self.sxx[i, j] - self.sx[i, j] ** 2 / n) / (n - 1)) if n > 1 else np.nan
+
+    def corr(self, a: str, b: str) -> float:
+        i, j = self._ij(a, b)
+        den = np.sqrt(self._var(i, j) * self._var(j, i))
+        return float(self.cov(a, b) / den) if den > 0 else np.nan
+
+    def beta(self, a: str, bench: str) -> float:
+        i, j = self._ij(a, bench)
+        v = self._var(j, i)
+        return float(self.cov(a, bench) / v) if v > 0 else np.nan
+
+    def relative_strength(self, a: str, bench: str, n: int = 20) -> float:
+        """Return of a minus return of bench over the last n bars."""
+        if n >= len(self.closes):
+            return np.nan
+        i, j = self._ij(a, bench)
+        c0, c1 = self.closes[-1 - n], self.closes[-1]
+        return float((c1[i] / c0[i] - 1.0) - (c1[j] / c0[j] - 1.0))
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._col
+
+    # ---- block reads -------------------------------------------------------------------
+    def _block(self, rows: list[str], cols: list[str]):
+        i = np.array([self._col[s] for s in rows], dtype=int)
+        j = np.array([self._col[s] for s in cols], dtype=int)
+        ix = np.ix_(i, j)
+        n = np.asarray(self.n[ix])
+        sxi, sxj = np.asarray(self.sx[ix]), np.asarray(self.sx[np.ix_(j, i)]).T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = (np.asarray(self.sxy[ix]) - sxi * sxj / n) / (n - 1)
+            vi = (np.asarray(self.sxx[ix]) - sxi ** 2 / n) / (n - 1)
+            vj = (np.asarray(self.sxx[np.ix_(j, i)]).T - sxj ** 2 / n) / (n - 1)
+        ok = n > 1
+        return np.where(ok, cov, np.nan), np.where(ok, vi, np.nan), np.where(ok, vj, np.nan)
+
+    def beta_table(self, benchmarks: list[str] | None = None, symbols: list[str] | None = None) -> pd.DataFrame:
+        """symbols x benchmarks betas."""
+        bench = [b for b in (benchmarks or BENCHMARKS) if b in self._col]
+        syms = symbols or self.symbols
+        cov, _, vb = self._block(syms, bench)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame(np.where(vb > 0, cov / vb, np.nan), index=syms, columns=bench)
+
+    def corr_matrix(self, symbols: list[str] | None = None) -> pd.DataFrame:
+        syms = symbols or self.symbols
+        cov, vi, vj = self._block(syms, syms)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame(cov / np.sqrt(vi * vj), index=syms, columns=syms)
+
+    def rs_table(self, benchmarks: list[str] | None = None, n: int = 20) -> pd.DataFrame:
+        """symbols x benchmarks relative strength over the last n bars."""
+        bench = [b for b in (benchmarks or BENCHMARKS) if b in self._col]
+        if n >= len(self.closes):
+            return pd.DataFrame(np.nan, index=self.symbols, columns=bench)
+        ret = self.closes[-1] / self.closes[-1 - n] - 1.0
+        j = [self._col[b] for b in bench]
+        return pd.DataFrame(ret[:, None] - ret[j][None, :], index=self.symbols, columns=bench)
+
+    # ---- persistence -----------------------------------------------------------------
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            tmp = path / f"{name}.tmp.npy"
+            np.save(tmp, getattr(self, name))
+            os.replace(tmp, path / f"{name}.npy")
+        meta = {"symbols": self.symbols, "window": self.window, "dates": self.dates, "updates": self.updates}
+        (path / "meta.tmp").write_text(json.dumps(meta))
+        os.replace(path / "meta.tmp", path / "meta.json")
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "ReturnMoments | None":
+        path = Path(path)
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+            st = cls(meta["symbols"], meta["window"])
+            for name in _ARRAYS:
+                setattr(st, name, np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None))
+        except (OSError, ValueError, KeyError):
+            return None
+        st.dates, st.updates = meta["dates"], meta["updates"]
+        return st
+
+def _returns(c: np.ndarray) -> np.ndarray:
+    if len(c) < 2:
+        return np.empty((0, c.shape[1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return c[1:] / c[:-1] - 1.0
+
+# ---- daily job / shared instance ----------------------------------------------------------
+def state_dir(name: str = "US") -> Path:
+    return COV_DIR / name.upper()
+
+def update_moments(name: str = "US", symbols: list[str] | None = None, benchmarks: list[str] | None = None,
+                   store: BarStore = _bars, window: int = COV_WINDOW) -> ReturnMoments:
+    """Bring the stored state up to date with the bar store: rank-1 updates for new days, or a
+    rebuild when the symbol list or window changed (or nothing was stored yet)."""
+    bench = [b for b in (benchmarks if benchmarks is not None else BENCHMARKS) if store.exists(b, "D")]
+    syms = list(dict.fromkeys(list(symbols if symbols is not None else []) + bench))
+    st = ReturnMoments.load(state_dir(name), mmap=False)
+    if st is None or st.symbols != syms or st.window != window or not st.dates:
+        last = [d for d in (store.last_date(s, "D") for s in syms) if d is not None]
+        start = max(last) - pd.Timedelta(days=int(window * 1.6) + 30) if last else None
+        panel = Panel.from_store(syms, "D", start=start, store=store)
+        st = ReturnMoments.from_closes(_close_frame(panel, syms), window)
+    else:
+        panel = Panel.from_store(syms, "D", start=pd.Timestamp(st.dates[-1]), store=store)
+        new = _close_frame(panel, syms)
+        for d, row in new.loc[new.index > pd.Timestamp(st.dates[-1])].iterrows():
+            st.update(d, row.to_numpy(dtype=float))
+    st.save(state_dir(name))
+    _loaded.pop(name.upper(), None)
+    return st
+
+def _close_frame(panel: Panel, syms: list[str]) -> pd.DataFrame:
+    """dates x syms closes, forward-filled after each symbol's first bar (NaN before it)."""
+    return pd.DataFrame(panel["close"], index=panel.dates, columns=panel.symbols).reindex(columns=syms)
+
+_loaded: dict[str, tuple[int, ReturnMoments | None]] = {}
+
+def moments(name: str = "US") -> ReturnMoments | None:
+    """The stored state for name (memory-mapped); reloaded when the nightly job rewrites it."""
+    key = name.upper()
+    try:
+        stamp = (state_dir(key) / "meta.json").stat().st_mtime_ns
+    except OSError:
+        return None
+    if key not in _loaded or _loaded[key][0] != stamp:
+        _loaded[key] = (stamp, ReturnMoments.load(state_dir(key)))
+    return _loaded[key][1]
+
+def last_session(region: str = "US", now=None) -> pd.Timestamp:
+    """Date of the region's last completed weekday session (its close has passed locally).
+
+    Exchange holidays are not known here: on the session after one, a state dated before the
+    holiday counts as stale and callers fall back to their own data.
+    """
+    exchange = sorted(REGION_EXCHANGES.get(region.upper(), {"US"}))[0]
+    tz, close = SESSIONS.get(exchange, SESSIONS["US"])[0], SESSION_CLOSE.get(exchange, "16:00")
+    t = pd.Timestamp.now(tz) if now is None else pd.Timestamp(now).tz_convert(tz)
+    day = t.tz_localize(None).normalize()
+    if t.tz_localize(None) < day + pd.Timedelta(f"{close}:00"):
+        day -= pd.Timedelta(days=1)
+    return pd.offsets.BDay().rollback(day)
+
+def relative_strength(symbol: str, bench: str, n: int = 20, name: str = "US", now=None) -> float | None:
+    """End-of-day RS over the last n sessions; None when the state is missing, does not hold
+    both symbols, or is not current through the last completed session."""
+    st = moments(name)
+    if st is None or symbol not in st or bench not in st or not st.dates:
+        return None
+    if pd.Timestamp(st.dates[-1]).normalize() != last_session(name, now):
+        return None
+    v = st.relative_strength(symbol, bench, n)
+    return None if np.isnan(v) else v
@@ -1,13 +1,20 @@
 """
 EODHD adapter for Vega Cockpit
 - Pulls end-of-day (or delayed) prices from EODHD REST API.
-- Falls back to cached CSV if provided.
+- Incremental: only bars from the cached bar before the last one are requested (from=...);
+  the last cached bar may still have been forming and is replaced, the one before it is
+  compared, and a full refetch happens only when that completed overlap no longer matches
+  (EODHD re-based history for a split/dividend).
+- Bulk: one request per exchange (eod-bulk-last-day) fans the last session out into
+  the per-symbol bar store, so region scans only read local data.
+- Falls back to the local bar store if the API is unavailable.
 """
 from __future__ import annotations
 import os, time, json, math, typing as t
 from dataclasses import dataclass
-import requests
 import pandas as pd
+from .http_client import http_get
+from .single_flight import flight
 
 EODHD_API_TOKEN = os.getenv("EODHD_API_TOKEN", "").strip()
 EODHD_BASE_URL  = os.getenv("EODHD_BASE_URL", "https://eodhd.com/api").rstrip("/")
@@ -20,23 +27,19 @@ def _check_token():
         raise EODHDError("EODHD_API_TOKEN not set")
 
 def _get(url: str, params: dict) -> dict:
-    # simple GET with retries
-    for i in range(3):
-        try:
-            r = requests.get(url, params=params, timeout=15)
-            if r.status_code == 200:
-                # EODHD returns JSON for fundamental endpoints, CSV for price endpoints
-                ctype = r.headers.get("Content-Type","")
-                if "application/json" in ctype:
-                    return r.json()
-                # if CSV, we'll parse where needed
-                return {"_raw": r.text}
-            err = f"HTTP {r.status_code} - {r.text[:180]}"
-            time.sleep(0.8*(i+1))
-        except Exception as ex:
-            err = str(ex)
-            time.sleep(0.8*(i+1))
-    raise EODHDError(err)
+    # pooled GET; connect errors, 429 and 5xx are retried with backoff by the shared client
+    try:
+        r = http_get(url, params=params, timeout=15)
+    except Exception as ex:
+        raise EODHDError(str(ex))
+    if r.status_code == 200:
+        # EODHD returns JSON for fundamental endpoints, CSV for price endpoints
+        ctype = r.headers.get("Content-Type","")
+        if "application/json" in ctype:
+            return r.json()
+        # if CSV, we'll parse where needed
+        return {"_raw": r.text}
+    raise EODHDError(f"HTTP {r.status_code} - {r.text[:180]}")
 
 def get_eod_prices_csv(symbol: str, period: str = "1y", exchange: str|None=None) -> pd.DataFrame:
     """Fetch daily bars as a DataFrame with columns: date, open, high, low, close, volume"""
@@ -79,28 +82,50 @@ def get_eod_prices_csv(symbol: str, period: str = "1y", exchange: str|None=None)
     return df
 
 def latest_close(symbol: str, exchange: str|None=None) -> float|None:
-    df = get_eod_prices_csv(symbol, period="6m", exchange=exchange)
+    # served from the bar store; at most one incremental request per EODHD_REFRESH_SEC
+    df = get_eod_prices_csv(symbol, period="1m", exchange=exchange)
     if df.empty: return None
     col = "adjusted_close" if "adjusted_close" in df.columns else "close"
     return float(df[col].iloc[-1])
 
 
 
-# --- CSV fallback cache -------------------------------------------------------
+# --- Bar store cache ----------------------------------------------------------
+# Bars are persisted in the columnar bar store (data_cache/bars/D/<SYM>.arrow); legacy
+# data_cache/eod_<SYM>.csv files are ingested on first fallback read.
 from pathlib import Path
+from .bar_store import store as _bars
 CACHE_DIR = Path(__file__).resolve().parents[2] / "data_cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# minimum seconds between incremental checks for the same symbol
+EODHD_REFRESH_SEC = int(os.getenv("EODHD_REFRESH_SEC", "900"))
+# relative tolerance when comparing overlapping bars (store keeps float32 prices)
+_ADJ_TOL = 5e-4
+
+def _store_key(symbol: str, exchange: str|None) -> str:
+    return symbol if exchange is None else f"{symbol}.{exchange}"
+
 def _cache_path(symbol: str, exchange: str|None):
-    sym = symbol if exchange is None else f"{symbol}.{exchange}"
+    sym = _store_key(symbol, exchange)
     return CACHE_DIR / f"eod_{sym.replace(':','_').replace('/','_')}.csv"
 
-def _get_prices_live(symbol: str, period: str = "1y", exchange: str|None=None) -> pd.DataFrame:
-    # This function mirrors the original fetch logic.
+def _trim_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    # crude parse like '1y','6m','3m','1m','5y'
+    if df.empty or not (isinstance(period, str) and period.endswith(("y","m"))):
+        return df
+    n = int(period[:-1]); unit = period[-1]
+    cutoff = df["date"].max() - (pd.DateOffset(years=n) if unit=="y" else pd.DateOffset(months=n))
+    return df[df["date"] >= cutoff].reset_index(drop=True)
+
+def _get_prices_live(symbol: str, period: str = "1y", exchange: str|None=None, since=None) -> pd.DataFrame:
+    # This function mirrors the original fetch logic; `since` asks EODHD only for bars on/after that date.
     _check_token()
     sym = symbol if exchange is None else f"{symbol}.{exchange}"
     url = f"{EODHD_BASE_URL}/eod/{sym}"
     params = {"api_token": EODHD_API_TOKEN, "fmt": "csv", "period": "d"}
+    if since is not None:
+        params["from"] = pd.Timestamp(since).strftime("%Y-%m-%d")
     resp = _get(url, params)
     raw = resp.get("_raw","")
     if not raw:
@@ -120,33 +145,155 @@ def _get_prices_live(symbol: str, period: str = "1y", exchange: str|None=None) -
     df = df[keep].copy()
     df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
     df = df.sort_values("date").reset_index(drop=True)
-    # trim by period
-    if isinstance(period, str) and period.endswith(("y","m")):
-        n = int(period[:-1])
-        unit = period[-1]
-        cutoff = df["date"].max() - (pd.DateOffset(years=n) if unit=="y" else pd.DateOffset(months=n))
-        df = df[df["date"] >= cutoff].reset_index(drop=True)
     return df
 
+def _get_prices_cached(symbol: str, exchange: str|None=None) -> pd.DataFrame:
+    key = _store_key(symbol, exchange)
+    if _bars.exists(key):
+        return _bars.read(key)
+    df = _bars.ingest_csv(_cache_path(symbol, exchange), key)
+    return df if df is not None else pd.DataFrame()
+
+def _is_fresh(key: str, last: pd.Timestamp) -> bool:
+    bulk = _bulk_marker(_exchange_of(key))
+    if bulk and last >= pd.Timestamp(bulk["date"]) and (time.time() - bulk["ts"]) < EODHD_BULK_TTL_SEC:
+        return True
+    return (time.time() - _bars.path(key).stat().st_mtime) < EODHD_REFRESH_SEC
+
+def _history_rebased(cached: pd.DataFrame, fresh: pd.DataFrame, last: pd.Timestamp) -> bool:
+    """True when completed bars EODHD already sent us no longer match, i.e. history was split/dividend
+    adjusted. The bar at `last` is not compared: it may have been fetched while still forming."""
+    cols = [c for c in ("close","adjusted_close") if c in cached.columns and c in fresh.columns]
+    ov = cached[["date"] + cols].merge(fresh[["date"] + cols], on="date", suffixes=("_old","_new"))
+    ov = ov[ov["date"] < last]
+    if ov.empty:
+        return True
+    for c in cols:
+        old, new = ov[f"{c}_old"].astype(float), ov[f"{c}_new"].astype(float)
+        if ((old - new).abs() > _ADJ_TOL * new.abs().clip(lower=1e-9)).any():
+            return True
+    return False
+
+def _refresh_prices(symbol: str, exchange: str|None=None) -> pd.DataFrame:
+    """Bring the cached daily series up to date and return it (full history)."""
+    key = _store_key(symbol, exchange)
+    last = _bars.last_date(key)
+    if last is None:
+        df = _get_prices_live(symbol, exchange=exchange)
+        _bars.write(key, df)
+        return _bars.read(key)
+    if _is_fresh(key, last):
+        return _bars.read(key)
+    dates = _bars.read_arrays(key)["date"]
+    since = pd.Timestamp(dates[-2]) if len(dates) > 1 else last
+    fresh = _get_prices_live(symbol, exchange=exchange, since=since)
+    if fresh.empty:
+        os.utime(_bars.path(key))
+    elif _history_rebased(_bars.read(key, start=since), fresh, last):
+        _bars.write(key, _get_prices_live(symbol, exchange=exchange))
+    else:
+        _bars.append(key, fresh)
+    return _bars.read(key)
+
 def get_eod_prices_csv(symbol: str, period: str = "1y", exchange: str|None=None) -> pd.DataFrame:
     try:
-        df = _get_prices_live(symbol, period=period, exchange=exchange)
-        # save cache
-        try:
-            df.to_csv(_cache_path(symbol, exchange), index=False)
-        except Exception:
-            pass
-        return df
+        # concurrent readers of one symbol (e.g. ^VIX for risk_off) share a single refresh
+        full = flight.do(("eodhd", _store_key(symbol, exchange)), _refresh_prices, symbol, exchange)
+        return _trim_period(full, period)
     except Exception:
         # fallback to cache
-        cp = _cache_path(symbol, exchange)
-        if cp.exists():
-            df = pd.read_csv(cp)
-            df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
-            df = df.sort_values("date").reset_index(drop=True)
-            if isinstance(period, str) and period.endswith(("y","m")):
-                n = int(period[:-1]); unit = period[-1]
-                cutoff = df["date"].max() - (pd.DateOffset(years=n) if unit=="y" else pd.DateOffset(months=n))
-                df = df[df["date"] >= cutoff].reset_index(drop=True)
-            return df
+        df = _get_prices_cached(symbol, exchange)
+        if not df.empty:
+            return _trim_period(df, period)
         raise
+
+
+# --- Bulk last-day refresh -----------------------------------------------------
+# GET /eod-bulk-last-day/{EXCHANGE} returns every ticker's last session in one call.
+# Symbols with a split or dividend on that date are dropped from the store so the next
+# read refetches their (re-based) history; symbols whose cache has a gap are left to the
+# incremental path.
+import json as _json
+EODHD_BULK_TTL_SEC = int(os.getenv("EODHD_BULK_TTL_SEC", str(18*3600)))
+BULK_MAX_GAP_DAYS = 5  # calendar days: covers weekends and single holidays
+
+def _exchange_of(key: str) -> str:
+    return key.rsplit(".", 1)[1].upper() if "." in key else "US"
+
+def _key_for(code: str, exchange: str) -> str:
+    return code if exchange.upper() == "US" else f"{code}.{exchange.upper()}"
+
+def _bulk_marker_path(exchange: str) -> Path:
+    return _bars.root / "D" / f"_bulk_{exchange.upper()}.json"
+
+def _bulk_marker(exchange: str) -> dict|None:
+    p = _bulk_marker_path(exchange)
+    try:
+        return _json.loads(p.read_text()) if p.exists() else None
+    except Exception:
+        return None
+
+def _bulk_rows(exchange: str, date=None, kind: str|None=None) -> list:
+    _check_token()
+    params = {"api_token": EODHD_API_TOKEN, "fmt": "json"}
+    if date is not None:
+        params["date"] = pd.Timestamp(date).strftime("%Y-%m-%d")
+    if kind:
+        params["type"] = kind
+    resp = _get(f"{EODHD_BASE_URL}/eod-bulk-last-day/{exchange.upper()}", params)
+    if isinstance(resp, dict) and "_raw" in resp:
+        resp = _json.loads(resp["_raw"] or "[]")
+    return resp if isinstance(resp, list) else []
+
+def get_bulk_last_day(exchange: str, date=None) -> pd.DataFrame:
+    """Last trading day for a whole exchange: columns symbol, date, open, high, low, close, adjusted_close, volume."""
+    df = pd.DataFrame(_bulk_rows(exchange, date))
+    if df.empty:
+        return df
+    df.columns = [c.lower() for c in df.columns]
+    df["symbol"] = [_key_for(c, exchange) for c in df["code"].astype(str)]
+    df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
+    keep = [c for c in ["symbol","date","open","high","low","close","adjusted_close","volume"] if c in df.columns]
+    return df[keep]
+
+def bulk_refresh(exchange: str, symbols: list[str]|None=None, date=None) -> dict:
+    """Fan one bulk request out into the per-symbol cache. Returns counts per outcome."""
+    bars = get_bulk_last_day(exchange, date)
+    stats = {"exchange": exchange.upper(), "rows": int(len(bars)), "updated": 0,
+             "adjusted": 0, "gap": 0, "uncached": 0}
+    if bars.empty:
+        return stats
+    if symbols is not None:
+        bars = bars[bars["symbol"].isin(set(symbols))]
+    day = bars["date"].max()
+    adjusted = set()
+    for kind in ("splits", "dividends"):
+        try:
+            adjusted |= {_key_for(str(r.get("code")), exchange) for r in _bulk_rows(exchange, day, kind)}
+        except EODHDError:
+            pass
+    for rec in bars.to_dict(orient="records"):
+        key = rec.pop("symbol")
+        if key in adjusted:
+            _bars.delete(key)
+            stats["adjusted"] += 1
+            continue
+        last = _bars.last_date(key)
+        if last is None:
+            stats["uncached"] += 1
+        elif (rec["date"] - last).days > BULK_MAX_GAP_DAYS:
+            stats["gap"] += 1
+        else:
+            _bars.append(key, pd.DataFrame([rec]))
+            stats["updated"] += 1
+    p = _bulk_marker_path(exchange)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(_json.dumps({"date": day.strftime("%Y-%m-%d"), "ts": time.time()}))
+    return stats
+
+def bulk_refresh_symbols(symbols: list[str], date=None) -> list[dict]:
+    """Bulk-refresh a universe: one request per distinct exchange suffix (plus split/dividend lists)."""
+    by_exchange: dict[str, list[str]] = {}
+    for s in symbols:
+        by_exchange.setdefault(_exchange_of(s), []).append(s)
+    return [bulk_refresh(ex, syms, date=date) for ex, syms in by_exchange.items()]
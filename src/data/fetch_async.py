@@ -0,0 +1,84 @@
+"""
+Concurrent symbol fetcher for Vega scans
+- asyncio fan-out with a bounded concurrency limit, per-provider request pacing
+  (the shared token buckets in data.rate_limit) and a per-request timeout.
+- Results are yielded as they complete (FetchResult per symbol; errors are returned, not raised).
+- Accepts either a coroutine function or a blocking function (run in worker threads),
+  so existing helpers like get_eod_prices_csv plug in unchanged.
+- fetch_concurrent() is the sync bridge for Streamlit pages and sync FastAPI routes.
+"""
+from __future__ import annotations
+import asyncio, inspect, os, queue, threading, time, typing as t
+from dataclasses import dataclass
+
+from .rate_limit import limiter
+
+DEFAULT_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+DEFAULT_TIMEOUT = float(os.getenv("FETCH_TIMEOUT_SEC", "20"))
+
+@dataclass
+class FetchResult:
+    symbol: str
+    value: t.Any = None
+    error: Exception | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+async def fetch_async(symbols: t.Iterable[str], fetch: t.Callable, *, provider: str = "eodhd",
+                      concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT
+                      ) -> t.AsyncIterator[FetchResult]:
+    """Run fetch(symbol) for every symbol; yield FetchResult in completion order."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    bucket = limiter(provider)
+    is_coro = inspect.iscoroutinefunction(fetch)
+
+    async def one(sym: str) -> FetchResult:
+        async with sem:
+            wait = bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            t0 = time.perf_counter()
+            try:
+                call = fetch(sym) if is_coro else asyncio.to_thread(fetch, sym)
+                val = await asyncio.wait_for(call, timeout)
+                return FetchResult(sym, val, None, time.perf_counter() - t0)
+            except asyncio.TimeoutError:
+                return FetchResult(sym, None, TimeoutError(f"{sym}: no response in {timeout:.0f}s"), time.perf_counter() - t0)
+            except Exception as ex:
+                return FetchResult(sym, None, ex, time.perf_counter() - t0)
+
+    tasks = [asyncio.create_task(one(s)) for s in dict.fromkeys(symbols)]
+    for fut in asyncio.as_completed(tasks):
+        yield await fut
+
+def fetch_concurrent(symbols: t.Iterable[str], fetch: t.Callable, **kw) -> t.Iterator[FetchResult]:
+    """Sync iterator over fetch_async; the event loop runs in a helper thread."""
+    q: queue.Queue = queue.Queue()
+    done = object()
+
+    async def pump():
+        async for r in fetch_async(symbols, fetch, **kw):
+            q.put(r)
+
+    def run():
+        try:
+            asyncio.run(pump())
+        except Exception as ex:
+            q.put(ex)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=run, daemon=True).start()
+    while (item := q.get()) is not done:
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+def fetch_all(symbols: t.Iterable[str], fetch: t.Callable, **kw) -> dict[str, FetchResult]:
+    """Convenience: wait for everything; results keyed by symbol in input order."""
+    syms = list(dict.fromkeys(symbols))
+    got = {r.symbol: r for r in fetch_concurrent(syms, fetch, **kw)}
+    return {s: got[s] for s in syms}
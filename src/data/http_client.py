@@ -0,0 +1,63 @@
+"""
+Shared HTTP client for market-data providers (EODHD, Polygon, Yahoo, CSV feeds)
+- One process-wide requests.Session; its adapter keeps a keep-alive pool per host,
+  so repeat calls skip the TCP + TLS handshake.
+- Pool sizes are tunable: HTTP_POOL_HOSTS (host pools kept), HTTP_POOL_MAXSIZE (sockets per host).
+- Idempotent requests retry on connect errors, 429 and 5xx with jittered exponential
+  backoff (HTTP_RETRIES, HTTP_BACKOFF_SEC); Retry-After is honoured.
+- gzip/deflate is always negotiated.
+"""
+from __future__ import annotations
+import os, threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_HOSTS   = int(os.getenv("HTTP_POOL_HOSTS", "16"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+HTTP_RETRIES      = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF_SEC  = float(os.getenv("HTTP_BACKOFF_SEC", "0.5"))
+HTTP_TIMEOUT_SEC  = float(os.getenv("HTTP_TIMEOUT_SEC", "15"))
+
+_session: requests.Session | None = None
+_lock = threading.Lock()
+
+def _retry() -> Retry:
+    kw = dict(total=HTTP_RETRIES, connect=HTTP_RETRIES, read=HTTP_RETRIES, status=HTTP_RETRIES,
+              backoff_factor=HTTP_BACKOFF_SEC, status_forcelist=(429, 500, 502, 503, 504),
+              allowed_methods=frozenset({"GET", "HEAD"}), respect_retry_after_header=True,
+              raise_on_status=False)
+    try:
+        return Retry(backoff_jitter=HTTP_BACKOFF_SEC, **kw)
+    except TypeError:  # urllib3 < 2.0 has no jitter knob
+        return Retry(**kw)
+
+def _make_session() -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                          max_retries=_retry())
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"Accept-Encoding": "gzip, deflate", "User-Agent": "vega-cockpit/1.0"})
+    return s
+
+def session() -> requests.Session:
+    """The process-wide pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _make_session()
+    return _session
+
+def http_get(url: str, params: dict | None = None, timeout: float | None = None, **kw) -> requests.Response:
+    """GET through the shared pool; retries are handled by the adapter."""
+    return session().get(url, params=params, timeout=timeout or HTTP_TIMEOUT_SEC, **kw)
+
+def reset_session() -> None:
+    """Drop pooled connections (e.g. after a fork in a worker process)."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
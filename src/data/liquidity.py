@@ -0,0 +1,112 @@
+"""
+Per-region liquidity prefilter tables (nightly), read before any indicator work
+- build_liquidity() reads only the last ~LIQ_LOOKBACK of daily bars from the bar store and
+  computes, per symbol: last price, 30-day average volume, 30-day dollar turnover and an
+  effective spread estimate (Abdi-Ranaldo 2017, from daily high/low/close).
+- `pass` applies the region minimums from config/regions.yaml (min_price_local,
+  min_avg_vol_30d, min_dollar_turnover); `pass_through` applies the region's
+  pass_through_rules (turnover plus max_spread_pct). Symbols without a recent bar fail both.
+- Tables are written to data_cache/liquidity/<REGION>.feather; liquid_symbols() returns the
+  symbols passing either test, or None when the region has no table yet (callers then keep
+  their full universe).
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as ik
+from .bar_store import store as _bars, BarStore
+from .panel import Panel
+from .regions import load_regions, region_symbols
+
+LIQUIDITY_DIR = Path(os.getenv("VEGA_LIQUIDITY_DIR", Path(__file__).resolve().parents[2] / "data_cache" / "liquidity"))
+LIQ_WINDOW = 30                        # sessions for ADV / turnover / spread
+LIQ_LOOKBACK = pd.Timedelta(days=60)   # calendar days loaded (covers LIQ_WINDOW + holidays)
+STALE_AFTER = pd.Timedelta(days=10)    # no bar this long before the region's last date -> not tradable
+
+COLUMNS = ["symbol", "asof", "price", "adv_30d", "dollar_turnover_30d", "spread_pct", "pass", "pass_through"]
+
+def spread_estimate(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = LIQ_WINDOW) -> np.ndarray:
+    """Effective spread in percent over the last n bars, per column (Abdi-Ranaldo close-high-low).
+
+    s^2 = 4 * mean[(c_t - eta_t) * (c_t - eta_{t+1})] with log prices and eta the high/low
+    midpoint; negative means are floored at 0.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = np.log(close[-n:])
+        eta = (np.log(high[-(n + 1):]) + np.log(low[-(n + 1):])) / 2.0
+    if len(c) < 2:
+        return np.full(close.shape[1:], np.nan)
+    prod = (c[:-1] - eta[-len(c):-1]) * (c[:-1] - eta[-len(c) + 1:])
+    return np.sqrt(np.clip(4.0 * np.nanmean(prod, axis=0), 0.0, None)) * 100.0
+
+def build_liquidity(region: str = "US", symbols: list[str] | None = None, store: BarStore = _bars,
+                    settings: dict | None = None) -> pd.DataFrame:
+    """Liquidity table for the region's stored daily bars (COLUMNS, indexed by symbol)."""
+    syms = list(symbols) if symbols is not None else region_symbols(region, "D", store)
+    last = [d for d in (store.last_date(s, "D") for s in syms) if d is not None]
+    if not last:
+        return pd.DataFrame(columns=COLUMNS).set_index("symbol")
+    asof_max = max(last)
+    panel = Panel.from_store(syms, "D", start=asof_max - LIQ_LOOKBACK, store=store)
+    rows = panel.last_rows()
+    ok = rows >= 0
+    volume, close = panel.tail("volume", LIQ_WINDOW), panel.tail("close", LIQ_WINDOW)
+    out = pd.DataFrame({
+        "asof": panel.dates[rows.clip(min=0)].where(ok),
+        "price": close[-1] if len(close) else np.nan,
+        "adv_30d": ik.sma(volume, LIQ_WINDOW)[-1] if len(volume) else np.nan,
+        "dollar_turnover_30d": ik.sma(close * volume, LIQ_WINDOW)[-1] if len(close) else np.nan,
+        "spread_pct": spread_estimate(panel["high"], panel["low"], panel["close"]),
+    }, index=pd.Index(panel.symbols, name="symbol"))[ok]
+
+    cfg = settings if settings is not None else load_regions()
+    mins = (cfg.get("regions") or {}).get(region, {})
+    pt = (cfg.get("pass_through_rules") or {}).get(region, {})
+    fresh = out["asof"] >= asof_max - STALE_AFTER
+    passed = fresh.copy()
+    for col, key in (("price", "min_price_local"), ("adv_30d", "min_avg_vol_30d"),
+                     ("dollar_turnover_30d", "min_dollar_turnover")):
+        if mins.get(key) is not None:
+            passed &= out[col] >= float(mins[key])
+    out["pass"] = passed
+    if pt:
+        out["pass_through"] = (fresh & (out["dollar_turnover_30d"] >= float(pt.get("min_dollar_turnover", 0)))
+                               & (out["spread_pct"] <= float(pt.get("max_spread_pct", np.inf))))
+    else:
+        out["pass_through"] = False
+    return out
+
+def _path(region: str) -> Path:
+    return LIQUIDITY_DIR / f"{region.upper()}.feather"
+
+def write_liquidity(region: str, table: pd.DataFrame) -> Path:
+    p = _path(region)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    table.rename_axis("symbol").reset_index().to_feather(tmp)
+    os.replace(tmp, p)
+    return p
+
+def load_liquidity(region: str = "US") -> pd.DataFrame | None:
+    """The stored table (indexed by symbol), or None if the region was never built."""
+    try:
+        return pd.read_feather(_path(region)).set_index("symbol")
+    except (OSError, ValueError, KeyError):
+        return None
+
+def liquid_symbols(region: str = "US", symbols: list[str] | None = None) -> list[str] | None:
+    """Symbols passing the region minimums or its pass-through rule; None when there is no
+    table, so callers fall back to the full universe. Given `symbols`, only those the table
+    marks as failing are dropped (names newer than the table are kept)."""
+    table = load_liquidity(region)
+    if table is None:
+        return None if symbols is None else list(symbols)
+    ok = table["pass"].astype(bool) | table["pass_through"].astype(bool)
+    if symbols is None:
+        return list(table.index[ok])
+    failed = set(table.index[~ok])
+    return [s for s in symbols if s not in failed]
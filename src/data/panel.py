@@ -0,0 +1,222 @@
+"""
+Universe panels: aligned (time x symbols) float arrays for whole-region indicator scans
+- Panel.from_store() loads many symbols from the bar store (memory-mapped columns) onto one
+  union calendar; from_frames() does the same for frames already in memory.
+- Prices are forward-filled after each symbol's first bar (holidays, halts); volume gaps are 0.
+  `valid` keeps the original presence mask, so by_date() reads each symbol's own last bar.
+- Indicators see each symbol's own bars only: every column's traded rows are stacked at the
+  top before the kernels run and read back afterwards, so a filled row never counts as a bar
+  (roc5 is five of the symbol's sessions back); on filled rows an indicator holds its value
+  as of the symbol's last bar.
+- Indicators run over all columns at once via indicator_kernels and are cached by name:
+  "ema20", "sma50", "atr14", "rsi14", "roc5", "adx14", "std63", "max20" / "min20" (of close),
+  with an optional "_<field>" suffix ("max52_high", "ema9_volume").
+- Results read back by symbol (dates x names) or by date (symbols x names).
+"""
+from __future__ import annotations
+import re
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as ik
+from .bar_store import store as _bars, BarStore, _widen
+
+FIELDS = ("open", "high", "low", "close", "volume")
+_SPEC = re.compile(r"^(ema|sma|atr|rsi|roc|adx|std|max|min)(\d+)(?:_(\w+))?$")
+_OHLC_KERNELS = {"atr": ik.atr, "adx": ik.adx}
+_WINDOWED = {"sma", "std", "max", "min", "roc", "atr", "rsi"}  # value at t needs only the last n+1 inputs
+_KERNELS = {"ema": ik.ema, "sma": ik.sma, "rsi": ik.rsi, "roc": ik.roc, "std": ik.stdev,
+            "max": ik.rolling_max, "min": ik.rolling_min}
+
+def _own_bars(valid: np.ndarray):
+    """pack(a): each column's traded rows stacked at the top (NaN below); unpack(b): back on the
+    panel rows, holding each column's last own value on rows it did not trade (NaN before its first)."""
+    rank = np.cumsum(valid, axis=0) - 1
+    depth = int(rank[-1].max()) + 1 if rank.size else 0
+    r, c = np.nonzero(valid)
+    cols = np.arange(valid.shape[1])
+
+    def pack(a: np.ndarray) -> np.ndarray:
+        out = np.full((depth, valid.shape[1]), np.nan)
+        out[rank[r, c], c] = np.asarray(a, dtype=float)[r, c]
+        return out
+
+    def unpack(b: np.ndarray) -> np.ndarray:
+        if not depth:
+            return np.full(valid.shape, np.nan)
+        out = np.asarray(b, dtype=float)[rank.clip(min=0), cols]
+        out[rank < 0] = np.nan
+        return out
+    return pack, unpack
+
+def _ffill_cols(a: np.ndarray) -> np.ndarray:
+    idx = np.where(np.isnan(a), 0, np.arange(len(a))[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(a, idx, axis=0)
+
+class Panel:
+    def __init__(self, dates: pd.DatetimeIndex, symbols: list[str], fields: dict[str, np.ndarray],
+                 valid: np.ndarray | None = None):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = list(symbols)
+        self._col = {s: i for i, s in enumerate(self.symbols)}
+        self.valid = valid if valid is not None else ~np.isnan(fields["close"])
+        self._data: dict[str, np.ndarray] = dict(fields)
+        self._tails: dict[str, np.ndarray] = {}
+
+    # ---- construction ----------------------------------------------------------
+    @classmethod
+    def _aligned(cls, series: dict[str, dict[str, np.ndarray]], start=None) -> "Panel":
+        """series: symbol -> {'date': datetime64[ns], field: values}."""
+        series = {s: c for s, c in series.items() if c.get("date") is not None and len(c["date"])}
+        symbols = list(series)
+        if not symbols:
+            return cls(pd.DatetimeIndex([]), [], {f: np.empty((0, 0)) for f in FIELDS}, np.empty((0, 0), bool))
+        dates = np.unique(np.concatenate([c["date"] for c in series.values()]))
+        if start is not None:
+            dates = dates[dates >= np.datetime64(pd.Timestamp(start), "ns")]
+        fields = {f: np.full((len(dates), len(symbols)), np.nan) for f in FIELDS}
+        for j, s in enumerate(symbols):
+            cols = series[s]
+            rows = np.searchsorted(dates, cols["date"])
+            keep = (rows < len(dates)) & (dates[rows.clip(max=len(dates) - 1)] == cols["date"])
+            for f in FIELDS:
+                if f in cols:
+                    fields[f][rows[keep], j] = np.asarray(cols[f], dtype=float)[keep]
+        valid = ~np.isnan(fields["close"])
+        for f in FIELDS:
+            fields[f] = np.nan_to_num(fields[f]) if f == "volume" else _ffill_cols(fields[f])
+        return cls(pd.DatetimeIndex(dates, name="date"), symbols, fields, valid)
+
+    @classmethod
+    def from_store(cls, symbols: Iterable[str] | None = None, interval: str = "D", start=None,
+                   store: BarStore = _bars) -> "Panel":
+        """All (or the given) stored symbols for interval; missing symbols are skipped."""
+        series = {}
+        for s in (store.symbols(interval) if symbols is None else symbols):
+            cols = store.read_arrays(s, interval)
+            if cols:
+                series[s] = {k: (_widen(v) if v.dtype == np.float32 else v) for k, v in cols.items()}
+        return cls._aligned(series, start)
+
+    @classmethod
+    def from_frames(cls, frames: dict[str, pd.DataFrame], start=None) -> "Panel":
+        """symbol -> OHLCV frame (DatetimeIndex or a date/time column; column case ignored)."""
+        series = {}
+        for s, df in frames.items():
+            if df is None or df.empty:
+                continue
+            d = df.copy()
+            if isinstance(d.columns, pd.MultiIndex):  # yfinance (field, ticker)
+                d.columns = d.columns.get_level_values(0)
+            d = d.rename(columns=lambda c: str(c).lower())
+            dates = pd.to_datetime(d["date"] if "date" in d.columns else d["time"] if "time" in d.columns else d.index)
+            dates = pd.DatetimeIndex(dates)
+            if dates.tz is not None:
+                dates = dates.tz_convert("UTC").tz_localize(None)
+            order = np.argsort(dates.to_numpy(dtype="datetime64[ns]"), kind="stable")
+            series[s] = {"date": dates.to_numpy(dtype="datetime64[ns]")[order],
+                         **{f: pd.to_numeric(d[f], errors="coerce").to_numpy(dtype=float)[order]
+                            for f in FIELDS if f in d.columns}}
+        return cls._aligned(series, start)
+
+    # ---- columns ---------------------------------------------------------------
+    def __contains__(self, name: str) -> bool:
+        return name in self._data
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._data:
+            self._data[name] = self._compute(name)
+        return self._data[name]
+
+    def put(self, name: str, values: np.ndarray) -> None:
+        self._data[name] = np.asarray(values)
+
+    def tail(self, name: str, rows: int) -> np.ndarray:
+        """Last `rows` rows of a column; windowed indicators (sma, std, max/min, roc, atr, rsi)
+        are computed over just the inputs those rows need instead of the whole history."""
+        if name in self._data:
+            return self._data[name][-rows:]
+        m = _SPEC.match(name)
+        if not m or m.group(1) not in _WINDOWED:
+            return self[name][-rows:]
+        have = self._tails.get(name)
+        if have is None or len(have) < min(rows, len(self.dates)):
+            self._tails[name] = self._compute(name, self._span(rows, int(m.group(2))))[-rows:]
+        return self._tails[name][-rows:]
+
+    def _span(self, rows: int, n: int) -> int:
+        """Trailing panel rows that give the last `rows` rows n + 1 of every symbol's own bars
+        before them (or all of its history)."""
+        t = len(self.dates)
+        first = max(t - rows, 0)
+        before = np.cumsum(self.valid[:first][::-1], axis=0)  # own bars counted back from `first`
+        back = (before < n + 1).sum(axis=0) + 1 if first else np.zeros(1, dtype=int)
+        return min(t, rows + int(back.max(initial=0)))
+
+    def drop(self, *names: str) -> None:
+        """Free computed columns (raw OHLCV fields are kept)."""
+        for n in names:
+            if n not in FIELDS:
+                self._data.pop(n, None)
+            self._tails.pop(n, None)
+
+    def names(self) -> list[str]:
+        return list(self._data) + [n for n in self._tails if n not in self._data]
+
+    def _compute(self, name: str, rows: int | None = None) -> np.ndarray:
+        m = _SPEC.match(name)
+        if not m:
+            raise KeyError(f"unknown panel column {name!r}")
+        kind, n, field = m.group(1), int(m.group(2)), m.group(3) or "close"
+        pack, unpack = _own_bars(self.valid if rows is None else self.valid[-rows:])
+        col = (lambda f: pack(self[f])) if rows is None else (lambda f: pack(self.tail(f, rows)))
+        if kind in _OHLC_KERNELS:
+            return unpack(_OHLC_KERNELS[kind](col("high"), col("low"), col("close"), n))
+        if kind == "rsi":
+            return unpack(ik.rsi(col(field), n, smoothing="sma", loss_floor=1e-12))
+        return unpack(_KERNELS[kind](col(field), n))
+
+    # convenience wrappers (same cache as panel["ema20"])
+    def ema(self, n: int, field: str = "close"): return self[f"ema{n}" + ("" if field == "close" else f"_{field}")]
+    def sma(self, n: int, field: str = "close"): return self[f"sma{n}" + ("" if field == "close" else f"_{field}")]
+    def atr(self, n: int = 14): return self[f"atr{n}"]
+    def rsi(self, n: int = 14): return self[f"rsi{n}"]
+    def roc(self, n: int): return self[f"roc{n}"]
+    def adx(self, n: int = 14): return self[f"adx{n}"]
+    def stdev(self, n: int, field: str = "close"): return self[f"std{n}" + ("" if field == "close" else f"_{field}")]
+    def rolling_max(self, n: int, field: str = "high"): return self[f"max{n}_{field}"]
+    def rolling_min(self, n: int, field: str = "low"): return self[f"min{n}_{field}"]
+
+    # ---- read back -------------------------------------------------------------
+    def frame(self, name: str) -> pd.DataFrame:
+        """One column as dates x symbols."""
+        return pd.DataFrame(self[name], index=self.dates, columns=self.symbols)
+
+    def by_symbol(self, symbol: str, names: Iterable[str] | None = None) -> pd.DataFrame:
+        """dates x names for one symbol, on the dates it actually traded."""
+        j = self._col[symbol]
+        names = list(names) if names is not None else list(self._data)
+        rows = np.flatnonzero(self.valid[:, j])
+        return pd.DataFrame({n: self[n][rows, j] for n in names}, index=self.dates[rows])
+
+    def last_rows(self, date=None) -> np.ndarray:
+        """Per symbol, the row of its last bar on or before date (-1 if none)."""
+        upto = len(self.dates) if date is None else int(self.dates.searchsorted(pd.Timestamp(date), side="right"))
+        v = self.valid[:upto]
+        if not len(v):
+            return np.full(len(self.symbols), -1)
+        last = len(v) - 1 - np.argmax(v[::-1], axis=0)
+        return np.where(v.any(axis=0), last, -1)
+
+    def by_date(self, date=None, names: Iterable[str] | None = None) -> pd.DataFrame:
+        """symbols x names as of date (default: each symbol's latest bar); adds 'date'."""
+        names = list(names) if names is not None else list(self._data)
+        rows = self.last_rows(date)
+        ok = rows >= 0
+        cols = np.flatnonzero(ok)
+        out = {"date": self.dates[rows[ok]]}
+        out.update({n: self[n][rows[ok], cols] for n in names})
+        return pd.DataFrame(out, index=pd.Index([self.symbols[j] for j in cols], name="symbol"))
@@ -0,0 +1,136 @@
+"""
+Polygon aggregates service (auto-hedging engine, tradeability meter, worker Polygon client)
+- One persistent series per (ticker, multiplier + timespan) in the bar store, interval "poly_<mult><span>".
+- A series is refreshed at most once per POLYGON_AGGS_REFRESH_SEC, judged by the file mtime,
+  so every page, worker and process on the deployment shares the same minute.
+- Refreshes ask Polygon only for bars from the last stored bar onward; the last (possibly still
+  forming) bar is replaced. History is re-downloaded when the overlap no longer matches (split
+  adjustment) or when a caller asks for an earlier start than any fetch so far; the earliest
+  requested start is kept next to the series ("<ticker>.start"), so a ticker whose listing is
+  younger than the requested window is not re-downloaded on every call.
+- get_resampled() derives higher timeframes (e.g. 1h from 15m) locally via data.resample.
+"""
+from __future__ import annotations
+import os, time
+import pandas as pd
+
+from .http_client import http_get
+from .single_flight import flight
+from .bar_store import store as _bars
+from .resample import resampled
+
+POLYGON_BASE_URL = os.getenv("POLYGON_BASE_URL", "https://api.polygon.io")
+POLYGON_AGGS_REFRESH_SEC = float(os.getenv("POLYGON_AGGS_REFRESH_SEC", "60"))
+COLS = ["open", "high", "low", "close", "volume"]
+_ADJ_TOL = 5e-4
+_HISTORY_SLACK = pd.Timedelta(days=5)  # weekends/holidays before the first bar
+
+def _api_key(api_key: str | None = None) -> str | None:
+    return api_key or os.getenv("POLYGON_API_KEY") or os.getenv("POLYGON_KEY")
+
+def interval_key(multiplier: int, timespan: str) -> str:
+    return f"poly_{multiplier}{timespan}"
+
+def _ms(ts: pd.Timestamp) -> int:
+    return int(pd.Timestamp(ts).value // 1_000_000)
+
+def _fetch(ticker: str, multiplier: int, timespan: str, start, end, api_key: str) -> pd.DataFrame:
+    """Raw /v2/aggs range call (follows next_url); 'date' is naive UTC."""
+    url = f"{POLYGON_BASE_URL}/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{_ms(start)}/{_ms(end)}"
+    params = {"adjusted": "true", "sort": "asc", "limit": 50000, "apiKey": api_key}
+    rows = []
+    while url:
+        r = http_get(url, params=params, timeout=20); r.raise_for_status()
+        j = r.json() or {}
+        rows += j.get("results") or []
+        url, params = j.get("next_url"), {"apiKey": api_key}
+    if not rows:
+        return pd.DataFrame(columns=["date"] + COLS)
+    df = pd.DataFrame(rows).rename(columns={"o": "open", "h": "high", "l": "low", "c": "close", "v": "volume"})
+    df["date"] = pd.to_datetime(df["t"], unit="ms")
+    return df[["date"] + COLS].sort_values("date").reset_index(drop=True)
+
+def _rebased(cached: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    ov = cached[["date", "close"]].merge(fresh[["date", "close"]], on="date", suffixes=("_old", "_new"))
+    if ov.empty:
+        return True
+    old, new = ov["close_old"].astype(float), ov["close_new"].astype(float)
+    # the newest overlapping bar may still be forming; judge on the completed ones
+    diff = ((old - new).abs() > _ADJ_TOL * new.abs().clip(lower=1e-9)).iloc[:-1]
+    return bool(diff.any())
+
+def _start_path(ticker: str, iv: str):
+    return _bars.path(ticker, iv).with_suffix(".start")
+
+def _asked(ticker: str, iv: str) -> pd.Timestamp | None:
+    """Earliest start a full fetch of this series has asked Polygon for (None if unknown)."""
+    try:
+        return pd.Timestamp(_start_path(ticker, iv).read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+def _write_full(ticker: str, multiplier: int, timespan: str, start: pd.Timestamp, end, api_key: str) -> None:
+    iv = interval_key(multiplier, timespan)
+    df = _fetch(ticker, multiplier, timespan, start, end, api_key)
+    if df.empty:
+        return
+    _bars.write(ticker, df, iv)
+    sp = _start_path(ticker, iv)
+    tmp = sp.with_suffix(".start.tmp")
+    tmp.write_text(start.isoformat())
+    os.replace(tmp, sp)
+
+def _refresh(ticker: str, multiplier: int, timespan: str, start: pd.Timestamp, api_key: str) -> None:
+    iv = interval_key(multiplier, timespan)
+    now = pd.Timestamp.now("UTC").tz_localize(None)
+    dates = _bars.read_arrays(ticker, iv).get("date")
+    asked = _asked(ticker, iv)
+    if dates is None or not len(dates):
+        return _write_full(ticker, multiplier, timespan, start, now, api_key)
+    if (asked is None or asked > start) and pd.Timestamp(dates[0]) > start + _HISTORY_SLACK:
+        # nobody has asked for this much history yet (an earlier ask that came back short is final)
+        return _write_full(ticker, multiplier, timespan, min(start, asked) if asked is not None else start, now, api_key)
+    if (time.time() - _bars.path(ticker, iv).stat().st_mtime) < POLYGON_AGGS_REFRESH_SEC:
+        return
+    last = pd.Timestamp(dates[-1])
+    fresh = _fetch(ticker, multiplier, timespan, last, now, api_key)
+    if fresh.empty:
+        os.utime(_bars.path(ticker, iv))
+    elif _rebased(_bars.read(ticker, iv, start=last), fresh):
+        first = pd.Timestamp(dates[0]).normalize()
+        _write_full(ticker, multiplier, timespan, min(start, asked if asked is not None else first), now, api_key)
+    else:
+        _bars.append(ticker, fresh, iv)
+
+def _sync(ticker: str, multiplier: int, timespan: str, start, api_key: str | None) -> tuple[str, pd.Timestamp]:
+    key = _api_key(api_key)
+    if not key:
+        raise RuntimeError("Missing Polygon API key (set POLYGON_API_KEY or POLYGON_KEY in Render).")
+    ticker = ticker.upper().strip()
+    start = pd.Timestamp(start)
+    start = (start.tz_convert("UTC").tz_localize(None) if start.tzinfo else start).normalize()
+    flight.do(("polygon", ticker, multiplier, timespan), _refresh, ticker, multiplier, timespan, start, key)
+    return ticker, start
+
+def _indexed(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=COLS, index=pd.DatetimeIndex([], tz="UTC", name="date"))
+    df["date"] = df["date"].dt.tz_localize("UTC")
+    return df.set_index("date")[COLS]
+
+def get_aggs(ticker: str, multiplier: int, timespan: str, start, api_key: str | None = None) -> pd.DataFrame:
+    """Bars since start (UTC) indexed by tz-aware 'date' with open/high/low/close/volume."""
+    ticker, start = _sync(ticker, multiplier, timespan, start, api_key)
+    return _indexed(_bars.read(ticker, interval_key(multiplier, timespan), start=start))
+
+def get_resampled(ticker: str, multiplier: int, timespan: str, rule: str, start,
+                  api_key: str | None = None) -> pd.DataFrame:
+    """rule-bars (session-aligned) built from the cached multiplier/timespan series; same shape as get_aggs."""
+    ticker, start = _sync(ticker, multiplier, timespan, start, api_key)
+    return _indexed(resampled(ticker, interval_key(multiplier, timespan), rule, start=start))
+
+def as_results(df: pd.DataFrame) -> list[dict]:
+    """Frame from get_aggs back in Polygon's raw results shape (t/o/h/l/c/v)."""
+    t = (df.index.tz_convert("UTC").tz_localize(None).to_numpy(dtype="datetime64[ms]").astype("int64"))
+    return [{"t": int(ts), "o": float(o), "h": float(h), "l": float(l), "c": float(c), "v": float(v)}
+            for ts, o, h, l, c, v in zip(t, df["open"], df["high"], df["low"], df["close"], df["volume"])]
@@ -0,0 +1,122 @@
+"""
+Process-wide quote cache (Streamlit app, FastAPI and worker scripts alike)
+- Keyed by (namespace, normalized symbol); namespaces keep e.g. "last" prices apart from snapshots.
+- TTL per asset class (equity, index, fx, future, crypto), env QUOTE_TTL_<CLASS> in seconds.
+- Stale-while-revalidate: an expired entry younger than ttl + QUOTE_STALE_SEC is returned at once
+  and refreshed on a background thread (one refresh per key at a time).
+- LRU eviction above QUOTE_CACHE_MAX entries; None results are never cached.
+- Concurrent misses for one key go through the single-flight layer.
+- stats() exposes hits / stale hits / misses / refreshes / evictions.
+"""
+from __future__ import annotations
+import os, threading, time, typing as t
+from collections import OrderedDict
+
+from .single_flight import flight
+
+QUOTE_TTL = {
+    "equity": float(os.getenv("QUOTE_TTL_EQUITY", "15")),
+    "index":  float(os.getenv("QUOTE_TTL_INDEX", "15")),
+    "fx":     float(os.getenv("QUOTE_TTL_FX", "30")),
+    "future": float(os.getenv("QUOTE_TTL_FUTURE", "30")),
+    "crypto": float(os.getenv("QUOTE_TTL_CRYPTO", "10")),
+}
+QUOTE_STALE_SEC = float(os.getenv("QUOTE_STALE_SEC", "120"))
+QUOTE_CACHE_MAX = int(os.getenv("QUOTE_CACHE_MAX", "5000"))
+
+def normalize(symbol: str) -> str:
+    return str(symbol).strip().upper()
+
+def asset_class(symbol: str) -> str:
+    s = normalize(symbol)
+    if s.startswith("^"):
+        return "index"
+    if s.endswith("=X"):
+        return "fx"
+    if s.endswith("=F"):
+        return "future"
+    if s.endswith(("-USD", "-USDT", "-EUR")) or s.startswith(("X:", "BTC", "ETH")):
+        return "crypto"
+    return "equity"
+
+class QuoteCache:
+    def __init__(self, max_entries: int = QUOTE_CACHE_MAX, ttl: dict | None = None,
+                 stale_sec: float = QUOTE_STALE_SEC):
+        self.max_entries = max_entries
+        self.ttl = dict(QUOTE_TTL, **(ttl or {}))
+        self.stale_sec = stale_sec
+        self._data: OrderedDict[tuple, tuple[float, t.Any]] = OrderedDict()  # key -> (stored_at, value)
+        self._refreshing: set[tuple] = set()
+        self._lock = threading.Lock()
+        self.hits = self.stale_hits = self.misses = self.refreshes = self.evictions = 0
+
+    def _ttl(self, sym: str) -> float:
+        return self.ttl.get(asset_class(sym), self.ttl["equity"])
+
+    def put(self, symbol: str, value, ns: str = "last") -> None:
+        if value is None:
+            return
+        key = (ns, normalize(symbol))
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def peek(self, symbol: str, ns: str = "last"):
+        """Cached value regardless of age (None if absent); does not count as a hit."""
+        with self._lock:
+            hit = self._data.get((ns, normalize(symbol)))
+        return hit[1] if hit else None
+
+    def get(self, symbol: str, fetch: t.Callable[[str], t.Any], ns: str = "last"):
+        """Cached value for symbol, calling fetch(symbol) on a miss; stale values refresh in background."""
+        sym = normalize(symbol)
+        key = (ns, sym)
+        ttl = self._ttl(sym)
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                age = time.monotonic() - hit[0]
+                if age <= ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return hit[1]
+                if age <= ttl + self.stale_sec:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                    return hit[1]
+            self.misses += 1
+        value = flight.do(("quote", ns, sym), fetch, sym)  # concurrent misses share one fetch
+        self.put(sym, value, ns)
+        return value
+
+    def _refresh(self, key: tuple, fetch: t.Callable[[str], t.Any]) -> None:
+        ns, sym = key
+        try:
+            self.put(sym, fetch(sym), ns)
+            with self._lock:
+                self.refreshes += 1
+        except Exception:
+            pass  # keep serving the stale value until it ages out
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {"entries": len(self._data), "hits": self.hits, "stale_hits": self.stale_hits,
+                    "misses": self.misses, "refreshes": self.refreshes, "evictions": self.evictions,
+                    "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0}
+
+# process-wide instance
+quote_cache = QuoteCache()
@@ -0,0 +1,58 @@
+"""
+Shared Yahoo Finance access for quote and history helpers
+- download() is yf.download behind the single-flight layer: concurrent requests for the
+  same (tickers, period/start/end, interval, adjust) wait on one download and share it.
+- quote_snapshot(tickers) answers last / prev_close / pct for many tickers from one
+  batched daily download (the live session's bar carries the latest price).
+"""
+from __future__ import annotations
+import math, typing as t
+
+from .single_flight import flight
+from .quote_cache import quote_cache
+
+def _key(tickers, kw: dict) -> tuple:
+    syms = (tickers,) if isinstance(tickers, str) else tuple(tickers)
+    return ("yf",) + tuple(s.upper() for s in syms) + tuple(sorted((k, str(v)) for k, v in kw.items()))
+
+def download(tickers: str | t.Sequence[str], **kw):
+    """yf.download(tickers, **kw) with in-flight coalescing (progress bar always off)."""
+    import yfinance as yf
+    kw.setdefault("progress", False)
+    return flight.do(_key(tickers, kw), yf.download, tickers, **kw)
+
+def _num(x) -> float | None:
+    try:
+        x = float(x)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(x) else x
+
+def quote_snapshot(tickers: t.Iterable[str], period: str = "5d") -> dict[str, dict]:
+    """{ticker: {"last", "prev_close", "pct"}} from a single yf.download; missing values are None."""
+    syms = list(dict.fromkeys(s for s in tickers if s))
+    out = {s: {"last": None, "prev_close": None, "pct": None} for s in syms}
+    if not syms:
+        return out
+    df = download(syms, period=period, interval="1d", auto_adjust=False, group_by="column")
+    if df is None or df.empty or "Close" not in df.columns.get_level_values(0):
+        return out
+    close = df["Close"]
+    cols = {} if close.ndim == 1 else {str(c).upper(): c for c in close.columns}
+    for s in syms:
+        if close.ndim == 1:
+            col = close
+        elif s.upper() in cols:
+            col = close[cols[s.upper()]]
+        else:
+            continue
+        # per-ticker dropna: calendars differ across exchanges in one batched frame
+        col = col.dropna()
+        last = _num(col.iloc[-1]) if len(col) else None
+        prev = _num(col.iloc[-2]) if len(col) >= 2 else None
+        out[s] = {"last": last, "prev_close": prev,
+                  "pct": (last / prev - 1.0) * 100.0 if last is not None and prev else None}
+        # batched pulls warm the shared quote cache for single-symbol lookups
+        quote_cache.put(s, out[s], ns="snapshot")
+        quote_cache.put(s, last)
+    return out
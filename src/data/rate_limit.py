@@ -0,0 +1,125 @@
+"""
+Per-provider token buckets for market-data calls
+- Non-blocking: try_acquire() says yes/no immediately so callers can reroute to the
+  next provider; reserve() books a slot and returns how long to wait (for async/queued use);
+  wait(max_sec) is the bounded blocking fallback when every provider is exhausted (it books
+  the token like reserve(), then sleeps).
+- Limits come from RATE_LIMIT_<PROVIDER>="<calls>/<seconds>", e.g. RATE_LIMIT_POLYGON="5/60".
+- stats() reports, per provider, how often the limiter granted, rerouted or delayed a call.
+"""
+from __future__ import annotations
+import os, threading, time
+
+# calls / seconds; burst capacity equals the call budget of one window ("0/1" = unlimited)
+DEFAULT_LIMITS = {
+    "polygon":  "300/60",
+    "yfinance": "120/60",
+    "eodhd":    "1000/60",
+}
+
+def _parse(spec: str) -> tuple[float, float]:
+    calls, _, secs = str(spec).partition("/")
+    calls, secs = float(calls), float(secs or 1)
+    return calls / secs, calls
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)          # tokens per second (0 = unlimited)
+        self.capacity = float(capacity)  # burst size
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.rejected = 0
+        self.delayed = 0
+        self.delay_sec = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.rate <= 0:
+            self.tokens = self.capacity
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, n: float = 1.0) -> bool:
+        """Take n tokens if available right now; never blocks."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.rate <= 0 or self.tokens >= n:
+                self.tokens -= n
+                self.granted += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def wait_time(self, n: float = 1.0) -> float:
+        """Seconds until n tokens would be available (0 if now)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return 0.0 if self.tokens >= n or self.rate <= 0 else (n - self.tokens) / self.rate
+
+    def wait(self, max_sec: float, n: float = 1.0) -> bool:
+        """Take n tokens, sleeping until they are due if that is within max_sec (the delay is counted).
+
+        The tokens are booked under the lock before sleeping, as reserve() does, so concurrent
+        waiters queue behind each other instead of all waking up to the same token. On True the
+        caller owns the tokens and must not try_acquire() again.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.rate <= 0:
+                self.granted += 1
+                return True
+            w = 0.0 if self.tokens >= n else (n - self.tokens) / self.rate
+            if w > max_sec:
+                return False
+            self.tokens -= n
+            self.granted += 1
+            if w > 0:
+                self.delayed += 1
+                self.delay_sec += w
+        if w > 0:
+            time.sleep(w)
+        return True
+
+    def reserve(self, n: float = 1.0) -> float:
+        """Book n tokens (the bucket may go into debt) and return the delay before using them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.granted += 1
+            if self.rate <= 0:
+                return 0.0
+            self.tokens -= n
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            if wait > 0:
+                self.delayed += 1
+                self.delay_sec += wait
+            return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.granted + self.rejected
+            return {"rate_per_sec": round(self.rate, 4), "capacity": self.capacity,
+                    "tokens": round(max(self.tokens, 0.0), 2), "granted": self.granted,
+                    "rerouted": self.rejected, "delayed": self.delayed,
+                    "delay_sec": round(self.delay_sec, 3),
+                    "limited_pct": round(100.0 * (self.rejected + self.delayed) / total, 2) if total else 0.0}
+
+_buckets: dict[str, TokenBucket] = {}
+_guard = threading.Lock()
+
+def limiter(provider: str) -> TokenBucket:
+    """Shared bucket for a provider (created from env/defaults on first use)."""
+    key = provider.lower()
+    with _guard:
+        b = _buckets.get(key)
+        if b is None:
+            spec = os.getenv(f"RATE_LIMIT_{key.upper()}", DEFAULT_LIMITS.get(key, "0/1"))
+            rate, cap = _parse(spec)
+            b = _buckets[key] = TokenBucket(rate, cap)
+        return b
+
+def stats() -> dict[str, dict]:
+    with _guard:
+        names = list(_buckets)
+    return {n: limiter(n).stats() for n in names}
@@ -1,3 +1,8 @@
+from __future__ import annotations
+from pathlib import Path
+
+import yaml
+
 USA = ["SPY","QQQ","IWM","DIA","AAPL","MSFT","AMZN","NVDA"]
 CANADA = ["XIC.TO","ZEB.TO","HPR.TO","ZPR.TO","RUS.TO"]
 MEX_LATAM = ["KOF","FMX","PBR","VALE","ITUB"]
@@ -10,3 +15,25 @@ REGIONS = {
     "APAC": APAC,
     "Europe": EUROPE,
 }
+
+
+# ---- config/regions.yaml regions (screens, scores, liquidity tables) ----
+REGIONS_YAML = Path(__file__).resolve().parents[2] / "config" / "regions.yaml"
+
+# config/regions.yaml region -> bar-store exchange suffixes (data.resample.exchange_of)
+REGION_EXCHANGES = {"US": {"US"}, "CA": {"TO"}, "TSXV": {"V"}, "MX": {"MX"}, "JP": {"T"}, "AU": {"AX"},
+                    "HK": {"HK"}, "UK": {"L"}, "EU": {"DE", "F", "PA", "AS", "SW"}}
+
+# sweep aliases (scripts/vega_unisearch_runner.py --region US CA MX EU APAC)
+REGION_GROUPS = {"APAC": ["JP", "AU", "HK"]}
+
+def load_regions(path: Path = REGIONS_YAML) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+def region_symbols(region: str, interval: str = "D", store=None) -> list[str]:
+    """Stored symbols whose exchange belongs to a config/regions.yaml region."""
+    from .bar_store import store as _bars
+    from .resample import exchange_of
+    exchanges = REGION_EXCHANGES.get(region, {region})
+    return [s for s in (store or _bars).symbols(interval) if exchange_of(s) in exchanges]
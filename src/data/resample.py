@@ -0,0 +1,95 @@
+"""
+Higher-timeframe bars derived locally from the bar store
+- OHLCV aggregation: open first, high max, low min, close/adjusted_close last, volume sum.
+- Intraday rules (e.g. "1h" from 15m) are aligned to each exchange's session open in its
+  own timezone (US hours start at 09:30 ET, not on the clock hour); bars are labelled by bin start.
+- "W" and "M" from daily bars use calendar weeks (Mon–Fri) / months, labelled with the
+  first session in the bucket (as Yahoo does for 1wk/1mo).
+- resampled() caches the derived series in the store as "<base>@<rule>"; the cached file is
+  stamped with the base file's mtime and rebuilt whenever the base has changed since.
+"""
+from __future__ import annotations
+import os
+import pandas as pd
+
+from .bar_store import store as _bars, BarStore
+from .single_flight import flight
+
+# exchange -> (timezone, regular session open)
+SESSIONS = {
+    "US": ("America/New_York", "09:30"),
+    "TO": ("America/Toronto", "09:30"),
+    "V":  ("America/Toronto", "09:30"),
+    "MX": ("America/Mexico_City", "08:30"),
+    "SA": ("America/Sao_Paulo", "10:00"),
+    "L":  ("Europe/London", "08:00"),
+    "DE": ("Europe/Berlin", "09:00"),
+    "F":  ("Europe/Berlin", "09:00"),
+    "PA": ("Europe/Paris", "09:00"),
+    "AS": ("Europe/Amsterdam", "09:00"),
+    "SW": ("Europe/Zurich", "09:00"),
+    "T":  ("Asia/Tokyo", "09:00"),
+    "HK": ("Asia/Hong_Kong", "09:30"),
+    "AX": ("Australia/Sydney", "10:00"),
+    "NS": ("Asia/Kolkata", "09:15"),
+    "BO": ("Asia/Kolkata", "09:15"),
+}
+_PREFIXES = {"NASDAQ": "US", "NYSE": "US", "AMEX": "US", "ARCA": "US", "BATS": "US",
+             "TSX": "TO", "TSXV": "V", "BMV": "MX", "LSE": "L", "XETR": "DE", "TSE": "T", "HKEX": "HK", "ASX": "AX"}
+_ALIASES = {"TSX": "TO", "LSE": "L", "XETRA": "DE", "AU": "AX", "LON": "L"}
+
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "adjusted_close": "last", "volume": "sum"}
+CALENDAR = {"W": "W-FRI", "M": "ME"}
+
+def exchange_of(symbol: str) -> str:
+    """NASDAQ:QQQ -> US, RY.TO -> TO, SHOP -> US."""
+    s = str(symbol).upper()
+    if ":" in s:
+        return _PREFIXES.get(s.split(":", 1)[0], "US")
+    if "." in s:
+        ex = s.rsplit(".", 1)[1]
+        ex = _ALIASES.get(ex, ex)
+        return ex if ex in SESSIONS else "US"
+    return "US"
+
+def resample_bars(df: pd.DataFrame, rule: str, exchange: str = "US") -> pd.DataFrame:
+    """Aggregate a bar frame with a 'date' column (naive UTC for intraday) to rule ("1h", "W", "M", ...)."""
+    if df.empty:
+        return df.copy()
+    agg = {c: f for c, f in AGG.items() if c in df.columns}
+    d = df.set_index(pd.DatetimeIndex(df["date"])).sort_index()
+    if rule in CALENDAR:
+        d = d.assign(_first=d.index)
+        out = d.resample(CALENDAR[rule]).agg({**agg, "_first": "first"}).dropna(subset=["open"])
+        out = out.set_index("_first").rename_axis("date")
+    else:
+        tz, open_ = SESSIONS.get(exchange, SESSIONS["US"])
+        step = pd.Timedelta(rule)
+        offset = pd.Timedelta(f"{open_}:00") % step
+        local = d[list(agg)].tz_localize("UTC").tz_convert(tz)
+        out = local.resample(step, offset=offset, origin="start_day").agg(agg).dropna(subset=["open"])
+        out.index = out.index.tz_convert("UTC").tz_localize(None).rename("date")
+    if "volume" in out.columns:
+        out["volume"] = out["volume"].astype("int64")
+    return out.reset_index()
+
+def _build(symbol: str, base_interval: str, rule: str, exchange: str, store: BarStore) -> None:
+    target = f"{base_interval}@{rule}"
+    base_path = store.path(symbol, base_interval)
+    stamp = base_path.stat().st_mtime_ns
+    out = resample_bars(store.read(symbol, base_interval), rule, exchange)
+    tp = store.write(symbol, out, target)
+    os.utime(tp, ns=(stamp, stamp))
+
+def resampled(symbol: str, base_interval: str, rule: str, exchange: str | None = None,
+              start=None, store: BarStore = _bars) -> pd.DataFrame:
+    """rule-bars for symbol derived from its stored base_interval bars (no network)."""
+    base_path = store.path(symbol, base_interval)
+    if not base_path.exists():
+        return pd.DataFrame(columns=["date"])
+    target = f"{base_interval}@{rule}"
+    tp = store.path(symbol, target)
+    if not tp.exists() or tp.stat().st_mtime_ns != base_path.stat().st_mtime_ns:
+        flight.do(("resample", str(store.root), symbol, target), _build, symbol, base_interval, rule,
+                  exchange or exchange_of(symbol), store)
+    return store.read(symbol, target, start=start)
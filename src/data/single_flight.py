@@ -0,0 +1,65 @@
+"""
+Single-flight call coalescing
+- Concurrent calls with the same key wait on one in-flight call and share its result
+  (or its exception); nothing is cached once the call returns.
+- When a call was shared, every caller gets its own copy of DataFrame/Series results.
+- stats() reports leaders (real provider calls) vs. followers (calls saved).
+"""
+from __future__ import annotations
+import threading, typing as t
+
+class _Call:
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+def _share(value):
+    copy = getattr(value, "copy", None)
+    return copy() if callable(copy) and hasattr(value, "shape") else value
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[t.Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: t.Hashable, fn: t.Callable, *args, **kwargs):
+        """Run fn(*args, **kwargs) once per key among concurrent callers."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _share(call.value)
+        try:
+            call.value = fn(*args, **kwargs)
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        # followers copy call.value; the leader keeps it only if nobody else is reading it
+        return _share(call.value) if call.waiters else call.value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._calls)}
+
+# process-wide instance shared by the provider helpers
+flight = SingleFlight()
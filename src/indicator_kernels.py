@@ -0,0 +1,284 @@
+"""
+NumPy indicator kernels shared by datafeed, indicators, the indicator panel, scan rules,
+the hedging engine, the market snapshot and universe panels (data.panel).
+- Inputs are 1D (time) or 2D (time x symbols) arrays; pandas Series/DataFrames are accepted
+  and returned with the same index/columns.
+- Results match the pandas formulas they replace (ewm(adjust=False), rolling(n).mean(), ...).
+- Exponential smoothers and the Heikin-Ashi open are first-order linear recurrences, solved
+  blockwise with cumulative sums: no per-bar Python loop.
+- Values after the first valid one are expected to be NaN-free (gaps are forward-filled).
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+_MAX_SCALE = 230.0  # ln(1e100): largest growth of the per-block scaling factor
+
+def _arr(x) -> np.ndarray:
+    return np.asarray(x.to_numpy(dtype=float) if isinstance(x, (pd.Series, pd.DataFrame)) else x, dtype=float)
+
+def _wrap(like, out: np.ndarray):
+    if isinstance(like, pd.Series):
+        return pd.Series(out, index=like.index, name=like.name)
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(out, index=like.index, columns=like.columns)
+    return out
+
+def _first_valid(x: np.ndarray) -> np.ndarray:
+    """Index of the first non-NaN row per column (len(x) when all NaN)."""
+    ok = ~np.isnan(x)
+    return np.where(ok.any(axis=0), ok.argmax(axis=0), len(x))
+
+def _ffill(x: np.ndarray) -> np.ndarray:
+    mask = np.isnan(x)
+    if not mask.any():
+        return x
+    idx = np.where(mask, 0, np.arange(len(x)).reshape((-1,) + (1,) * (x.ndim - 1)))
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(x, idx, axis=0)
+
+def linear_recurrence(b: np.ndarray, decay: float) -> np.ndarray:
+    """y[0] = b[0], y[t] = decay * y[t-1] + b[t] along axis 0."""
+    b = np.asarray(b, dtype=float)
+    n = len(b)
+    if n == 0 or decay == 0:
+        return b.copy()
+    step = int(_MAX_SCALE / -np.log(decay)) if 0 < decay < 1 else n
+    step = max(1, min(n, step))
+    shape = (-1,) + (1,) * (b.ndim - 1)
+    y = np.empty_like(b)
+    carry = np.zeros(b.shape[1:])
+    for s in range(0, n, step):
+        blk = b[s:s + step]
+        # within a block: y[k] = decay^k * (decay * carry + sum_{j<=k} b[j] * decay^-j)
+        p = np.power(decay, -np.arange(len(blk), dtype=float)).reshape(shape)
+        y[s:s + step] = (decay * carry + np.cumsum(blk * p, axis=0)) / p
+        carry = y[s + len(blk) - 1]
+    return y
+
+def ewm(x, alpha: float, min_periods: int = 0):
+    """pandas x.ewm(alpha=alpha, adjust=False).mean() (leading NaNs skipped per column)."""
+    a = _ffill(_arr(x))
+    first = _first_valid(a)
+    t = np.arange(len(a)).reshape((-1,) + (1,) * (a.ndim - 1))
+    b = np.where(t == first, a, alpha * a)
+    b = np.where(t < first, 0.0, b)
+    y = linear_recurrence(b, 1.0 - alpha)
+    y[t < first + max(min_periods, 1) - 1] = np.nan
+    y[t < first] = np.nan
+    return _wrap(x, y)
+
+def ema(x, span: int, min_periods: int = 0):
+    """x.ewm(span=span, adjust=False, min_periods=min_periods).mean()"""
+    return ewm(x, 2.0 / (span + 1.0), min_periods)
+
+def sma(x, n: int):
+    """x.rolling(n).mean(): NaN until n values, NaN while the window holds a NaN."""
+    a = _arr(x)
+    out = np.full(a.shape, np.nan)
+    if len(a) < n:
+        return _wrap(x, out)
+    flat = a.reshape(len(a), -1)
+    base = flat[_first_valid(flat).clip(max=len(a) - 1), np.arange(flat.shape[1])]
+    base = np.nan_to_num(base).reshape(a.shape[1:])
+    centered = np.nan_to_num(a - base)  # subtracting a level keeps the running sums small
+    cs = np.cumsum(np.concatenate([np.zeros((1,) + a.shape[1:]), centered]), axis=0)
+    nans = np.cumsum(np.concatenate([np.zeros((1,) + a.shape[1:]), np.isnan(a)]), axis=0)
+    win = (cs[n:] - cs[:-n]) / n + base
+    out[n - 1:] = np.where(nans[n:] - nans[:-n] > 0, np.nan, win)
+    return _wrap(x, out)
+
+def stdev(x, n: int, ddof: int = 1):
+    """x.rolling(n).std(ddof): running sums of the level-shifted values and their squares."""
+    a = _arr(x)
+    out = np.full(a.shape, np.nan)
+    if len(a) < n or n <= ddof:
+        return _wrap(x, out)
+    flat = a.reshape(len(a), -1)
+    base = np.nan_to_num(flat[_first_valid(flat).clip(max=len(a) - 1), np.arange(flat.shape[1])]).reshape(a.shape[1:])
+    centered = np.nan_to_num(a - base)
+    zero = np.zeros((1,) + a.shape[1:])
+    s1 = np.cumsum(np.concatenate([zero, centered]), axis=0)
+    s2 = np.cumsum(np.concatenate([zero, centered * centered]), axis=0)
+    nans = np.cumsum(np.concatenate([zero, np.isnan(a)]), axis=0)
+    w1, w2 = s1[n:] - s1[:-n], s2[n:] - s2[:-n]
+    var = np.clip((w2 - w1 * w1 / n) / (n - ddof), 0.0, None)
+    out[n - 1:] = np.where(nans[n:] - nans[:-n] > 0, np.nan, np.sqrt(var))
+    return _wrap(x, out)
+
+def rolling_slope(x, n: int):
+    """Least-squares slope of the last n values against 0..n-1, per row (NaN while the window holds a NaN).
+
+    Closed form from running sums of y and k*y: slope = (sum k*y - (t - (n-1)/2) * sum y) / Sxx.
+    """
+    a = _arr(x)
+    out = np.full(a.shape, np.nan)
+    if len(a) < n or n < 2:
+        return _wrap(x, out)
+    flat = a.reshape(len(a), -1)
+    base = np.nan_to_num(flat[_first_valid(flat).clip(max=len(a) - 1), np.arange(flat.shape[1])]).reshape(a.shape[1:])
+    centered = np.nan_to_num(a - base)
+    k = np.arange(len(a), dtype=float).reshape((-1,) + (1,) * (a.ndim - 1))
+    zero = np.zeros((1,) + a.shape[1:])
+    s0 = np.cumsum(np.concatenate([zero, centered]), axis=0)
+    s1 = np.cumsum(np.concatenate([zero, k * centered]), axis=0)
+    nans = np.cumsum(np.concatenate([zero, np.isnan(a)]), axis=0)
+    w0, w1 = s0[n:] - s0[:-n], s1[n:] - s1[:-n]
+    sxx = n * (n * n - 1) / 12.0
+    slope = (w1 - (k[n - 1:] - (n - 1) / 2.0) * w0) / sxx
+    out[n - 1:] = np.where(nans[n:] - nans[:-n] > 0, np.nan, slope)
+    return _wrap(x, out)
+
+def _rolling(a: np.ndarray, n: int, reduce) -> np.ndarray:
+    out = np.full(a.shape, np.nan)
+    if len(a) >= n:
+        out[n - 1:] = reduce(np.lib.stride_tricks.sliding_window_view(a, n, axis=0), axis=-1)
+    return out
+
+def rolling_max(x, n: int):
+    """x.rolling(n).max() (NaN while the window holds a NaN)."""
+    return _wrap(x, _rolling(_arr(x), n, np.max))
+
+def rolling_min(x, n: int):
+    """x.rolling(n).min() (NaN while the window holds a NaN)."""
+    return _wrap(x, _rolling(_arr(x), n, np.min))
+
+def rolling_max_drawdown(x, n: int):
+    """Worst peak-to-trough change inside each n-row window, x_j / max(x_i..x_j) - 1 (<= 0).
+
+    Blockwise in O(len): rows are cut into blocks of n, so a window is a block suffix plus the
+    next block's prefix. Running max/min/drawdown of every suffix and prefix come from
+    accumulate scans; a window combines the two sides and the suffix-peak-to-prefix-trough drop.
+    """
+    a = _arr(x)
+    out = np.full(a.shape, np.nan)
+    t = len(a)
+    if t < n or n < 1:
+        return _wrap(x, out)
+    flat = a.reshape(t, -1)
+    nb = -(-t // n)
+    blocks = np.concatenate([flat, np.full((nb * n - t, flat.shape[1]), np.nan)]).reshape(nb, n, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pmin = np.fmin.accumulate(blocks, axis=1)
+        pmdd = np.fmin.accumulate(blocks / np.fmax.accumulate(blocks, axis=1) - 1.0, axis=1)
+        rev = blocks[:, ::-1]
+        smin = np.fmin.accumulate(rev, axis=1)[:, ::-1]
+        smax = np.fmax.accumulate(rev, axis=1)[:, ::-1]
+        smdd = np.fmin.accumulate((smin / blocks - 1.0)[:, ::-1], axis=1)[:, ::-1]
+        pmin, pmdd, smax, smdd = (v.reshape(nb * n, -1) for v in (pmin, pmdd, smax, smdd))
+        e = np.arange(n - 1, t)
+        s = e - n + 1
+        mdd = np.minimum(np.minimum(smdd[s], pmdd[e]), pmin[e] / smax[s] - 1.0)
+    aligned = s % n == 0  # window is exactly one block
+    mdd[aligned] = smdd[s[aligned]]
+    nans = np.cumsum(np.concatenate([np.zeros((1, flat.shape[1])), np.isnan(flat)]), axis=0)
+    out.reshape(t, -1)[n - 1:] = np.where(nans[n:] - nans[:-n] > 0, np.nan, mdd)
+    return _wrap(x, out)
+
+def roc(x, n: int):
+    """Rate of change in percent: 100 * (x / x.shift(n) - 1)."""
+    a = _arr(x)
+    out = np.full(a.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[n:] = 100.0 * (a[n:] / a[:-n] - 1.0)
+    return _wrap(x, out)
+
+def _wma_block(a: np.ndarray, n: int) -> np.ndarray:
+    flat = a.reshape(len(a), -1)
+    base = np.nan_to_num(flat[_first_valid(flat).clip(max=len(a) - 1), np.arange(flat.shape[1])]).reshape(a.shape[1:])
+    centered = np.nan_to_num(a - base)  # weights sum to the divisor, so the level adds back unchanged
+    k = np.arange(len(a), dtype=float).reshape((-1,) + (1,) * (a.ndim - 1))
+    zero = np.zeros((1,) + a.shape[1:])
+    s0 = np.cumsum(np.concatenate([zero, centered]), axis=0)
+    s1 = np.cumsum(np.concatenate([zero, k * centered]), axis=0)
+    nans = np.cumsum(np.concatenate([zero, np.isnan(a)]), axis=0)
+    w0, w1 = s0[n:] - s0[:-n], s1[n:] - s1[:-n]
+    win = (w1 - (k[n - 1:] - n) * w0) / (n * (n + 1) / 2.0) + base
+    return np.where(nans[n:] - nans[:-n] > 0, np.nan, win)
+
+def wma(x, n: int):
+    """Linearly weighted moving average (newest bar weight n), NaN while the window holds a NaN.
+
+    Running sums as in rolling_slope: WMA_t = (sum k*y - (t - n) * sum y) / (n(n+1)/2). The sums
+    restart every 4n rows (blocks overlap by n - 1): the cumulative k*y grows with the square of the
+    block length, so short blocks keep the difference at full precision on long histories.
+    """
+    a = _arr(x)
+    out = np.full(a.shape, np.nan)
+    if len(a) < n or n < 1:
+        return _wrap(x, out)
+    step = max(4 * n, 128)
+    for lo in range(0, len(a) - n + 1, step):
+        seg = a[lo:lo + step + n - 1]
+        out[lo + n - 1:lo + len(seg)] = _wma_block(seg, n)
+    return _wrap(x, out)
+
+def hull(x, n: int = 55):
+    """Hull MA: WMA(2 * WMA(x, n/2) - WMA(x, n), sqrt(n))."""
+    a = _arr(x)
+    out = wma(2.0 * wma(a, int(n / 2)) - wma(a, n), int(np.sqrt(n)))
+    return _wrap(x, out)
+
+def true_range(high, low, close):
+    """max(h - l, |h - prev close|, |l - prev close|); first bar is h - l."""
+    h, l, c = _arr(high), _arr(low), _arr(close)
+    pc = np.concatenate([np.full((1,) + c.shape[1:], np.nan), c[:-1]])
+    with np.errstate(invalid="ignore"):
+        tr = np.fmax(h - l, np.fmax(np.abs(h - pc), np.abs(l - pc)))
+    return _wrap(close, tr)
+
+def atr(high, low, close, n: int = 14, smoothing: str = "sma"):
+    """Average true range: rolling mean of TR ("sma") or Wilder's RMA ("wilder")."""
+    tr = true_range(high, low, close)
+    return sma(tr, n) if smoothing == "sma" else ewm(tr, 1.0 / n)
+
+def adx(high, low, close, n: int = 14):
+    """Wilder's ADX: RMA-smoothed +DM/-DM over RMA(TR) -> DX, then RMA(DX); NaN for the first 2n - 1 bars."""
+    h, l = _arr(high), _arr(low)
+    tr = _arr(true_range(high, low, close)).copy()
+    lead = np.full((1,) + h.shape[1:], np.nan)
+    up = np.concatenate([lead, np.diff(h, axis=0)])
+    dn = np.concatenate([lead, -np.diff(l, axis=0)])
+    with np.errstate(invalid="ignore"):
+        pdm = np.where(np.isnan(up), np.nan, np.where((up > dn) & (up > 0), up, 0.0))
+        mdm = np.where(np.isnan(dn), np.nan, np.where((dn > up) & (dn > 0), dn, 0.0))
+    tr[:1] = np.nan  # align with the directional moves, which start on the second bar
+    str_ = ewm(tr, 1.0 / n, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pdi = 100.0 * ewm(pdm, 1.0 / n, n) / str_
+        mdi = 100.0 * ewm(mdm, 1.0 / n, n) / str_
+        dx = 100.0 * np.abs(pdi - mdi) / (pdi + mdi)
+    dx = np.where(np.isfinite(dx), dx, np.where(np.isnan(pdi), np.nan, 0.0))
+    return _wrap(close, ewm(dx, 1.0 / n, n))
+
+def rsi(close, n: int = 14, smoothing: str = "wilder", loss_floor: float | None = None):
+    """RSI from gains/losses smoothed by Wilder's RMA ("wilder") or a rolling mean ("sma").
+
+    loss_floor=None leaves RSI NaN where the average loss is 0; a number replaces zero losses.
+    """
+    c = _arr(close)
+    d = np.concatenate([np.full((1,) + c.shape[1:], np.nan), np.diff(c, axis=0)])
+    if smoothing == "sma":
+        # delta.where(delta > 0, 0.0): the leading NaN diff counts as a zero move
+        gain, loss = np.where(d > 0, d, 0.0), np.where(d < 0, -d, 0.0)
+        ag, al = sma(gain, n), sma(loss, n)
+    else:
+        gain, loss = np.clip(d, 0, None), np.clip(-d, 0, None)
+        ag, al = ewm(gain, 1.0 / n), ewm(loss, 1.0 / n)
+    al = np.where(al == 0, np.nan if loss_floor is None else loss_floor, al)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + ag / al)
+    return _wrap(close, out)
+
+def heikin_ashi(open_, high, low, close):
+    """(ha_open, ha_high, ha_low, ha_close); ha_open[t] = (ha_open[t-1] + ha_close[t-1]) / 2."""
+    o, h, l, c = _arr(open_), _arr(high), _arr(low), _arr(close)
+    ha_close = (o + h + l + c) / 4.0
+    if not len(o):
+        return tuple(_wrap(close, a) for a in (o, h, l, ha_close))
+    # y[t] = 0.5 * y[t-1] + 0.5 * ha_close[t-1], seeded with (open[0] + close[0]) / 2
+    b = np.concatenate([(o[:1] + c[:1]) / 2.0, 0.5 * ha_close[:-1]])
+    ha_open = linear_recurrence(b, 0.5)
+    ha_high = np.fmax(h, np.fmax(ha_open, ha_close))
+    ha_low = np.fmin(l, np.fmin(ha_open, ha_close))
+    return tuple(_wrap(close, a) for a in (ha_open, ha_high, ha_low, ha_close))
@@ -0,0 +1,324 @@
+"""
+Vectorized backtests over the bar store (modules/backtest_mode)
+- Scanner siblings are imported relatively, so the engine also loads as src.modules.backtest.engine
+  from the repo-root Streamlit pages, where the root `modules` package shadows src/modules.
+- Entry/exit signals are (dates x symbols) bool matrices on a data.panel.Panel:
+  screen_signals() evaluates a compiled rulepack Screen at every row, regime_signals() is
+  stay_get.engine.decide over SPY/QQQ closes and snapshot_decisions() is the market_snapshot
+  decision_rule over the whole panel.
+- HistoryUniverse is a rulepacks Universe whose tail(name, n) returns a zero-copy lag view of
+  shape (n, dates, symbols), so the filters that read the last rows of a scan read every row.
+  Per-symbol fields (VectorVest snapshot, latest scores) are constant over history unless
+  `history` supplies dated frames (modules.scanner.scores.score_history()).
+- simulate(): a signal on the close of bar t fills at the open of t+1, the stop sits stop_atr x
+  ATR14 (at t) below the fill and the target min_rr x that risk above it (3:1 from
+  config/vega/settings.yaml). A bar touching both is a stop; a gap through a level fills at the
+  open. Exit signals close at the next open, max_hold closes at the close of the last bar.
+  Only a symbol's own bars count: rows the panel forward-filled (it did not trade) never touch
+  a level, fill an exit or add to max_hold / "bars".
+- One position per symbol at a time. Trades are resolved one round at a time for all symbols
+  (each round scans forward in blocks of bars), so loops run per trade round, never per bar.
+- Open trades are marked to the close in R (risk units); every trade risks risk_per_trade_pct
+  of the starting capital (no compounding), so the equity curve is the sum over symbols.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+import indicator_kernels as ik
+from data.panel import Panel
+from data.bar_store import store as _bars, BarStore
+from ..scanner.rulepacks import Screen, Universe, compile_rulepack, load_rulepacks, load_universe
+
+ROOT = Path(__file__).resolve().parents[3]
+SETTINGS_YAML = ROOT / "config" / "vega" / "settings.yaml"
+
+STOP_ATR = 2.0        # stop distance in ATR14 multiples
+CAPITAL = 100_000.0
+BLOCK = 64            # bars scanned per step when looking for the stop/target touch
+REASONS = np.array(["", "stop", "target", "signal", "time", "open"])
+TRADE_COLUMNS = ["symbol", "signal_date", "entry_date", "entry", "stop", "target",
+                 "exit_date", "exit", "reason", "bars", "r", "ret"]
+
+def load_risk_rules(path: Path = SETTINGS_YAML) -> dict:
+    """risk_rules from the cockpit settings (min_rr, risk_per_trade_pct), with the house defaults."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = (yaml.safe_load(f) or {}).get("risk_rules") or {}
+    except OSError:
+        rules = {}
+    return {"min_rr": float(rules.get("min_rr", 3.0)), "risk_per_trade_pct": float(rules.get("risk_per_trade_pct", 0.5))}
+
+# ---- signals: rulepack screens ----------------------------------------------------
+def _lags(a: np.ndarray, n: int) -> np.ndarray:
+    """(n, dates, symbols) view: [k][t] = a[t - (n - 1 - k)], NaN before the first row."""
+    pad = np.concatenate([np.full((n - 1,) + a.shape[1:], np.nan), a]) if n > 1 else a
+    return np.moveaxis(np.lib.stride_tricks.sliding_window_view(pad, n, axis=0), -1, 0)
+
+_HISTORY_BUILTINS = {
+    "price": lambda p: p["close"],
+    "avg_vol_30d": lambda p: p["sma30_volume"],
+    "dollar_turnover_30d": lambda p: ik.sma(p["close"] * p["volume"], 30),
+}
+
+class HistoryUniverse(Universe):
+    """Universe whose values and filter masks are (dates x symbols): every row is an as-of scan."""
+
+    def __init__(self, panel: Panel, fields: pd.DataFrame | None = None, region: str = "US",
+                 settings: dict | None = None, watchlists: dict[str, set] | None = None,
+                 history: dict[str, pd.DataFrame] | None = None):
+        super().__init__(panel, fields, region, settings, watchlists)
+        self.history = {k: v for k, v in (history or {}).items() if v is not None and len(v)}
+
+    @classmethod
+    def load(cls, region: str = "US", symbols: list[str] | None = None, fields: pd.DataFrame | None = None,
+             start=None, store: BarStore = _bars, watchlists: dict[str, set] | None = None,
+             history: dict[str, pd.DataFrame] | None = None) -> "HistoryUniverse":
+        """load_universe() for backtests; history defaults to the region's stored score history."""
+        from ..scanner.scores import score_history
+        u = load_universe(region, symbols, fields, start, store, watchlists, prefilter=False)  # today's liquidity is look-ahead
+        return cls(u.panel, u.fields, region, watchlists=watchlists,
+                   history=score_history(region) if history is None else history)
+
+    def tail(self, name: str, n: int) -> np.ndarray:
+        return _lags(self.panel[name], n)
+
+    def has(self, name: str) -> bool:
+        return name in self.history or super().has(name)
+
+    def value(self, name: str) -> np.ndarray:
+        """Per-row values: dated history frames, fields (constant per symbol), built-ins, panel columns."""
+        if name in self._values:
+            return self._values[name]
+        if name in self.history:
+            h = self.history[name]
+            v = h.reindex(columns=self.symbols).reindex(self.panel.dates, method="ffill").to_numpy(dtype=float)
+        elif name in self.fields.columns:
+            v = self.fields[name].to_numpy()
+        elif name in _HISTORY_BUILTINS:
+            v = _HISTORY_BUILTINS[name](self.panel)
+        else:
+            try:
+                v = self.panel[name]
+            except KeyError:
+                self.missing.add(name)
+                v = np.full(len(self.symbols), np.nan)
+        self._values[name] = v
+        return v
+
+def screen_signals(screen: Screen, u: HistoryUniverse, masks: dict[str, np.ndarray | None] | None = None) -> np.ndarray:
+    """(dates x symbols) bool: the screen's filters all pass on that row (top_n ranking is not applied).
+
+    masks, when given, memoizes filter results by Filter.key across screens.
+    """
+    shape = u.panel["close"].shape
+    for k, (_, fn) in screen.derived.items():
+        u.put(k, fn(u))
+    ok = u.panel.valid.copy()
+    for f in screen.filters:
+        if masks is not None and f.key in masks:
+            m = masks[f.key]
+        else:
+            m = f.fn(u)
+            if masks is not None:
+                masks[f.key] = m
+        if m is not None:
+            ok &= np.broadcast_to(m, shape)
+    u.forget(*screen.derived)
+    return ok
+
+def rulepack_signals(u: HistoryUniverse, rules: dict[str, dict] | None = None,
+                     modes: list[str] | None = None) -> dict[str, np.ndarray]:
+    """Screen key -> entry matrix for every selected rulepack screen (shared filter masks)."""
+    rules = rules if rules is not None else load_rulepacks()
+    masks: dict[str, np.ndarray | None] = {}
+    return {s.key: screen_signals(s, u, masks) for r, spec in rules.items() for s in compile_rulepack(r, spec, modes)}
+
+# ---- signals: stay-or-get-back-in and snapshot decisions ------------------------------
+def stay_get_regimes(spy, qqq, t) -> np.ndarray:
+    """stay_get.engine.decide() regimes for arrays of SPY/QQQ closes (NaN = no live input).
+
+    t is a stay_get Triggers (or any object with its four levels; levels may be per-date arrays).
+    """
+    spy, qqq = np.asarray(spy, dtype=float), np.asarray(qqq, dtype=float)
+    live = ~np.isnan(spy) & ~np.isnan(qqq)
+    return np.select([~live, (spy >= t.spy_get_in) & (qqq >= t.qqq_confirm), spy <= t.spy_risk2],
+                     ["WAIT", "GET_BACK_IN", "RISK_OFF"], "WAIT")
+
+def regime_signals(panel: Panel, t, symbols=("SPY",), spy: str = "SPY", qqq: str = "QQQ") -> tuple[np.ndarray, np.ndarray]:
+    """Entries on GET_BACK_IN and exits on RISK_OFF for the traded symbols (other columns stay False)."""
+    close = panel["close"]
+    regime = stay_get_regimes(close[:, panel.symbols.index(spy)], close[:, panel.symbols.index(qqq)], t)
+    entries, exits = np.zeros(close.shape, dtype=bool), np.zeros(close.shape, dtype=bool)
+    cols = [panel.symbols.index(s) for s in symbols if s in panel.symbols]
+    entries[:, cols] = (regime == "GET_BACK_IN")[:, None]
+    exits[:, cols] = (regime == "RISK_OFF")[:, None]
+    return entries, exits
+
+def snapshot_decisions(panel: Panel, bench: str | None = None) -> np.ndarray:
+    """market_snapshot.decision_rule at every row: 1 Trade Today, 0 Wait, -1 Avoid.
+
+    Inputs match build_region(): sma50 slope over 4 bars / 5, rs = roc4 minus the benchmark's
+    roc4, atr_pct only after 20 bars; missing slope/rs count as 0. room_atr is the constant 1.2
+    there, so the room >= 1.0 condition always holds.
+    """
+    close, sma50, sma200, roc4 = panel["close"], panel.sma(50), panel.sma(200), panel.roc(4)
+    slope = np.zeros_like(sma50)
+    slope[4:] = np.nan_to_num((sma50[4:] - sma50[:-4]) / 5.0)
+    b = roc4[:, [panel.symbols.index(bench)]] if bench in panel.symbols else 0.0
+    rs = np.nan_to_num(roc4) - np.nan_to_num(b)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        atrp = np.where(np.cumsum(panel.valid, axis=0) >= 20, panel.atr(14) / close * 100, np.nan)
+        above50, above200 = close > sma50, close > sma200
+        avoid = ~above200 | ((atrp > 3.0) & (rs < 0))
+        trade = above50 & above200 & (slope > 0) & (rs > 0) & (np.isnan(atrp) | (atrp <= 3.0))
+    return np.where(avoid, -1, np.where(trade, 1, 0)).astype(np.int8)
+
+# ---- simulation ---------------------------------------------------------------------
+def _next_true(mask: np.ndarray) -> np.ndarray:
+    """(dates + 1, symbols): first row >= r where mask holds, len(mask) if none."""
+    t = len(mask)
+    out = np.full((t + 1,) + mask.shape[1:], t, dtype=np.int64)
+    idx = np.where(mask, np.arange(t)[:, None], t)
+    out[:t] = np.minimum.accumulate(idx[::-1], axis=0)[::-1]
+    return out
+
+def _first_touch(o, h, l, valid, j, e, lim, stop, target, block: int = BLOCK):
+    """Row, price and reason (1 stop, 2 target) of the first stop/target touch in rows e..lim (-1 if none);
+    only the symbol's own bars count (filled rows repeat the previous bar's range)."""
+    row, price, why = np.full(len(j), -1), np.full(len(j), np.nan), np.zeros(len(j), dtype=np.int8)
+    todo, k0 = np.arange(len(j)), 0
+    while len(todo):
+        r = e[todo, None] + k0 + np.arange(block)
+        inside = r <= lim[todo, None]
+        r = np.minimum(r, len(h) - 1)
+        c = j[todo, None]
+        s, t = stop[todo, None], target[todo, None]
+        bar = inside & valid[r, c]
+        hit_s, hit_t = (l[r, c] <= s) & bar, (h[r, c] >= t) & bar
+        hit = hit_s | hit_t
+        got = hit.any(axis=1)
+        i = np.flatnonzero(got)
+        k = hit[i].argmax(axis=1)
+        rr, op, st, tg = r[i, k], o[r[i, k], j[todo[i]]], s[i, 0], t[i, 0]
+        # gaps through a level fill at the open; a bar that touches both is a stop
+        gap_s, gap_t, is_s = op <= st, op >= tg, hit_s[i, k]
+        row[todo[i]] = rr
+        price[todo[i]] = np.where(gap_s | gap_t, op, np.where(is_s, st, tg))
+        why[todo[i]] = np.where(gap_s | (~gap_t & is_s), 1, 2)
+        todo = todo[~got & inside[:, -1]]
+        k0 += block
+    return row, price, why
+
+@dataclass
+class Backtest:
+    trades: pd.DataFrame                  # one row per trade (TRADE_COLUMNS)
+    equity: pd.DataFrame                  # date -> r (daily, marked to close), equity, open
+    stats: dict = field(default_factory=dict)
+
+def simulate(panel: Panel, entries: np.ndarray, exits: np.ndarray | None = None, stop_atr: float = STOP_ATR,
+             min_rr: float | None = None, max_hold: int | None = None, risk_pct: float | None = None,
+             capital: float = CAPITAL, cost_bps: float = 0.0, atr_len: int = 14) -> Backtest:
+    """Trade the entry matrix with ATR stops and min_rr targets; see the module notes for fills."""
+    rules = load_risk_rules()
+    min_rr = rules["min_rr"] if min_rr is None else float(min_rr)
+    risk_pct = rules["risk_per_trade_pct"] if risk_pct is None else float(risk_pct)
+    o, h, l, c = panel["open"], panel["high"], panel["low"], panel["close"]
+    t_len, n_sym = c.shape
+    atr = panel.atr(atr_len)
+    with np.errstate(invalid="ignore"):
+        sig = np.asarray(entries, dtype=bool) & panel.valid & (atr > 0)
+    sig[:-1] &= panel.valid[1:] & np.isfinite(o[1:])
+    sig[-1:] = False
+    nxt = _next_true(sig)
+    xnxt = _next_true(np.asarray(exits, dtype=bool) & panel.valid) if exits is not None else None
+    nbar = _next_true(panel.valid)                       # next own bar at or after a row
+    rank = np.cumsum(panel.valid, axis=0) - 1            # own-bar number of each row
+    own = np.full((int(rank[-1].max(initial=-1)) + 2 if t_len else 1, n_sym), t_len)
+    rr, cc = np.nonzero(panel.valid)
+    own[rank[rr, cc], cc] = rr                           # row of each symbol's k-th bar (t_len past the last)
+
+    cur, parts = nxt[0].copy(), []
+    while True:
+        j = np.flatnonzero(cur < t_len)
+        if not len(j):
+            break
+        s = cur[j]
+        e = s + 1
+        fill, risk = o[e, j], stop_atr * atr[s, j]
+        stop, target = fill - risk, fill + min_rr * risk
+        q = xnxt[e, j] if xnxt is not None else np.full(len(j), t_len)   # first exit signal while held
+        qx = nbar[np.minimum(q + 1, t_len), j]                           # its fill: the next own bar
+        hold = own[np.minimum(rank[e, j] + max_hold - 1, len(own) - 1), j] if max_hold else np.full(len(j), t_len)
+        x, px, why = _first_touch(o, h, l, panel.valid, j, e, np.minimum(np.minimum(q, hold), t_len - 1), stop, target)
+        miss = x < 0
+        by_sig = miss & (q < hold) & (qx < t_len)
+        by_time = miss & ~by_sig & (hold < t_len)
+        end = miss & ~by_sig & ~by_time
+        x = np.select([by_sig, by_time, end], [qx, hold, t_len - 1], x)
+        px = np.select([by_sig, by_time, end], [o[np.minimum(qx, t_len - 1), j], c[np.minimum(hold, t_len - 1), j],
+                                                c[t_len - 1, j]], px)
+        why = np.select([by_sig, by_time, end], [3, 4, 5], why)
+        parts.append((j, s, e, fill, risk, stop, target, x, px, why))
+        cur[j] = nxt[x, j]   # next signal at or after the exit bar
+
+    if parts:
+        j, s, e, fill, risk, stop, target, x, px, why = (np.concatenate(p) for p in zip(*parts))
+    else:
+        j = s = e = x = np.empty(0, dtype=np.int64)
+        fill = risk = stop = target = px = np.empty(0)
+        why = np.empty(0, dtype=np.int8)
+    r = (px - fill - cost_bps / 1e4 * (fill + px)) / risk
+    dates, syms = panel.dates, np.asarray(panel.symbols, dtype=object)
+    trades = pd.DataFrame({"symbol": syms[j], "signal_date": dates[s], "entry_date": dates[e], "entry": fill,
+                           "stop": stop, "target": target, "exit_date": dates[x], "exit": px, "reason": REASONS[why],
+                           "bars": rank[x, j] - rank[e, j] + 1, "r": r, "ret": px / fill - 1.0}, columns=TRADE_COLUMNS)
+    trades = trades.sort_values(["entry_date", "symbol"], kind="stable").reset_index(drop=True)
+
+    # daily P&L in R: entry bar from the fill, held bars close to close, exit bar to the exit price
+    w = 1.0 / risk
+    daily = np.zeros((t_len, n_sym))
+    held, pos = np.zeros((t_len + 1, n_sym)), np.zeros((t_len + 1, n_sym))
+    same = x == e
+    np.add.at(daily, (e, j), np.where(same, px - fill, c[e, j] - fill) * w)
+    np.add.at(daily, (x[~same], j[~same]), (px - c[np.maximum(x - 1, 0), j])[~same] * w[~same])
+    np.add.at(daily, (x, j), -cost_bps / 1e4 * (fill + px) * w)
+    np.add.at(held, (e + 1, j), w)
+    np.add.at(held, (np.maximum(x, e + 1), j), -w)
+    np.add.at(pos, (e, j), 1)
+    np.add.at(pos, (x, j), -1)
+    dc = np.zeros_like(c)
+    dc[1:] = np.nan_to_num(c[1:] - c[:-1])
+    daily += np.cumsum(held, axis=0)[:t_len] * dc
+    day_r = daily.sum(axis=1)
+    equity = capital + capital * risk_pct / 100.0 * np.cumsum(day_r)
+    curve = pd.DataFrame({"r": day_r, "equity": equity, "open": np.cumsum(pos, axis=0)[:t_len].sum(axis=1).astype(int)},
+                         index=dates)
+    return Backtest(trades, curve, summarize(trades, curve))
+
+def summarize(trades: pd.DataFrame, curve: pd.DataFrame) -> dict:
+    """Trade and curve statistics (R multiples, win rate, profit factor, max drawdown)."""
+    done = trades[trades["reason"] != "open"]
+    r = done["r"].to_numpy(dtype=float)
+    gains, losses = r[r > 0].sum(), -r[r < 0].sum()
+    eq = curve["equity"].to_numpy(dtype=float)
+    dd = eq / np.maximum.accumulate(eq) - 1.0 if len(eq) else np.zeros(1)
+    return {"trades": int(len(trades)), "closed": int(len(done)),
+            "win_rate": float((r > 0).mean()) if len(r) else float("nan"),
+            "avg_r": float(r.mean()) if len(r) else float("nan"),
+            "total_r": float(trades["r"].sum()),
+            "profit_factor": float(gains / losses) if losses > 0 else float("inf") if gains > 0 else float("nan"),
+            "by_reason": done["reason"].value_counts().to_dict(),
+            "avg_bars": float(done["bars"].mean()) if len(done) else float("nan"),
+            "max_drawdown": float(dd.min()),
+            "return": float(eq[-1] / eq[0] - 1.0) if len(eq) else 0.0,
+            "exposure": float(curve["open"].mean()) if len(curve) else 0.0}
+
+def backtest_rulepacks(u: HistoryUniverse, rules: dict[str, dict] | None = None, modes: list[str] | None = None,
+                       **sim) -> dict[str, Backtest]:
+    """Screen key -> Backtest of its entry signals (stops/targets/max_hold from **sim)."""
+    return {k: simulate(u.panel, m, **sim) for k, m in rulepack_signals(u, rules, modes).items()}
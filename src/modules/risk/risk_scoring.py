@@ -2,10 +2,23 @@
 Vega Risk & Return Scoring Engine
 Computes: Sharpe, Sortino, Volatility, Beta vs Benchmark, Max Drawdown, CVaR, CAGR,
 Rolling metrics, and a composite 0–100 score with adjustable weights.
+- full_report(): one price series.
+- batch_report(): every column of a (dates x symbols) price frame at once, same formulas.
+- rolling_report(): each metric over a trailing window at every date, O(n) per column:
+  running sums for the moments and beta, a blockwise running-max drawdown
+  (indicator_kernels.rolling_max_drawdown); CVaR, which needs a rolling quantile, is
+  O(n log window) from a sorted window updated by bisect insert/delete.
 """
 from __future__ import annotations
+import warnings
+from bisect import bisect_left, bisect_right
 import numpy as np, pandas as pd, typing as t
 
+import indicator_kernels as ik
+
+DEFAULT_WEIGHTS = {"sharpe": 0.25, "sortino": 0.2, "volatility": 0.1, "max_drawdown": 0.15, "cvar": 0.1, "cagr": 0.2}
+METRICS = ["sharpe", "sortino", "volatility", "max_drawdown", "cvar", "cagr"]
+
 def _to_returns(prices: pd.Series, freq_per_year: int = 252) -> pd.Series:
     returns = prices.pct_change().dropna()
     return returns
@@ -56,44 +69,30 @@ def cvar(returns: pd.Series, alpha: float = 0.05) -> float:
     tail = returns[returns <= q]
     return float(tail.mean()) if not tail.empty else np.nan
 
-def composite_score(metrics: dict, weights: dict|None=None) -> float:
-    # normalize a few key metrics to 0..100-ish
-    w = weights or {
-        "sharpe": 0.25, "sortino": 0.2, "volatility": 0.1,
-        "max_drawdown": 0.15, "cvar": 0.1, "cagr": 0.2
+def _composite(m: dict, weights: dict|None=None):
+    """Elementwise composite over metric arrays/frames; missing metrics count as 0 (like None)."""
+    w = weights or DEFAULT_WEIGHTS
+    v = {k: np.nan_to_num(np.asarray(m[k], dtype=float)) if k in m else 0.0 for k in METRICS}
+    clamp = lambda x: np.clip(x, 0.0, 1.0)
+    parts = {
+        "sharpe": clamp(v["sharpe"] / 3.0),                      # 0 at 0, 100 at 3+
+        "sortino": clamp(v["sortino"] / 4.0),
+        "volatility": clamp((0.60 - np.abs(v["volatility"])) / (0.60 - 0.10)),  # 60% vol -> 0, 10% -> 100
+        "max_drawdown": clamp((v["max_drawdown"] + 0.6) / 0.6),  # -60% -> 0, 0% -> 100
+        "cvar": clamp((v["cvar"] + 0.1) / 0.1),                  # -10% -> 0, 0% -> 100
+        "cagr": clamp(v["cagr"] / 0.25),                         # 0 -> 0, 25%+ -> 100
     }
-    s = metrics.get("sharpe", np.nan)
-    so= metrics.get("sortino", np.nan)
-    vol= metrics.get("volatility", np.nan)
-    mdd= metrics.get("max_drawdown", np.nan) # negative
-    cv = metrics.get("cvar", np.nan)         # negative
-    cg = metrics.get("cagr", np.nan)
-
-    # scale helpers
-    def clamp(x, lo, hi):
-        return max(lo, min(hi, x))
-
-    # Sharpe scale: 0 at 0, 100 at 3+
-    s100  = 100*clamp((s or 0)/3.0, 0, 1)
-    so100 = 100*clamp((so or 0)/4.0, 0, 1)
-    # Lower vol better up to a point: map 60% vol -> 0, 10% vol -> 100
-    v = abs(vol or 0)
-    vol100 = 100*clamp((0.60 - v)/(0.60-0.10), 0, 1)
-
-    # MDD and CVaR are negative; less negative is better
-    m = mdd or 0
-    mdd100 = 100*clamp((m + 0.6)/(0.6), 0, 1)  # -60% -> 0, 0% -> 100
-    c = cv or 0
-    cvar100 = 100*clamp((c + 0.1)/0.1, 0, 1)   # -10% -> 0, 0% -> 100
-
-    # CAGR: 0 -> 0, 25%+ -> 100
-    cg100 = 100*clamp((cg or 0)/0.25, 0, 1)
-
-    score = (
-        w["sharpe"]*s100 + w["sortino"]*so100 + w["volatility"]*vol100 +
-        w["max_drawdown"]*mdd100 + w["cvar"]*cvar100 + w["cagr"]*cg100
-    )
-    return float(round(score, 2))
+    return np.round(sum(w[k] * 100 * parts[k] for k in METRICS), 2)
+
+def composite_scores(metrics: pd.DataFrame, weights: dict|None=None) -> pd.Series:
+    """Composite 0-100 score for every row of a metrics frame."""
+    return pd.Series(_composite({k: metrics[k] for k in METRICS if k in metrics}, weights) + np.zeros(len(metrics)),
+                     index=metrics.index)
+
+def composite_score(metrics: dict, weights: dict|None=None) -> float:
+    # normalize a few key metrics to 0..100-ish; NaN, None or a missing key scores as a value of 0
+    # (a NaN Sharpe/Sortino/CAGR earns no points, a NaN volatility/drawdown/CVaR reads as 0 = best)
+    return float(_composite({k: np.nan if metrics.get(k) is None else metrics[k] for k in METRICS}, weights))
 
 def full_report(prices: pd.Series, bench_prices: pd.Series|None=None, rf: float=0.0, freq_per_year: int=252) -> dict:
     r = _to_returns(prices, freq_per_year=freq_per_year)
@@ -109,3 +108,148 @@ def full_report(prices: pd.Series, bench_prices: pd.Series|None=None, rf: float=
         metrics["beta"] = beta_vs(prices, bench_prices)
     metrics["score"] = composite_score(metrics)
     return metrics
+
+# ---- batch (every column at once) -------------------------------------------------
+def _frame(prices) -> pd.DataFrame:
+    return prices.to_frame() if isinstance(prices, pd.Series) else prices
+
+def _returns_matrix(prices: pd.DataFrame) -> np.ndarray:
+    p = prices.to_numpy(dtype=float)
+    r = np.full(p.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r[1:] = p[1:] / p[:-1] - 1.0
+    return r
+
+def _bench_returns(bench_prices: pd.Series, index: pd.Index) -> np.ndarray:
+    b = pd.to_numeric(bench_prices, errors="coerce").dropna()
+    return (b / b.shift(1) - 1.0).reindex(index).to_numpy(dtype=float)[:, None]
+
+def batch_report(prices: pd.DataFrame, bench_prices: pd.Series|None=None, rf: float=0.0,
+                 freq_per_year: int=252, weights: dict|None=None) -> pd.DataFrame:
+    """full_report() for every column of a dates x symbols price frame (leading NaNs allowed)."""
+    prices = _frame(prices)
+    p = prices.to_numpy(dtype=float)
+    r = _returns_matrix(prices)
+    ok = ~np.isnan(r)
+    n = ok.sum(axis=0)
+    ann = np.sqrt(freq_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns (no history yet)
+        mu = np.where(ok, r, 0.0).sum(axis=0) / n
+        sig = np.sqrt(np.where(ok, (r - mu) ** 2, 0.0).sum(axis=0) / (n - 1))
+        down = np.where(ok, np.minimum(r, 0.0), np.nan)
+        dmu = np.nanmean(down, axis=0) if len(down) else np.full(p.shape[1], np.nan)
+        dsig = np.sqrt(np.where(ok, (down - dmu) ** 2, 0.0).sum(axis=0) / (n - 1))
+        ex = mu - rf / freq_per_year
+        out = {
+            "sharpe": np.where(sig != 0, ann * ex / sig, np.nan),
+            "sortino": np.where(dsig != 0, ann * ex / dsig, np.nan),
+            "volatility": sig * ann,
+            "max_drawdown": np.nanmin(p / np.fmax.accumulate(p, axis=0) - 1.0, axis=0) if len(p) else np.nan,
+        }
+        q = np.nanquantile(r, 0.05, axis=0) if len(r) else np.full(p.shape[1], np.nan)
+        tail = ok & (r <= q)
+        out["cvar"] = np.where(tail, r, 0.0).sum(axis=0) / tail.sum(axis=0)
+
+        valid = ~np.isnan(p)
+        count = valid.sum(axis=0)
+        first = p[valid.argmax(axis=0), np.arange(p.shape[1])] if len(p) else np.full(p.shape[1], np.nan)
+        last = p[len(p) - 1 - valid[::-1].argmax(axis=0), np.arange(p.shape[1])] if len(p) else first
+        out["cagr"] = np.where((count > 0) & (first > 0), (last / first) ** (freq_per_year / count) - 1.0, np.nan)
+
+    df = pd.DataFrame(out, index=prices.columns)
+    if bench_prices is not None:
+        rb = _bench_returns(bench_prices, prices.index)
+        pair = ok & ~np.isnan(rb)
+        k = pair.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x, y = np.where(pair, r, 0.0), np.where(pair, rb, 0.0)
+            xm, ym = x.sum(axis=0) / k, y.sum(axis=0) / k
+            cov = (np.where(pair, (r - xm) * (rb - ym), 0.0)).sum(axis=0) / (k - 1)
+            var_b = np.where(pair, (rb - ym) ** 2, 0.0).sum(axis=0) / k
+            df["beta"] = np.where((k >= 5) & (var_b != 0), cov / var_b, np.nan)
+    df["score"] = composite_scores(df, weights)
+    return df
+
+# ---- rolling (every date, trailing window) --------------------------------------------
+def _run_cvar(x: list, window: int, alpha: float, out: np.ndarray) -> None:
+    """CVaR of every full window of one NaN-free run, written to out[window - 1:].
+
+    The window is kept sorted (bisect delete of the outgoing return, bisect insert of the new
+    one) together with the running sum of its lo+1 smallest values, so each step costs
+    O(log window) comparisons instead of a selection over the whole window.
+    """
+    pos = alpha * (window - 1)
+    lo = int(np.floor(pos))
+    hi, frac = min(lo + 1, window - 1), pos - lo
+    incremental = lo + 1 < window  # alpha < 1: a value past the low tail always exists
+    win = sorted(x[:window])
+    low = sum(win[:lo + 1])
+    for t in range(window - 1, len(x)):
+        if t >= window:
+            y, v = x[t - window], x[t]
+            j = bisect_left(win, y)
+            if incremental and j <= lo:
+                low += win[lo + 1] - y   # the next value slides into the tail
+            del win[j]
+            i = bisect_right(win, v)
+            if incremental and i <= lo:
+                low += v - win[lo]       # v enters the tail, pushing its largest value out
+            win.insert(i, v)
+            if not incremental or t % window == 0:
+                low = sum(win[:lo + 1])  # exact resum once per window bounds float drift
+        q = win[lo] + frac * (win[hi] - win[lo])
+        k = bisect_right(win, q, lo + 1)  # values past lo that are <= q all equal q (ties at the cut)
+        out[t] = (low + (k - lo - 1) * q) / k
+
+def rolling_cvar(returns, window: int, alpha: float = 0.05):
+    """Trailing-window CVaR: mean of the returns at or below the window's alpha quantile
+    (interpolated as in cvar(); ties at the cut count). Windows holding a NaN are NaN.
+
+    Each column's finite runs are swept with a sorted window (_run_cvar): O(n log window).
+    """
+    r = _frame(returns)
+    a = r.to_numpy(dtype=float)
+    out = np.full(a.shape, np.nan)
+    for c in range(a.shape[1]):
+        col = a[:, c]
+        gaps = np.flatnonzero(np.isnan(col))
+        for s, e in zip(np.r_[0, gaps + 1], np.r_[gaps, len(col)]):
+            if e - s >= window:
+                _run_cvar(col[s:e].tolist(), window, alpha, out[s:e, c])
+    out = pd.DataFrame(out, index=r.index, columns=r.columns)
+    return out.iloc[:, 0] if isinstance(returns, pd.Series) else out
+
+def rolling_report(prices, window: int = 252, bench_prices: pd.Series|None=None, rf: float=0.0,
+                   freq_per_year: int=252, alpha: float = 0.05, weights: dict|None=None) -> dict:
+    """metric -> dates x symbols frame; the value at t is full_report() of the last window+1 prices."""
+    frame = _frame(prices)
+    p = frame.to_numpy(dtype=float)
+    r = _returns_matrix(frame)
+    ann = np.sqrt(freq_per_year)
+    mu, sig = ik.sma(r, window), ik.stdev(r, window)
+    dsig = ik.stdev(np.minimum(r, 0.0), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ex = mu - rf / freq_per_year
+        out = {
+            "sharpe": np.where(sig != 0, ann * ex / sig, np.nan),
+            "sortino": np.where(dsig != 0, ann * ex / dsig, np.nan),
+            "volatility": sig * ann,
+            "max_drawdown": ik.rolling_max_drawdown(p, window + 1),
+        }
+        start = np.full(p.shape, np.nan)
+        start[window:] = p[:-window] if window < len(p) else start[window:]
+        out["cagr"] = np.where(start > 0, (p / start) ** (freq_per_year / (window + 1)) - 1.0, np.nan)
+    out = {k: pd.DataFrame(v, index=frame.index, columns=frame.columns) for k, v in out.items()}
+    out["cvar"] = rolling_cvar(pd.DataFrame(r, index=frame.index, columns=frame.columns), window, alpha)
+    if bench_prices is not None:
+        rb = np.broadcast_to(_bench_returns(bench_prices, frame.index), r.shape)
+        xy, x, y, yy = (ik.sma(v, window) for v in (r * rb, r, np.ascontiguousarray(rb), rb * rb))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var_b = yy - y * y
+            beta = (xy - x * y) * window / (window - 1) / var_b
+        out["beta"] = pd.DataFrame(np.where(var_b > 0, beta, np.nan), index=frame.index, columns=frame.columns)
+    out["score"] = pd.DataFrame(_composite(out, weights) + np.zeros(p.shape), index=frame.index, columns=frame.columns)
+    if isinstance(prices, pd.Series):
+        return {k: v.iloc[:, 0].rename(prices.name) for k, v in out.items()}
+    return out
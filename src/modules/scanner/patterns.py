@@ -1,51 +1,113 @@
+"""
+Wedge and bearish-setup patterns, batched over symbols and history
+- Inputs are close prices as a 1D series or a 2D (time x symbols) array/DataFrame; every row
+  is evaluated with the window ending on it, so `rising_wedges(panel["close"])` answers
+  "when did this fire" for the whole universe at once.
+- The wedge envelopes are the 5-bar centered rolling high/low inside the lookback window;
+  their slopes come from indicator_kernels.rolling_slope (running sums, O(1) per row).
+- rising_wedge / falling_wedge / bearish_setup_score keep the single-series API (last bar only).
+"""
 import numpy as np, pandas as pd
 from typing import Tuple
 
+import indicator_kernels as ik
+
+ENVELOPE = 5     # centered rolling high/low width
+MIN_POINTS = 10  # envelope points needed for a wedge fit
+
 def pct_change_series(prices: pd.Series) -> pd.Series:
     return prices.pct_change().fillna(0.0)
 
-def _linreg(x: np.ndarray, y: np.ndarray) -> Tuple[float,float]:
-    x = np.asarray(x); y = np.asarray(y)
-    A = np.vstack([x, np.ones(len(x))]).T
-    slope, intercept = np.linalg.lstsq(A, y, rcond=None)[0]
-    return float(slope), float(intercept)
+def _arr(prices) -> np.ndarray:
+    return np.asarray(prices.to_numpy(dtype=float) if isinstance(prices, (pd.Series, pd.DataFrame)) else prices, dtype=float)
+
+def _wrap(like, out: np.ndarray):
+    if isinstance(like, pd.Series):
+        return pd.Series(out, index=like.index, name=like.name)
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(out, index=like.index, columns=like.columns)
+    return out
+
+def _bars(a: np.ndarray) -> np.ndarray:
+    """Bars seen so far per symbol (leading NaNs are not bars)."""
+    return np.cumsum(~np.isnan(a), axis=0)
+
+def _shift(a: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(a.shape, np.nan)
+    out[n:] = a[:-n]
+    return out
+
+def wedge_slopes(prices, lookback: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """Slopes of the upper and lower envelopes over the lookback window ending at each row.
+
+    The centered 5-bar max at j is the trailing max at j+2, so the window's envelope points
+    are the last lookback-4 values of the trailing rolling max/min.
+    """
+    a = _arr(prices)
+    m = lookback - (ENVELOPE - 1)
+    return (ik.rolling_slope(ik.rolling_max(a, ENVELOPE), m),
+            ik.rolling_slope(ik.rolling_min(a, ENVELOPE), m))
+
+def _wedges(prices, lookback: int, rising: bool):
+    a = _arr(prices)
+    if lookback - (ENVELOPE - 1) < MIN_POINTS:
+        return _wrap(prices, np.zeros(a.shape, dtype=bool))
+    us, ls = wedge_slopes(a, lookback)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chg10 = a / _shift(a, 10) - 1.0
+    if rising:
+        hit = (us > 0) & (ls > 0) & (us < ls) & (chg10 < 0)
+    else:
+        hit = (us < 0) & (ls < 0) & (us > ls) & (chg10 > 0)
+    return _wrap(prices, hit & (_bars(a) >= lookback + 5))
+
+def rising_wedges(prices, lookback: int = 60):
+    """Rising wedge (both envelopes rising, lows faster) with a 10-bar loss, at every row."""
+    return _wedges(prices, lookback, rising=True)
+
+def falling_wedges(prices, lookback: int = 60):
+    """Falling wedge (both envelopes falling, lows faster) with a 10-bar gain, at every row."""
+    return _wedges(prices, lookback, rising=False)
+
+def bearish_setup_scores(prices, window: int = 20):
+    """0-100 at every row: 50 below the window MA, 35 down over the window, 15 off the 3-bar high by 2%."""
+    a = _arr(prices)
+    if len(a) < window:
+        return _wrap(prices, np.zeros(a.shape))
+    with np.errstate(invalid="ignore"):
+        below = a < ik.sma(a, window)
+        mom = a / _shift(a, window - 1) - 1.0 < 0
+        bounce = a < ik.rolling_max(a, 3) * 0.98
+    score = np.round(100.0 * (0.5 * below + 0.35 * mom + 0.15 * bounce), 2)
+    return _wrap(prices, np.where(_bars(a) >= window + 5, score, 0.0))
+
+def stack_latest(closes: dict[str, pd.Series]) -> pd.DataFrame:
+    """Right-align per-symbol closes by bar (last bars on the last row), NaN-padded in front."""
+    closes = {s: pd.to_numeric(c, errors="coerce").to_numpy(dtype=float) for s, c in closes.items()}
+    t = max((len(c) for c in closes.values()), default=0)
+    out = np.full((t, len(closes)), np.nan)
+    for j, c in enumerate(closes.values()):
+        if len(c):
+            out[t - len(c):, j] = c
+    return pd.DataFrame(out, columns=list(closes))
+
+def scan_latest(closes: dict[str, pd.Series], lookback: int = 60, window: int = 20) -> pd.DataFrame:
+    """symbol x (rising_wedge, falling_wedge, bearish_score) on each symbol's last bar, in one batch."""
+    panel = stack_latest(closes)
+    if panel.empty:
+        return pd.DataFrame(columns=["rising_wedge", "falling_wedge", "bearish_score"])
+    return pd.DataFrame({"rising_wedge": rising_wedges(panel, lookback).iloc[-1],
+                         "falling_wedge": falling_wedges(panel, lookback).iloc[-1],
+                         "bearish_score": bearish_setup_scores(panel, window).iloc[-1]})
 
 def rising_wedge(prices: pd.Series, lookback: int = 60) -> bool:
     if len(prices) < lookback+5: return False
-    s = prices.iloc[-lookback:]
-    highs = s.rolling(5, center=True).max().dropna()
-    lows  = s.rolling(5, center=True).min().dropna()
-    common = highs.index.intersection(lows.index)
-    highs = highs.loc[common]; lows = lows.loc[common]
-    if len(highs)<10 or len(lows)<10: return False
-    x = np.arange(len(common))
-    us, _ = _linreg(x, highs.values)
-    ls, _ = _linreg(x, lows.values)
-    narrowing = (us > 0) and (ls > 0) and (us < ls)
-    recent_loss = s.pct_change(10).iloc[-1] < 0
-    return bool(narrowing and recent_loss)
+    return bool(rising_wedges(_arr(prices)[-(lookback+5):], lookback)[-1])
 
 def falling_wedge(prices: pd.Series, lookback: int = 60) -> bool:
     if len(prices) < lookback+5: return False
-    s = prices.iloc[-lookback:]
-    highs = s.rolling(5, center=True).max().dropna()
-    lows  = s.rolling(5, center=True).min().dropna()
-    common = highs.index.intersection(lows.index)
-    highs = highs.loc[common]; lows = lows.loc[common]
-    if len(highs)<10 or len(lows)<10: return False
-    x = np.arange(len(common))
-    us, _ = _linreg(x, highs.values)
-    ls, _ = _linreg(x, lows.values)
-    narrowing = (us < 0) and (ls < 0) and (us > ls)
-    recent_gain = s.pct_change(10).iloc[-1] > 0
-    return bool(narrowing and recent_gain)
+    return bool(falling_wedges(_arr(prices)[-(lookback+5):], lookback)[-1])
 
 def bearish_setup_score(prices: pd.Series, window: int = 20) -> float:
     if len(prices) < window+5: return 0.0
-    s = prices.copy()
-    ma = s.rolling(window).mean()
-    below = float((s.iloc[-1] < ma.iloc[-1]))
-    mom = float((s.iloc[-1] / s.iloc[-window]) - 1.0 < 0)
-    bounce = float((s.iloc[-1] < s.rolling(3).max().iloc[-1]*0.98))
-    score = 100.0 * (0.5*below + 0.35*mom + 0.15*bounce)
-    return round(score,2)
+    return float(bearish_setup_scores(_arr(prices)[-(window+5):], window)[-1])
@@ -0,0 +1,536 @@
+"""
+Rulepack engine for modules/rules/*.yaml (Holy Grail, EMA Squeeze, Vector Composite, ...)
+- compile_rulepack() turns a rule file into one Screen per mode ("base"/"plus50", "with_ma"/"no_ma",
+  or a single "default"); each filter compiles to a vectorized function over a Universe.
+- A Universe is a data.panel.Panel (time x symbols) plus a per-symbol fields table
+  (VectorVest scores, fundamentals, flags such as etf/otc, industry) and the region settings
+  from config/regions.yaml ("value_from: region.min_price_local", liquidity defaults).
+- load_universe() drops symbols the nightly liquidity table (data.liquidity) marks as illiquid
+  before any bars are loaded.
+- Filters are evaluated on each symbol's latest bars; lookbacks read only the last rows.
+  A history universe (modules.backtest.engine) hands the same filters lag views instead, so
+  they return (time x symbols) masks for every row at once.
+- Unknown fields evaluate to NaN (the filter fails) and are reported in Result.missing;
+  `optional_field` filters and unknown watchlists are skipped (watchlists fall back to the
+  region market-cap floor, as the rule files note).
+- Sorting is lexicographic over the rule's sort keys (NaN last); top_n is taken with
+  argpartition on the first key before the full sort of the survivors.
+- run_rulepacks() plans all selected screens as one graph: every indicator column, value and
+  filter mask is computed once per universe and dropped after the last screen that reads it.
+"""
+from __future__ import annotations
+import ast, json, operator, re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import yaml
+
+import indicator_kernels as ik
+from data.panel import Panel
+from data.bar_store import store as _bars, BarStore
+from data.regions import load_regions, region_symbols
+from data.liquidity import liquid_symbols
+
+ROOT = Path(__file__).resolve().parents[3]
+RULES_DIR = ROOT / "modules" / "rules"
+VV_SIGNALS = ROOT / "vault" / "cache" / "vectorvest_signals.json"
+
+_OPS = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt,
+        "==": operator.eq, "!=": operator.ne}
+
+# ---- config -----------------------------------------------------------------
+def load_rulepacks(rules_dir: Path = RULES_DIR, names: list[str] | None = None) -> dict[str, dict]:
+    """stem -> parsed rule file (the _vega_scores.yaml scoring spec is not a screen)."""
+    out = {}
+    for p in sorted(Path(rules_dir).glob("*.yaml")):
+        if p.name.startswith("_") or (names and p.stem not in names):
+            continue
+        with open(p, "r", encoding="utf-8") as f:
+            out[p.stem] = yaml.safe_load(f) or {}
+    return out
+
+def load_fields(path: Path = VV_SIGNALS) -> pd.DataFrame:
+    """Per-symbol fields from the VectorVest snapshot (empty frame when absent)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f).get("signals") or []
+    except (OSError, ValueError):
+        rows = []
+    df = pd.DataFrame(rows)
+    return df.set_index("symbol") if "symbol" in df.columns else pd.DataFrame()
+
+# ---- data -------------------------------------------------------------------
+class Universe:
+    """Panel + per-symbol fields + region settings; the namespace filters read from."""
+
+    def __init__(self, panel: Panel, fields: pd.DataFrame | None = None, region: str = "US",
+                 settings: dict | None = None, watchlists: dict[str, set] | None = None):
+        self.panel = panel
+        self.symbols = panel.symbols
+        f = fields if fields is not None else pd.DataFrame()
+        self.fields = f[~f.index.duplicated()].reindex(self.symbols) if len(f.columns) else pd.DataFrame(index=self.symbols)
+        cfg = settings if settings is not None else load_regions()
+        self.region = region
+        self.settings = (cfg.get("regions") or {}).get(region, {})
+        self.pass_through = (cfg.get("pass_through_rules") or {}).get(region, {})
+        self.watchlists = {k: set(v) for k, v in (watchlists or {}).items()}
+        self.missing: set[str] = set()
+        self._values: dict[str, np.ndarray] = {}
+
+    def series(self, name: str) -> np.ndarray:
+        """time x symbols array ("close", "ema20", "adx14", ...)."""
+        return self.panel[name]
+
+    def tail(self, name: str, n: int) -> np.ndarray:
+        """Last n rows; windowed indicators are computed over the needed inputs only."""
+        return self.panel.tail(name, n)
+
+    def has(self, name: str) -> bool:
+        return name in self.fields.columns or name in self._values or name in _BUILTINS
+
+    def value(self, name: str) -> np.ndarray:
+        """Latest per-symbol value: fields table, built-ins, then panel columns; NaN if unknown."""
+        if name in self._values:
+            return self._values[name]
+        if name in self.fields.columns:
+            v = self.fields[name].to_numpy()
+        elif name in _BUILTINS:
+            v = _BUILTINS[name](self)
+        else:
+            try:
+                v = self.tail(name, 1)[-1]
+            except KeyError:
+                self.missing.add(name)
+                v = np.full(len(self.symbols), np.nan)
+        self._values[name] = v
+        return v
+
+    def put(self, name: str, values) -> None:
+        self._values[name] = np.asarray(values)
+
+    def forget(self, *names: str) -> None:
+        for n in names:
+            self._values.pop(n, None)
+
+    def region_value(self, ref: str):
+        key = ref.split(".", 1)[1] if ref.startswith("region.") else ref
+        return self.settings.get(key)
+
+_BUILTINS: dict[str, Callable[[Universe], np.ndarray]] = {
+    "price": lambda u: u.tail("close", 1)[-1],
+    "avg_vol_30d": lambda u: u.tail("sma30_volume", 1)[-1],
+    "dollar_turnover_30d": lambda u: ik.sma(u.tail("close", 30) * u.tail("volume", 30), 30)[-1],
+}
+_BUILTIN_SERIES = {"price": {"close"}, "avg_vol_30d": {"sma30_volume"}, "dollar_turnover_30d": {"close", "volume"}}
+
+# ---- expressions (derived, rank_formula) -------------------------------------
+_FUNCS = {"max": np.fmax, "min": np.fmin, "abs": np.abs}
+_BINOPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+def compile_expr(text: str) -> tuple[set[str], Callable[[Universe], np.ndarray]]:
+    """Arithmetic over field names ("ysg / max(ci, 0.01)"); returns (names used, fn)."""
+    tree = ast.parse(text, mode="eval").body
+    names: set[str] = set()
+
+    def walk(node):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+            return lambda u, n=node.id: np.asarray(u.value(n), dtype=float)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return lambda u, c=float(node.value): c
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            f = walk(node.operand)
+            return lambda u: -f(u)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            a, b, op = walk(node.left), walk(node.right), _BINOPS[type(node.op)]
+            return lambda u: op(a(u), b(u))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCS:
+            fn, args = _FUNCS[node.func.id], [walk(a) for a in node.args]
+            return lambda u: fn(*(a(u) for a in args))
+        raise ValueError(f"unsupported expression {text!r}")
+
+    f = walk(tree)
+
+    def run(u: Universe) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.asarray(f(u), dtype=float) * np.ones(len(u.symbols))
+    return names, run
+
+# ---- filters ----------------------------------------------------------------
+@dataclass
+class Filter:
+    label: str
+    fn: Callable[[Universe], np.ndarray]      # -> bool mask over symbols (None: skipped)
+    series: set[str] = field(default_factory=set)  # panel columns it reads
+    values: set[str] = field(default_factory=set)  # per-symbol values it reads
+    key: str = ""                                  # canonical spec: equal keys share one mask
+
+def _ma_name(kind: str, n: int) -> str:
+    return "close" if int(n) == 1 else f"{kind}{int(n)}"
+
+def _crossed_up(a: np.ndarray, b: np.ndarray, within: int) -> np.ndarray:
+    """a crossed above b on one of the last `within` bars (a/b hold within + 1 rows)."""
+    above = a > b
+    return (above[1:] & ~above[:-1]).any(axis=0)
+
+def _rising(a: np.ndarray) -> np.ndarray:
+    return a[-1] > a[-2]
+
+def _compare(values, op: str, target) -> np.ndarray:
+    s = pd.Series(values) if np.ndim(values) < 2 else pd.DataFrame(values)
+    if op == "in":
+        return s.isin(target if isinstance(target, (list, tuple, set)) else [target]).to_numpy()
+    if op not in _OPS:
+        raise ValueError(f"unsupported op {op!r}")
+    with np.errstate(invalid="ignore"):
+        out = _OPS[op](s, target)
+    return out.fillna(False).to_numpy(dtype=bool)
+
+def _value_filter(spec: dict, name: str) -> Filter:
+    op = spec.get("op", ">=")
+    ref = spec.get("value_from")
+
+    def fn(u: Universe):
+        target = u.region_value(ref) if ref else spec.get("value")
+        if target is None:  # region has no such default: nothing to enforce
+            return None
+        return _compare(u.value(name), op, target)
+    return Filter(f"{name} {op} {ref or spec.get('value')}", fn, values={name})
+
+def _optional_filter(spec: dict) -> Filter:
+    name, inner = spec["optional_field"], _value_filter({**spec}, spec["optional_field"])
+
+    def fn(u: Universe):
+        if not u.has(name):
+            return None
+        mask = inner.fn(u)
+        # sub-cap names pass if exceptionally liquid (config/regions.yaml pass_through_rules)
+        if mask is not None and name == "market_cap" and u.pass_through.get("min_dollar_turnover"):
+            mask = mask | _compare(u.value("dollar_turnover_30d"), ">=", u.pass_through["min_dollar_turnover"])
+        return mask
+    return Filter(f"optional {inner.label}", fn, values={name, "dollar_turnover_30d"})
+
+def _watchlist_filter(names: list[str]) -> Filter:
+    cap = _value_filter({"op": ">=", "value_from": "region.market_cap_min"}, "market_cap")
+
+    def fn(u: Universe):
+        known = [n for n in names if n in u.watchlists]
+        if not known:  # no membership data: fall back to the cap floor
+            return cap.fn(u)
+        members = set().union(*(u.watchlists[n] for n in known))
+        return np.array([s in members for s in u.symbols], dtype=bool)
+    return Filter(f"watchlist any {names}", fn, values={"market_cap"})
+
+def _exclude_filter(tags: list[str]) -> Filter:
+    def fn(u: Universe):
+        out = np.zeros(len(u.symbols), dtype=bool)
+        for t in tags:
+            if t in u.fields.columns:
+                out |= u.fields[t].fillna(False).astype(bool).to_numpy()
+        for col in ("asset_type", "type"):
+            if col in u.fields.columns:
+                out |= u.fields[col].astype(str).str.lower().isin([t.lower() for t in tags]).to_numpy()
+        return ~out
+    return Filter(f"exclude {tags}", fn)
+
+def _industry_relation(a: int, b: int, rel: str) -> Filter:
+    fa, fb = _ma_name("sma", a), _ma_name("sma", b)
+
+    def fn(u: Universe):
+        if "industry" not in u.fields.columns:
+            u.missing.add("industry")
+            return np.zeros(len(u.symbols), dtype=bool)
+        ratio = u.tail(fa, 1)[-1] / u.tail(fb, 1)[-1]  # equal-weight industry: mean of member ratios
+        codes, groups = pd.factorize(u.fields["industry"])
+        ok = (codes >= 0) & np.isfinite(ratio)
+        member = np.zeros((len(codes), len(groups)))  # symbols x industries, so rows of dates work too
+        member[np.flatnonzero(codes >= 0), codes[codes >= 0]] = 1.0
+        sums, counts = np.where(ok, ratio, 0.0) @ member, ok @ member
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ind = np.where(codes >= 0, (sums / counts)[..., codes.clip(min=0)], np.nan)
+        return _compare(ind, rel, 1.0)
+    return Filter(f"industry {fa} {rel} {fb}", fn, series={fa, fb})
+
+def _indicator_filter(spec: dict) -> Filter:
+    kind, p = spec["indicator"], spec.get("params") or {}
+    n = int(spec.get("lookback_days") or 1)
+    label = f"{kind} {p} {spec.get('op', '')} {spec.get('value', '')} /{n}d".replace("  ", " ")
+
+    if kind == "adx":
+        col = f"adx{int(p.get('length', 14))}"
+        op = spec.get("op", "max_last_n>=")
+        agg, cmp = (np.max, op[len("max_last_n"):]) if op.startswith("max_last_n") else \
+                   (np.min, op[len("min_last_n"):]) if op.startswith("min_last_n") else (lambda a, axis: a[-1], op)
+        return Filter(label, lambda u: _compare(agg(u.tail(col, n), axis=0), cmp, spec["value"]), series={col})
+
+    if kind == "price_to_ma_band":
+        col = f"{p.get('ma', 'ema')}{int(p.get('length', 20))}"
+        lo, hi = float(p.get("lower", 0)), float(p.get("upper", np.inf))
+
+        def band(u: Universe):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r = u.tail("close", n) / u.tail(col, n)
+            inside = (r >= lo) & (r <= hi)
+            return inside.any(axis=0) if spec.get("op", "any") == "any" else inside.all(axis=0)
+        return Filter(label, band, series={"close", col})
+
+    if kind == "cross":
+        a, b = str(p.get("a", "close")), str(p.get("b"))
+        return Filter(label, lambda u: _crossed_up(u.tail(a, n + 1), u.tail(b, n + 1), n), series={a, b})
+
+    if kind in ("ema_cross", "ma_cross"):
+        ma = "ema" if kind == "ema_cross" else "sma"
+        fast, slow = _ma_name(ma, p["fast"]), _ma_name(ma, p["slow"])
+        rising = spec.get("both_rising")
+
+        def cross(u: Universe):
+            mask = _crossed_up(u.tail(fast, n + 1), u.tail(slow, n + 1), n)
+            if rising:
+                mask &= _rising(u.tail(fast, 2)) & _rising(u.tail(slow, 2))
+            return mask
+        return Filter(label, cross, series={fast, slow})
+
+    if kind == "ma_relation":
+        fa, fb = _ma_name("sma", p["a"]), _ma_name("sma", p["b"])
+        return Filter(label, lambda u: _compare(u.tail(fa, 1)[-1], p.get("rel", ">"), u.tail(fb, 1)[-1]), series={fa, fb})
+
+    if kind == "industry_ma_relation":
+        return _industry_relation(p["a"], p["b"], p.get("rel", ">"))
+
+    if kind == "dpo_cross_zero":
+        length = int(p.get("length", 20))
+        k, col = length // 2 + 1, f"sma{length}"
+
+        def dpo(u: Universe):
+            d = u.tail("close", n + 1) - u.tail(col, n + 1 + k)[:n + 1]
+            zero = np.zeros_like(d)
+            return _crossed_up(d, zero, n) if spec.get("direction", "up") == "up" else _crossed_up(zero, d, n)
+        return Filter(label, dpo, series={"close", col})
+
+    if kind == "bollinger_cross_upper":
+        length, k = int(p.get("length", 20)), float(p.get("stdev", 2))
+        mid, sd = f"sma{length}", f"std{length}"
+        return Filter(label, lambda u: _crossed_up(u.tail("close", n + 1), u.tail(mid, n + 1) + k * u.tail(sd, n + 1), n),
+                      series={"close", mid, sd})
+
+    raise ValueError(f"unsupported indicator {kind!r}")
+
+def compile_filter(spec: dict) -> Filter:
+    f = _compile_filter(spec)
+    f.key = json.dumps(spec, sort_keys=True, default=str)
+    return f
+
+def _compile_filter(spec: dict) -> Filter:
+    if "indicator" in spec:
+        return _indicator_filter(spec)
+    if "optional_field" in spec:
+        return _optional_filter(spec)
+    if "field" in spec:
+        return _value_filter(spec, spec["field"])
+    if "watchlist" in spec or "watchlist_any" in spec:
+        names = spec.get("watchlist_any") or [spec["watchlist"]]
+        return _watchlist_filter(list(names))
+    if "exclude" in spec:
+        return _exclude_filter(list(spec["exclude"]))
+    raise ValueError(f"unsupported filter {spec!r}")
+
+def _liquidity_filters() -> list[Filter]:
+    return [compile_filter({"field": "price", "op": ">=", "value_from": "region.min_price_local"}),
+            compile_filter({"field": "avg_vol_30d", "op": ">=", "value_from": "region.min_avg_vol_30d"}),
+            compile_filter({"field": "dollar_turnover_30d", "op": ">=", "value_from": "region.min_dollar_turnover"})]
+
+# ---- screens ----------------------------------------------------------------
+@dataclass
+class Screen:
+    rule: str
+    name: str
+    mode: str
+    filters: list[Filter]
+    sort: list[tuple[str, bool]]                     # (value name, descending)
+    derived: dict[str, tuple[set[str], Callable[[Universe], np.ndarray]]]  # name -> (inputs, fn)
+    top_n: int = 200
+
+    @property
+    def key(self) -> str:
+        return self.rule if self.mode == "default" else f"{self.rule}:{self.mode}"
+
+    def values(self) -> set[str]:
+        """Per-symbol values read by filters, sort keys and derived fields (derived names excluded)."""
+        out = {k for k, _ in self.sort}
+        for f in self.filters:
+            out |= f.values
+        for inputs, _ in self.derived.values():
+            out |= inputs
+        return out - set(self.derived)
+
+    def series(self) -> set[str]:
+        """Panel columns read directly or behind built-in values (names that are not columns are harmless)."""
+        out = set().union(*(f.series for f in self.filters)) if self.filters else set()
+        for v in self.values() | {"price"}:
+            out |= _BUILTIN_SERIES.get(v, {v})
+        return out
+
+def _sort_keys(keys: list[str]) -> list[tuple[str, bool]]:
+    out = []
+    for k in keys or []:
+        m = re.match(r"^(.*)_(asc|desc)$", k)
+        out.append((m.group(1), m.group(2) == "desc") if m else (k, True))
+    return out
+
+def compile_rulepack(rule: str, spec: dict, modes: list[str] | None = None) -> list[Screen]:
+    """One Screen per selected mode of a rule file."""
+    derived = {k: compile_expr(str(v)) for k, v in (spec.get("derived") or {}).items()}
+    if spec.get("rank_formula"):
+        derived["rank_formula"] = compile_expr(str(spec["rank_formula"]))
+    liquidity = _liquidity_filters() if (spec.get("liquidity") or {}).get("use_region_defaults") else []
+    variants = spec.get("modes") or {"default": spec}
+    screens = []
+    for mode, body in variants.items():
+        if modes and mode not in modes and mode != "default":
+            continue
+        screens.append(Screen(rule=rule, name=spec.get("name", rule), mode=mode,
+                              filters=liquidity + [compile_filter(f) for f in body.get("filters") or []],
+                              sort=_sort_keys(body.get("sort") or spec.get("sort")), derived=derived,
+                              top_n=int(body.get("top_n") or spec.get("top_n") or 200)))
+    return screens
+
+def top_n(keys: list[tuple[np.ndarray, bool]], candidates: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the best n candidates, ordered lexicographically by keys (NaN last)."""
+    if not len(candidates):
+        return candidates
+    cols = []
+    for v, desc in keys:
+        v = np.asarray(v, dtype=float)[candidates]
+        cols.append(np.where(np.isnan(v), np.inf, -v if desc else v))
+    if not cols:
+        return candidates[:n]
+    if len(candidates) > n:
+        first = cols[0]
+        cut = np.partition(first, n - 1)[n - 1]
+        keep = np.flatnonzero(first <= cut)  # ties at the cut are resolved by the later keys
+        candidates, cols = candidates[keep], [c[keep] for c in cols]
+    order = np.lexsort(cols[::-1])
+    return candidates[order][:n]
+
+@dataclass
+class Result:
+    screen: Screen
+    table: pd.DataFrame
+    passed: int
+    missing: set[str]
+
+def apply_screen(screen: Screen, u: Universe, mask: np.ndarray | None = None,
+                 masks: dict[str, np.ndarray | None] | None = None) -> Result:
+    """Evaluate filters (all must pass; skipped filters are ignored) and rank the survivors.
+
+    masks, when given, memoizes filter results by Filter.key across screens.
+    """
+    if not u.symbols or not len(u.panel.dates):
+        return Result(screen, pd.DataFrame(columns=["rank", "symbol", "price"] + [k for k, _ in screen.sort]), 0, set())
+    for k, (_, fn) in screen.derived.items():
+        u.put(k, fn(u))
+    ok = np.ones(len(u.symbols), dtype=bool) if mask is None else mask.copy()
+    for f in screen.filters:
+        if not ok.any():
+            break
+        if masks is not None and f.key in masks:
+            m = masks[f.key]
+        else:
+            m = f.fn(u)
+            if masks is not None:
+                masks[f.key] = m
+        if m is not None:
+            ok &= m
+    idx = top_n([(u.value(k), d) for k, d in screen.sort], np.flatnonzero(ok), screen.top_n)
+    cols = {"symbol": [u.symbols[i] for i in idx], "price": u.value("price")[idx]}
+    for k, _ in screen.sort:
+        cols[k] = np.asarray(u.value(k))[idx]
+    table = pd.DataFrame(cols)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    u.forget(*screen.derived)
+    return Result(screen, table, int(ok.sum()), u.missing & (screen.values() | screen.series()))
+
+# ---- multi-screen plan --------------------------------------------------------
+@dataclass
+class Plan:
+    """Screens in execution order and, after each, the shared nodes nothing later reads."""
+    screens: list[Screen]
+    order: list[int]                          # position of each screen in the caller's list
+    release: list[list[tuple[str, str]]]      # ("series"|"value"|"mask", name) per step
+    stats: dict = field(default_factory=dict)
+
+def _needs(s: Screen) -> set[tuple[str, str]]:
+    return ({("series", n) for n in s.series()} | {("value", n) for n in s.values() | {"price"}}
+            | {("mask", f.key) for f in s.filters})
+
+def plan_screens(screens: list[Screen]) -> Plan:
+    """One dependency graph over all screens: each node is computed once and released after its last reader.
+
+    Screens are ordered greedily so that the next one shares the most panel columns with the
+    previous, which keeps few large (time x symbols) intermediates alive at a time.
+    """
+    if not screens:
+        return Plan([], [], [])
+    cols = [s.series() for s in screens]
+    order, left = [0], set(range(1, len(screens)))
+    while left:
+        prev = cols[order[-1]]
+        nxt = max(left, key=lambda j: (len(cols[j] & prev), -j))
+        order.append(nxt); left.remove(nxt)
+    last: dict[tuple[str, str], int] = {}
+    for step, i in enumerate(order):
+        for need in _needs(screens[i]):
+            last[need] = step
+    release: list[list[tuple[str, str]]] = [[] for _ in order]
+    for need, step in last.items():
+        release[step].append(need)
+    return Plan([screens[i] for i in order], order, release)
+
+def execute(plan: Plan, u: Universe) -> list[Result]:
+    """Run a plan against one universe; results come back in the caller's screen order."""
+    masks: dict[str, np.ndarray | None] = {}
+    out: list[Result | None] = [None] * len(plan.screens)
+    base = set(u.panel.names())
+    computed, peak = set(), 0
+    for step, screen in enumerate(plan.screens):
+        out[plan.order[step]] = apply_screen(screen, u, masks=masks)
+        live = set(u.panel.names()) - base
+        computed |= live
+        peak = max(peak, len(live))
+        for kind, name in plan.release[step]:
+            if kind == "series":
+                u.panel.drop(name)
+            elif kind == "value":
+                u.forget(name)
+            else:
+                masks.pop(name, None)
+    plan.stats = {"screens": len(plan.screens), "columns_computed": len(computed), "peak_live_columns": peak}
+    return out
+
+def run_rulepacks(u: Universe, rules: dict[str, dict] | None = None, modes: list[str] | None = None) -> list[Result]:
+    """All selected screens in one pass over the universe (shared intermediates, see plan_screens)."""
+    rules = rules if rules is not None else load_rulepacks()
+    return execute(plan_screens([s for r, spec in rules.items() for s in compile_rulepack(r, spec, modes)]), u)
+
+def load_universe(region: str = "US", symbols: list[str] | None = None, fields: pd.DataFrame | None = None,
+                  start=None, store: BarStore = _bars, watchlists: dict[str, set] | None = None,
+                  prefilter: bool = True) -> Universe:
+    """Panel for the region's stored daily bars (or the given symbols) plus the fields table.
+
+    With `prefilter`, symbols the nightly liquidity table (data.liquidity) marks as failing the
+    region minimums and pass-through rule are dropped before the panel is loaded.
+    Without explicit fields, the VectorVest snapshot is used and gaps (rt/rs/rv/ci/vst,
+    rt_delta_3d) are filled from the region's stored Vega scores (modules.scanner.scores).
+    """
+    from .scores import latest_scores  # scores builds on this module
+    syms = symbols if symbols is not None else region_symbols(region, "D", store)
+    if prefilter:
+        syms = liquid_symbols(region, syms)
+    panel = Panel.from_store(syms, "D", start=start, store=store)
+    if fields is None:
+        fields, scores = load_fields(), latest_scores(region)
+        fields = fields.combine_first(scores) if len(fields.columns) else scores
+    return Universe(panel, fields, region, watchlists=watchlists)
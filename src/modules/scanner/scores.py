@@ -0,0 +1,224 @@
+"""
+Cross-sectional Vega scores (rt / rs / rv / ci / vst) from modules/rules/_vega_scores.yaml
+- compute_inputs() derives the price-based inputs for a whole data.panel.Panel at once:
+  roc_1/5/10, macd_signal_distance, adx_14, stdev_63, maxdd_126, beta_252, r2_100,
+  ulcer_100, pct_above_200dma. Fundamental inputs (roe_ttm, fcf_yield_ttm, ...) come from
+  the fields table when available and are otherwise left out of the average.
+- score() ranks every input across the universe (percentile, NaN-aware), flips `invert`
+  inputs and negative weights, averages what each symbol has and scales to `scale_to`;
+  vst is the yaml formula over the sub-scores, re-weighted over the sub-scores present.
+- update_scores() keeps a per-region inputs table and a daily score history under
+  data_cache/scores; a re-run only recomputes inputs for symbols with bars newer than the
+  stored ones, then re-ranks the whole region (ranks are cross-sectional).
+- score_history() reads the stored history back as dates x symbols frames for backtests.
+"""
+from __future__ import annotations
+import os, re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+import indicator_kernels as ik
+from data.panel import Panel
+from data.bar_store import store as _bars, BarStore
+from data.regions import region_symbols
+from .rulepacks import RULES_DIR
+
+SCORES_DIR = Path(os.getenv("VEGA_SCORES_DIR", Path(__file__).resolve().parents[3] / "data_cache" / "scores"))
+SCORES_YAML = RULES_DIR / "_vega_scores.yaml"
+SCORE_HISTORY_DAYS = int(os.getenv("VEGA_SCORE_HISTORY_DAYS", "400"))
+PANEL_LOOKBACK = pd.Timedelta(days=600)  # > 252 sessions for beta plus EMA warm-up for MACD
+
+# region -> benchmark in the bar store (beta_252); the universe mean return is used when absent
+BENCHMARKS = {"US": "SPY", "CA": "XIC.TO", "TSXV": "XIC.TO", "MX": "EWW", "JP": "EWJ", "AU": "EWA",
+              "HK": "EWH", "UK": "EWU", "EU": "VGK"}
+
+PRICE_INPUTS = ["roc_1", "roc_5", "roc_10", "macd_signal_distance", "adx_14", "stdev_63", "maxdd_126",
+                "beta_252", "r2_100", "ulcer_100", "pct_above_200dma"]
+SUBSCORES = ["rt", "rs", "rv", "ci"]
+
+def load_spec(path: Path = SCORES_YAML) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return (yaml.safe_load(f) or {}).get("scoring", {})
+
+# ---- inputs -----------------------------------------------------------------
+def _returns(close: np.ndarray, n: int) -> np.ndarray:
+    c = close[-(n + 1):]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return c[1:] / c[:-1] - 1.0
+
+def _drawdown(close: np.ndarray, n: int) -> np.ndarray:
+    """c / running max - 1 over the last n rows (<= 0)."""
+    c = close[-n:]
+    return c / np.fmax.accumulate(c, axis=0) - 1.0
+
+def _r2(close: np.ndarray, n: int) -> np.ndarray:
+    """R^2 of log price on time over the last n rows."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.log(close[-n:])
+        t = np.arange(len(y), dtype=float)[:, None] - (len(y) - 1) / 2.0
+        yc = y - y.mean(axis=0)
+        return (t * yc).sum(axis=0) ** 2 / ((t * t).sum() * (yc * yc).sum(axis=0))
+
+def compute_inputs(panel: Panel, benchmark: str | None = None) -> pd.DataFrame:
+    """symbols x PRICE_INPUTS at each symbol's latest bar, plus 'asof' and 'price'."""
+    close = panel["close"]
+    rows = panel.last_rows()
+    out = {"asof": panel.dates[rows.clip(min=0)].where(rows >= 0), "price": panel.tail("close", 1)[-1]}
+    for n in (1, 5, 10):
+        out[f"roc_{n}"] = panel.tail(f"roc{n}", 1)[-1]
+    macd = panel["ema12"] - panel["ema26"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["macd_signal_distance"] = (macd[-1] - ik.ema(macd, 9)[-1]) / close[-1] * 100.0
+    out["adx_14"] = panel.tail("adx14", 1)[-1]
+    out["stdev_63"] = ik.stdev(_returns(close, 63), 63)[-1] * np.sqrt(252) * 100.0
+    out["maxdd_126"] = -np.nanmin(_drawdown(close, 126), axis=0) * 100.0
+
+    r = _returns(close, 252)
+    if benchmark is not None and benchmark in panel.symbols:
+        rb = r[:, panel.symbols.index(benchmark)][:, None]
+    else:
+        rb = np.nanmean(r, axis=1, keepdims=True)
+    ok = ~np.isnan(r) & ~np.isnan(rb)
+    cnt = ok.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rm = np.where(ok, r, 0).sum(axis=0) / cnt
+        bm = np.where(ok, rb, 0).sum(axis=0) / cnt
+        rc, bc = np.where(ok, r - rm, 0), np.where(ok, rb - bm, 0)
+        beta = (rc * bc).sum(axis=0) / (bc * bc).sum(axis=0)
+    out["beta_252"] = np.where(cnt >= 60, beta, np.nan)
+
+    out["r2_100"] = _r2(close, 100)
+    out["ulcer_100"] = np.sqrt(np.mean((_drawdown(close, 100) * 100.0) ** 2, axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["pct_above_200dma"] = (close[-1] / panel.tail("sma200", 1)[-1] - 1.0) * 100.0
+    df = pd.DataFrame(out, index=pd.Index(panel.symbols, name="symbol"))
+    return df[rows >= 0]
+
+# ---- scoring ----------------------------------------------------------------
+def _pct_rank(v: pd.Series) -> pd.Series:
+    return v.astype(float).rank(pct=True, method="average")
+
+def _combine(inputs: pd.DataFrame, block: dict) -> pd.Series:
+    names = block.get("inputs") or []
+    weights = block.get("weights") or [1.0] * len(names)
+    invert = set(block.get("invert") or [])
+    num = pd.Series(0.0, index=inputs.index)
+    den = pd.Series(0.0, index=inputs.index)
+    for name, w in zip(names, weights):
+        if name not in inputs.columns:
+            continue
+        flip = (name in invert) != (w < 0)  # lower is better
+        r = _pct_rank(-inputs[name].astype(float) if flip else inputs[name])
+        num = num.add(r.fillna(0.0) * abs(w))
+        den = den.add(r.notna() * abs(w))
+    return (num / den.where(den > 0)).astype(float)
+
+def _scale(v: pd.Series, bounds) -> pd.Series:
+    lo, hi = (bounds or [0, 1])
+    return lo + v * (hi - lo)
+
+_TERM = re.compile(r"([-+]?\s*[\d.]+)\s*\*\s*([a-z_]+)")
+
+def _formula_weights(formula: str) -> dict[str, float]:
+    return {name: float(w.replace(" ", "")) for w, name in _TERM.findall(formula or "")}
+
+def score(inputs: pd.DataFrame, spec: dict | None = None) -> pd.DataFrame:
+    """symbols x (rt, rs, rv, ci, vst), each on the yaml `scale_to` range (0-2)."""
+    spec = spec if spec is not None else load_spec()
+    out = pd.DataFrame(index=inputs.index)
+    for name in SUBSCORES:
+        if name in spec:
+            out[name] = _scale(_combine(inputs, spec[name]), spec[name].get("scale_to"))
+    vst = spec.get("vst") or {}
+    weights = _formula_weights(vst.get("formula", "")) or {"rt": 0.4, "rs": 0.3, "rv": 0.3}
+    num = pd.Series(0.0, index=out.index); den = pd.Series(0.0, index=out.index)
+    for name, w in weights.items():
+        if name in out.columns:
+            num = num.add(out[name].fillna(0.0) * w)
+            den = den.add(out[name].notna() * abs(w))
+    lo, hi = vst.get("scale_to") or [0, 2]
+    out["vst"] = (num / den.where(den > 0)).clip(lo, hi)
+    return out
+
+# ---- daily table ------------------------------------------------------------
+def _paths(region: str) -> tuple[Path, Path]:
+    return SCORES_DIR / f"{region.upper()}_inputs.feather", SCORES_DIR / f"{region.upper()}_scores.feather"
+
+def _read(path: Path) -> pd.DataFrame:
+    try:
+        return pd.read_feather(path)
+    except (OSError, ValueError):
+        return pd.DataFrame()
+
+def _write(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.reset_index(drop=True).to_feather(tmp)
+    os.replace(tmp, path)
+
+def update_scores(region: str = "US", symbols: list[str] | None = None, fields: pd.DataFrame | None = None,
+                  store: BarStore = _bars, spec: dict | None = None) -> pd.DataFrame:
+    """Refresh the region's inputs for symbols with new bars, re-rank, append today's scores."""
+    syms = list(symbols) if symbols is not None else region_symbols(region, "D", store)
+    inputs_path, scores_path = _paths(region)
+    old = _read(inputs_path)
+    old = old.set_index("symbol") if "symbol" in old.columns else pd.DataFrame(columns=["asof"])
+    last = {s: store.last_date(s, "D") for s in syms}
+    stale = [s for s in syms if last[s] is not None and (s not in old.index or last[s] > old.at[s, "asof"])]
+    if stale:
+        bench = BENCHMARKS.get(region.upper())
+        load = stale + ([bench] if bench and bench not in stale and store.exists(bench, "D") else [])
+        start = max(last[s] for s in stale) - PANEL_LOOKBACK
+        fresh = compute_inputs(Panel.from_store(load, "D", start=start, store=store), bench)
+        fresh = fresh.loc[fresh.index.intersection(stale)]
+        old = pd.concat([old.drop(index=stale, errors="ignore"), fresh])
+    inputs = old.loc[old.index.intersection(syms)]
+    _write(inputs.rename_axis("symbol").reset_index(), inputs_path)
+
+    ranked = inputs.join(fields.drop(columns=inputs.columns, errors="ignore"), how="left") if fields is not None else inputs
+    scores = score(ranked, spec)
+    date = pd.Timestamp(inputs["asof"].max()).normalize() if len(inputs) else pd.Timestamp.now().normalize()
+    today = scores.assign(date=date).rename_axis("symbol").reset_index()
+
+    hist = _read(scores_path)
+    if not hist.empty:
+        hist = hist[(hist["date"] != date) & (hist["date"] >= date - pd.Timedelta(days=SCORE_HISTORY_DAYS))]
+    hist = pd.concat([hist, today], ignore_index=True) if not hist.empty else today
+    _write(hist.sort_values(["date", "symbol"]), scores_path)
+    return _with_deltas(hist, date)
+
+def _with_deltas(hist: pd.DataFrame, date: pd.Timestamp) -> pd.DataFrame:
+    """Scores on date plus rt/vst change versus 3 score dates earlier (rt_delta_3d, vst_delta_3d)."""
+    dates = np.sort(hist["date"].unique())
+    cur = hist[hist["date"] == date].set_index("symbol")
+    pos = int(np.searchsorted(dates, np.datetime64(date)))
+    if pos >= 3:
+        prev = hist[hist["date"] == dates[pos - 3]].set_index("symbol")
+        for c in ("rt", "vst"):
+            cur[f"{c}_delta_3d"] = cur[c] - prev[c].reindex(cur.index)
+    else:
+        cur["rt_delta_3d"] = cur["vst_delta_3d"] = np.nan
+    return cur.drop(columns="date")
+
+def latest_scores(region: str = "US") -> pd.DataFrame:
+    """Most recent stored scores (with 3-day deltas); empty if the region was never scored."""
+    hist = _read(_paths(region)[1])
+    if hist.empty:
+        return pd.DataFrame()
+    return _with_deltas(hist, hist["date"].max())
+
+def score_history(region: str = "US") -> dict[str, pd.DataFrame]:
+    """Stored scores as dates x symbols frames (rt, rs, rv, ci, vst, rt_delta_3d, vst_delta_3d);
+    the point-in-time values backtests read instead of the latest snapshot. Empty if never scored."""
+    hist = _read(_paths(region)[1])
+    if hist.empty:
+        return {}
+    out = {c: hist.pivot(index="date", columns="symbol", values=c).sort_index()
+           for c in SUBSCORES + ["vst"] if c in hist.columns}
+    for c in ("rt", "vst"):
+        if c in out:
+            out[f"{c}_delta_3d"] = out[c] - out[c].shift(3)
+    return out
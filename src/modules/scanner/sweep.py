@@ -0,0 +1,163 @@
+"""
+Sharded rulepack sweeps across regions (scripts/vega_unisearch_runner.py)
+- A region's (liquidity-prefiltered) universe is split into shards of about SHARD_SIZE symbols;
+  whole industries stay in one shard so industry-relative filters see every member.
+- Shards from all regions go to one process pool. Workers receive only symbol lists, the bar
+  store root and the shard's fields rows; bars are memory-mapped from the store in the worker.
+- Each worker runs the full screen plan on its shard and returns the per-screen top-N tables;
+  merge() re-ranks the union with the same top_n ordering, so the region result equals a
+  single-process run (tie order follows symbol order in both). Each shard aligns bars on its
+  own union calendar, which only differs from the region's for symbols off the main calendar.
+"""
+from __future__ import annotations
+import math, multiprocessing, os, time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import store as _bars, BarStore
+from data.regions import REGION_GROUPS, region_symbols
+from data.liquidity import liquid_symbols
+from .rulepacks import Result, Screen, compile_rulepack, load_fields, load_rulepacks, load_universe, run_rulepacks, top_n
+
+SHARD_SIZE = int(os.getenv("VEGA_SWEEP_SHARD_SIZE", "400"))
+
+def expand_regions(regions: list[str]) -> list[str]:
+    """Region names with groups ("APAC" -> JP, AU, HK) expanded, order kept, duplicates dropped."""
+    out: list[str] = []
+    for r in regions:
+        for x in REGION_GROUPS.get(r.upper(), [r.upper()]):
+            if x not in out:
+                out.append(x)
+    return out
+
+def shard_symbols(symbols: list[str], size: int = SHARD_SIZE, groups: pd.Series | None = None) -> list[list[str]]:
+    """Split into ~len/size shards; symbols sharing a group label (industry) land in the same shard.
+
+    Groups are packed largest first onto the emptiest shard; each shard keeps the input order.
+    """
+    symbols = list(symbols)
+    n = max(1, math.ceil(len(symbols) / max(1, size)))
+    if n == 1:
+        return [symbols] if symbols else []
+    labels = groups.reindex(symbols) if groups is not None else pd.Series(np.nan, index=symbols)
+    # ungrouped symbols are their own unit
+    unit = [lab if isinstance(lab, str) and lab else f"\0{s}" for s, lab in zip(symbols, labels)]
+    members: dict[str, list[int]] = {}
+    for i, u in enumerate(unit):
+        members.setdefault(u, []).append(i)
+    load = [0] * n
+    owner: dict[str, int] = {}
+    for u in sorted(members, key=lambda k: -len(members[k])):
+        j = int(np.argmin(load))
+        owner[u] = j
+        load[j] += len(members[u])
+    shards: list[list[str]] = [[] for _ in range(n)]
+    for s, u in zip(symbols, unit):
+        shards[owner[u]].append(s)
+    return [s for s in shards if s]
+
+@dataclass
+class ShardTask:
+    region: str
+    symbols: list[str]
+    fields: pd.DataFrame
+    rules: dict[str, dict]
+    modes: list[str] | None = None
+    start: object = None
+    store_root: str | None = None
+    watchlists: dict[str, set] | None = None
+
+@dataclass
+class ShardResult:
+    region: str
+    symbols: int
+    tables: dict[str, pd.DataFrame]
+    passed: dict[str, int]
+    missing: dict[str, set[str]]
+    seconds: dict[str, float] = field(default_factory=dict)
+
+def run_shard(task: ShardTask) -> ShardResult:
+    """Worker entry point: load the shard's bars from the store (memory-mapped) and run every screen."""
+    t0 = time.time()
+    store = BarStore(task.store_root) if task.store_root else _bars
+    u = load_universe(task.region, task.symbols, fields=task.fields, start=task.start, store=store,
+                      watchlists=task.watchlists, prefilter=False)
+    t1 = time.time()
+    results = run_rulepacks(u, task.rules, task.modes)
+    return ShardResult(task.region, len(u.symbols), {r.screen.key: r.table for r in results},
+                       {r.screen.key: r.passed for r in results}, {r.screen.key: r.missing for r in results},
+                       {"load": t1 - t0, "screens": time.time() - t1})
+
+def merge(screens: list[Screen], shards: list[ShardResult]) -> list[Result]:
+    """Per-screen union of the shard top-N tables, re-ranked to the screen's top_n."""
+    out = []
+    for s in screens:
+        parts = [r.tables[s.key] for r in shards if s.key in r.tables and len(r.tables[s.key])]
+        if parts:
+            table = pd.concat(parts, ignore_index=True).drop(columns="rank").sort_values("symbol", kind="stable")
+            table = table.reset_index(drop=True)
+            idx = top_n([(table[k].to_numpy(dtype=float), d) for k, d in s.sort], np.arange(len(table)), s.top_n)
+            table = table.iloc[idx].reset_index(drop=True)
+        else:
+            table = pd.DataFrame(columns=["symbol", "price"] + [k for k, _ in s.sort])
+        table.insert(0, "rank", np.arange(1, len(table) + 1))
+        out.append(Result(s, table, sum(r.passed.get(s.key, 0) for r in shards),
+                          set().union(*(r.missing.get(s.key, set()) for r in shards))))
+    return out
+
+@dataclass
+class RegionRun:
+    region: str
+    universe: int
+    shards: int
+    results: list[Result]
+    seconds: dict[str, float]
+
+def sweep(regions: list[str], rules: dict[str, dict] | None = None, modes: list[str] | None = None,
+          workers: int | None = None, shard_size: int = SHARD_SIZE, start=None, store: BarStore = _bars,
+          fields: pd.DataFrame | None = None, watchlists: dict[str, set] | None = None) -> list[RegionRun]:
+    """Run the selected rulepacks over each region, sharded across a process pool.
+
+    workers=1 runs the shards in this process (same results, no pool).
+    """
+    from .scores import latest_scores
+    rules = rules if rules is not None else load_rulepacks()
+    screens = [s for r, spec in rules.items() for s in compile_rulepack(r, spec, modes)]
+    base = fields if fields is not None else load_fields()
+    tasks: list[ShardTask] = []
+    prep: dict[str, tuple[int, int]] = {}
+    for region in expand_regions(regions):
+        syms = liquid_symbols(region, region_symbols(region, "D", store))
+        f = base
+        if fields is None:
+            scores = latest_scores(region)
+            f = base.combine_first(scores) if len(base.columns) else scores
+        f = f[~f.index.duplicated()] if len(f.columns) else f
+        groups = f["industry"] if "industry" in f.columns else None
+        shards = shard_symbols(syms, shard_size, groups)
+        prep[region] = (len(syms), len(shards))
+        for part in shards:
+            rows = f.loc[f.index.intersection(part)] if len(f.columns) else pd.DataFrame()
+            tasks.append(ShardTask(region, part, rows, rules, modes, start, str(store.root), watchlists))
+
+    t0 = time.time()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        done = [run_shard(t) for t in tasks]
+    else:
+        # spawn: the parent may already hold pyarrow/BLAS threads, which fork() does not carry safely
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=ctx) as pool:
+            done = list(pool.map(run_shard, tasks))
+    wall = time.time() - t0
+
+    out = []
+    for region, (n, k) in prep.items():
+        mine = [r for r in done if r.region == region]
+        out.append(RegionRun(region, n, k, merge(screens, mine),
+                             {"load": sum(r.seconds["load"] for r in mine),
+                              "screens": sum(r.seconds["screens"] for r in mine), "wall": wall}))
+    return out
@@ -5,7 +5,7 @@ import pandas as pd
 _here = pathlib.Path(__file__).resolve()
 sys.path.insert(0, str(_here.parents[1]))
 
-from data.eodhd_adapter import get_eod_prices_csv, latest_close
+from data.eodhd_adapter import get_eod_prices_csv, bulk_refresh_symbols, latest_close
 from data.regions import REGIONS
 
 st.set_page_config(page_title="EODHD Stock Scanner", page_icon="📡", layout="wide")
@@ -17,8 +17,14 @@ with col1:
 with col2:
     lookback = st.selectbox("Lookback", ["3m","6m","1y"], index=1)
 
+bulk = st.checkbox("Bulk refresh region first (one request per exchange)", value=False)
 if st.button("Fetch Snapshot", type="primary"):
     syms = REGIONS[region]
+    if bulk:
+        try:
+            bulk_refresh_symbols(syms)
+        except Exception as ex:
+            st.warning(f"Bulk refresh failed, falling back to per-symbol fetch: {ex}")
     rows = []
     for s in syms:
         try:
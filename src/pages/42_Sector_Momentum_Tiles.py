@@ -6,6 +6,7 @@ _here = pathlib.Path(__file__).resolve()
 sys.path.append(str(_here.parents[1]))  # add src
 
 from data.eodhd_adapter import get_eod_prices_csv
+from data.fetch_async import fetch_all
 from modules.exports.snapshot import export_dataframe_png, export_dataframe_csv
 
 st.set_page_config(page_title="Sector Momentum Tiles", page_icon="🧩", layout="wide")
@@ -21,22 +22,29 @@ with st.expander("Settings"):
     lookback = st.selectbox("Lookback", ["6m","1y"], index=0)
     benchmark = st.text_input("Benchmark", value="SPY")
 
-def momentum_score(sym, bm, period):
+def _close(sym, period):
     df = get_eod_prices_csv(sym, period=period)
-    bf = get_eod_prices_csv(bm, period=period)
     col = "adjusted_close" if "adjusted_close" in df.columns else "close"
-    bcol = "adjusted_close" if "adjusted_close" in bf.columns else "close"
-    s = df.set_index("date")[col]
-    b = bf.set_index("date")[bcol]
+    return df.set_index("date")[col]
+
+def momentum_score(s, b):
     aligned = pd.concat([s,b], axis=1).dropna()
     ret = aligned.iloc[-1,0]/aligned.iloc[0,0]-1
     rrel= (aligned.iloc[-1,0]/aligned.iloc[0,0])/(aligned.iloc[-1,1]/aligned.iloc[0,1]) - 1
     return ret, rrel
 
 if st.button("Compute Tiles"):
+    # benchmark + all sector ETFs fetched concurrently, benchmark only once
+    got = fetch_all([benchmark, *sectors], lambda sym: _close(sym, lookback), provider="eodhd")
+    if not got[benchmark].ok:
+        st.error(f"{benchmark}: {got[benchmark].error}")
+        st.stop()
     rows=[]
     for sym, name in sectors.items():
-        r, rr = momentum_score(sym, benchmark, lookback)
+        if not got[sym].ok:
+            st.warning(f"{sym}: {got[sym].error}")
+            continue
+        r, rr = momentum_score(got[sym].value, got[benchmark].value)
         status = "🟢 Buy Today" if rr>0 and r>0 else ("🟡 Wait" if rr> -0.02 else "🔴 Avoid")
         rows.append({"ETF": sym, "Sector": name, "AbsRet": round(r,4), "RelRet": round(rr,4), "Status": status})
     df = pd.DataFrame(rows).sort_values("RelRet", ascending=False)
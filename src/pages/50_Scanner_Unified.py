@@ -5,9 +5,10 @@ import pandas as pd
 _here = pathlib.Path(__file__).resolve()
 sys.path.insert(0, str(_here.parents[1]))
 
-from data.eodhd_adapter import get_eod_prices_csv
+from data.eodhd_adapter import get_eod_prices_csv, bulk_refresh_symbols
 from data.regions import REGIONS
-from modules.scanner.patterns import rising_wedge, falling_wedge, bearish_setup_score
+from data.fetch_async import fetch_concurrent
+from modules.scanner.patterns import scan_latest
 from modules.exports.snapshot import export_df_csv, export_series_png
 
 st.set_page_config(page_title="Scanner – Unified", page_icon="🧭", layout="wide")
@@ -21,26 +22,41 @@ with colB:
 with colC:
     lookback = st.selectbox("Lookback", ["3m","6m","1y"], index=1)
 
+bulk = st.checkbox("Bulk refresh region first (one request per exchange)", value=False)
 run = st.button("Run Scan", type="primary")
 if run:
     syms = REGIONS[region]
-    rows = []
-    for sym in syms:
+    if bulk:
         try:
-            df = get_eod_prices_csv(sym, period=lookback)
+            bulk_refresh_symbols(syms)
+        except Exception as ex:
+            st.warning(f"Bulk refresh failed, falling back to per-symbol fetch: {ex}")
+    rows, closes = [], {}
+    progress = st.progress(0.0, text="Fetching…")
+    fetch = lambda sym: get_eod_prices_csv(sym, period=lookback)
+    for i, res in enumerate(fetch_concurrent(syms, fetch, provider="eodhd"), start=1):
+        sym = res.symbol
+        progress.progress(i / len(syms), text=f"{i}/{len(syms)} · {sym}")
+        try:
+            if not res.ok:
+                raise res.error
+            df = res.value
             col = "adjusted_close" if "adjusted_close" in df.columns else "close"
-            s = df.set_index("date")[col]
-            if scan == "Rising Wedge":
-                flag = rising_wedge(s, lookback=60)
-                rows.append({"Symbol": sym, "Match": bool(flag)})
-            elif scan == "Falling Wedge":
-                flag = falling_wedge(s, lookback=60)
-                rows.append({"Symbol": sym, "Match": bool(flag)})
-            else:
-                score = bearish_setup_score(s, window=20)
-                rows.append({"Symbol": sym, "BearishScore": score})
+            closes[sym] = df.set_index("date")[col]
         except Exception as ex:
             rows.append({"Symbol": sym, "Error": str(ex)[:120]})
+    progress.empty()
+    # one batched pass over every fetched symbol (last bar of each)
+    table = scan_latest(closes, lookback=60, window=20)
+    for sym in closes:
+        if scan == "Rising Wedge":
+            rows.append({"Symbol": sym, "Match": bool(table.at[sym, "rising_wedge"])})
+        elif scan == "Falling Wedge":
+            rows.append({"Symbol": sym, "Match": bool(table.at[sym, "falling_wedge"])})
+        else:
+            rows.append({"Symbol": sym, "BearishScore": float(table.at[sym, "bearish_score"])})
+    order = {s: i for i, s in enumerate(syms)}
+    rows.sort(key=lambda r: order[r["Symbol"]])
     out = pd.DataFrame(rows)
     if scan != "Best Downside Setups":
         out = out[out["Match"]==True]
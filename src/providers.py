@@ -1,4 +1,8 @@
+import os, threading, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Optional
+import numpy as np
 import pandas as pd
 
 try:
@@ -11,22 +15,137 @@ try:
 except Exception:
     yf = None  # type: ignore
 
+# Routing knobs: rolling window per provider, hedge percentile, circuit breaker
+ROUTE_WINDOW        = int(os.getenv("ROUTE_WINDOW", "50"))
+ROUTE_HEDGE_PCTL    = float(os.getenv("ROUTE_HEDGE_PCTL", "90"))
+ROUTE_HEDGE_DEFAULT = float(os.getenv("ROUTE_HEDGE_DEFAULT_SEC", "1.5"))  # before any latency history
+ROUTE_BREAKER_FAILS = int(os.getenv("ROUTE_BREAKER_FAILS", "5"))
+ROUTE_BREAKER_SEC   = float(os.getenv("ROUTE_BREAKER_SEC", "30"))
+
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("ROUTE_WORKERS", "8")), thread_name_prefix="mdp")
+
+
+class ProviderHealth:
+    """Recent latency / outcome window for one provider plus its circuit breaker."""
+
+    def __init__(self, window: int = ROUTE_WINDOW):
+        self.latency = deque(maxlen=window)   # seconds, successful calls only
+        self.outcome = deque(maxlen=window)   # 1 = data, 0 = empty or error
+        self.fails = 0                        # consecutive exceptions (and empty probes)
+        self.open_until = 0.0
+        self.probing = False                  # half-open: the single probe call is in flight
+        self.lock = threading.Lock()
+
+    def record(self, ok: bool, elapsed: float, error: bool = False):
+        with self.lock:
+            probe, self.probing = self.probing, False
+            self.outcome.append(1 if ok else 0)
+            if ok:
+                self.latency.append(elapsed)
+            if error or (probe and not ok):  # an empty probe is no evidence the provider is back
+                self.fails += 1
+                if self.fails >= ROUTE_BREAKER_FAILS:
+                    self.open_until = time.monotonic() + ROUTE_BREAKER_SEC
+            else:
+                self.fails = 0
+                self.open_until = 0.0
+
+    def available(self) -> bool:
+        """False while the breaker is open or its half-open probe is still out (for ranking; claims nothing)."""
+        with self.lock:
+            return time.monotonic() >= self.open_until and not self.probing
+
+    def admit(self) -> bool:
+        """Claim a call. Closed: always. Open: never. After the cool-down exactly one caller is
+        admitted as the probe until it reports back; data closes the breaker, one more
+        exception or an empty result re-opens it (the failure streak is kept)."""
+        with self.lock:
+            if time.monotonic() < self.open_until or self.probing:
+                return False
+            if self.open_until:
+                self.probing = True
+            return True
+
+    def pctl(self, q: float) -> Optional[float]:
+        with self.lock:
+            return float(np.percentile(self.latency, q)) if self.latency else None
+
+    def score(self) -> float:
+        """Expected cost: median latency inflated by the recent miss rate (unknown = try it)."""
+        with self.lock:
+            if not self.outcome:
+                return 0.0
+            p50 = float(np.median(self.latency)) if self.latency else ROUTE_HEDGE_DEFAULT
+            miss = 1.0 - sum(self.outcome) / len(self.outcome)
+            return p50 * (1.0 + 4.0 * miss) + (10.0 if miss >= 1.0 else 0.0)
+
+    def stats(self) -> dict:
+        with self.lock:
+            n = len(self.outcome)
+            lat = list(self.latency)
+        return {"calls": n, "hit_rate": round(sum(self.outcome) / n, 3) if n else None,
+                "p50": round(float(np.median(lat)), 3) if lat else None,
+                "p90": round(float(np.percentile(lat, 90)), 3) if lat else None,
+                "breaker_open": bool(self.open_until and time.monotonic() < self.open_until),
+                "probing": self.probing}
+
+
+_health: dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+def _health_of(name: str) -> ProviderHealth:
+    with _health_lock:
+        return _health.setdefault(name, ProviderHealth())
+
+
 class MarketDataProvider:
     def __init__(self, prefer: list[str]):
         self.order = prefer
 
+    def _ranked(self) -> list[str]:
+        """Providers that exist, best expected latency first; configured order breaks ties."""
+        names = [n for n in self.order if callable(getattr(self, f"_fetch_{n}", None))]
+        live = [n for n in names if _health_of(n).available()]
+        return sorted(live, key=lambda n: (_health_of(n).score(), names.index(n)))
+
+    def _timed(self, name: str, symbol: str, period: str, interval: str):
+        if not _health_of(name).admit():
+            return None  # breaker opened, or another caller holds the probe, since ranking
+        t0 = time.perf_counter()
+        try:
+            df = getattr(self, f"_fetch_{name}")(symbol, period, interval)
+        except Exception:
+            _health_of(name).record(False, time.perf_counter() - t0, error=True)
+            return None
+        ok = isinstance(df, pd.DataFrame) and not df.empty
+        _health_of(name).record(ok, time.perf_counter() - t0)
+        return df if ok else None
+
     def fetch_ohlc(self, symbol: str, period: str = "6mo", interval: str = "1d") -> Optional[pd.DataFrame]:
-        for name in self.order:
-            func = getattr(self, f"_fetch_{name}", None)
-            if callable(func):
-                try:
-                    df = func(symbol, period, interval)
-                    if isinstance(df, pd.DataFrame) and not df.empty:
-                        return df
-                except Exception:
-                    continue
+        """Best provider first; if it is slower than its own p90, race the runner-up (hedged request)."""
+        ranked = self._ranked()
+        while ranked:
+            first = ranked.pop(0)
+            pending = {_pool.submit(self._timed, first, symbol, period, interval)}
+            hedge_after = _health_of(first).pctl(ROUTE_HEDGE_PCTL) or ROUTE_HEDGE_DEFAULT
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done and ranked:
+                pending.add(_pool.submit(self._timed, ranked.pop(0), symbol, period, interval))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    df = fut.result()
+                    if df is not None:
+                        return df  # a slower hedge leg finishes in the background and still feeds the stats
         return None
 
+    @staticmethod
+    def health() -> dict[str, dict]:
+        """Per-provider routing stats for this process."""
+        with _health_lock:
+            names = list(_health)
+        return {n: _health_of(n).stats() for n in names}
+
     def _fetch_ibkr(self, symbol: str, period: str, interval: str):
         return None  # placeholder
 
@@ -1,5 +1,6 @@
 
-import os
+import os, time
+from collections import OrderedDict
 import pandas as pd
 from pathlib import Path
 from typing import Literal, Tuple, Optional
@@ -9,30 +10,37 @@ try:
 except Exception:
     yf = None
 
-INTERVAL_MAP = {
-    "D": "1d",
-    "W": "1wk",
-    "M": "1mo",
-}
+import indicator_kernels as ik
+from data.bar_store import store as bar_store
+from data.resample import resampled
+from services.live_indicators import IndicatorState, apply_bars
+
+# Only daily bars are downloaded; W and M are resampled locally from them (cached in the store).
+# yfinance bars get their own bar-store partition: "D" belongs to the EODHD adapter (panel, scans,
+# backtests read it), and sharing it would let each vendor overwrite the other's history and mtime.
+YF_DAILY = "yf_1d"
+DATAFEED_REFRESH_SEC = int(os.getenv("DATAFEED_REFRESH_SEC", "900"))
+
+# Chart reloads extend the cached indicator frame bar-by-bar instead of recomputing it
+DATAFEED_LIVE_CACHE = int(os.getenv("DATAFEED_LIVE_CACHE", "64"))
+LIVE_MAX_STEP = 64  # more new bars than this: one vectorized recompute is cheaper
+_live: "OrderedDict[tuple, tuple[pd.DataFrame, IndicatorState]]" = OrderedDict()
 
 CSV_TEMPLATE = "data/ohlc/{symbol}_{interval}.csv"  # e.g., NASDAQ_QQQ_D.csv
 
 
 def _heikin_ashi(df: pd.DataFrame) -> pd.DataFrame:
     """Return Heikin-Ashi candles from standard OHLCV frame (expects columns: open, high, low, close)."""
-    ha = pd.DataFrame(index=df.index.copy())
-    ha["close"] = (df["open"] + df["high"] + df["low"] + df["close"]) / 4.0
-    ha["open"] = 0.0
-    ha.loc[df.index[0], "open"] = (df["open"].iloc[0] + df["close"].iloc[0]) / 2.0
-    for i in range(1, len(df)):
-        ha.iat[i, ha.columns.get_loc("open")] = (ha["open"].iat[i-1] + ha["close"].iat[i-1]) / 2.0
+    ha_open, _, _, ha_close = ik.heikin_ashi(df["open"], df["high"], df["low"], df["close"])
+    ha = pd.DataFrame({"close": ha_close, "open": ha_open}, index=df.index.copy())
+    # wicks are taken from the raw bar (as the chart has always drawn them)
     ha["high"] = df[["high", "open", "close"]].max(axis=1)
     ha["low"] = df[["low", "open", "close"]].min(axis=1)
     return ha[["open","high","low","close"]]
 
 
 def _ema(s: pd.Series, span: int) -> pd.Series:
-    return s.ewm(span=span, adjust=False).mean()
+    return ik.ema(s, span)
 
 
 def _bollinger(close: pd.Series, length: int = 20, mult: float = 2.0):
@@ -63,11 +71,8 @@ def _macd(close: pd.Series, fast:int=12, slow:int=26, signal:int=9):
 
 
 def _rsi(close: pd.Series, length:int=14):
-    delta = close.diff()
-    gain = (delta.where(delta > 0, 0.0)).rolling(length).mean()
-    loss = (-delta.where(delta < 0, 0.0)).rolling(length).mean()
-    rs = gain / loss.replace(0, 1e-12)
-    return 100 - (100 / (1 + rs))
+    # rolling-mean gains/losses; zero loss floored at 1e-12
+    return ik.rsi(close, length, smoothing="sma", loss_floor=1e-12)
 
 
 def _obv(close: pd.Series, volume: pd.Series):
@@ -76,10 +81,7 @@ def _obv(close: pd.Series, volume: pd.Series):
 
 
 def _atr(df: pd.DataFrame, length:int=14):
-    high, low, close = df["high"], df["low"], df["close"]
-    prev_close = close.shift(1)
-    tr = pd.concat([(high - low), (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
-    return tr.rolling(length).mean()
+    return ik.atr(df["high"], df["low"], df["close"], length)
 
 
 def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
@@ -109,37 +111,85 @@ def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def fetch_ohlcv(symbol: str, interval: Literal["D","W","M"]="D", max_points: int = 1500) -> pd.DataFrame:
-    """
-    Try yfinance; if unavailable or errors, fall back to CSV in data/ohlc.
-    Returns a DataFrame with ['time','open','high','low','close','volume'].
-    """
-    # 1) Try yfinance
+def _extend(key: tuple, bars: pd.DataFrame, max_points: int) -> Optional[pd.DataFrame]:
+    """Cached frame for key advanced by the bars since its last one (None if history changed)."""
+    cached = _live.get(key)
+    if cached is None:
+        return None
+    frame, state = cached
+    last = pd.Timestamp(state.time)
+    new = bars[bars["time"] >= last]
+    prior = bars[bars["time"] < last].tail(1)
+    if not (0 < len(new) <= LIVE_MAX_STEP) or new["time"].iloc[0] != last or len(frame) < 2:
+        return None
+    if prior.empty or prior["time"].iloc[0] != frame["time"].iloc[-2] or prior["close"].iloc[0] != frame["close"].iloc[-2]:
+        return None  # older bars were rewritten (split adjustment, backfill)
+    frame = apply_bars(frame, state, new).tail(max_points).reset_index(drop=True)
+    _live[key] = (frame, state)
+    _live.move_to_end(key)
+    return frame
+
+
+def _prepare(df: pd.DataFrame, max_points: int, key: Optional[tuple] = None) -> pd.DataFrame:
+    bars = df.rename(columns={"date": "time"})[["time","open","high","low","close","volume"]].dropna()
+    if key is not None:
+        frame = _extend(key, bars, max_points)
+        if frame is not None:
+            return frame.copy()
+    bars = bars.tail(max_points).copy()
+    frame = compute_indicators(bars.set_index("time")).reset_index()
+    frame.rename(columns={"index":"time"}, inplace=True)
+    if key is not None:
+        state, _ = IndicatorState.from_frame(bars)
+        _live[key] = (frame, state)
+        _live.move_to_end(key)
+        while len(_live) > DATAFEED_LIVE_CACHE:
+            _live.popitem(last=False)
+        frame = frame.copy()
+    return frame
+
+
+def _refresh_daily(symbol: str) -> bool:
+    """Keep the stored yfinance daily series current (one download per DATAFEED_REFRESH_SEC)."""
+    p = bar_store.path(symbol, YF_DAILY)
+    if p.exists() and time.time() - p.stat().st_mtime < DATAFEED_REFRESH_SEC:
+        return True
     if yf is not None:
         try:
-            yf_symbol = symbol.replace(":", "-")  # NASDAQ:QQQ -> NASDAQ-QQQ (yahoo style often just 'QQQ')
-            yf_symbol = symbol.split(":")[-1]
-            interval_map = INTERVAL_MAP.get(interval, "1d")
-            df = yf.download(yf_symbol, period="max", interval=interval_map, auto_adjust=False, progress=False)
+            yf_symbol = symbol.split(":")[-1]  # NASDAQ:QQQ -> QQQ
+            df = yf.download(yf_symbol, period="max", interval="1d", auto_adjust=False, progress=False)
             if not df.empty:
-                df = df.rename(columns=str.lower)[["open","high","low","close","volume"]].dropna().reset_index()
-                df["time"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
-                df = df.drop(columns=["date"])
-                df = df.tail(max_points).copy()
-                df = compute_indicators(df.set_index("time")).reset_index()
-                df.rename(columns={"index":"time"}, inplace=True)
-                return df
+                if isinstance(df.columns, pd.MultiIndex):  # newer yfinance: (field, ticker)
+                    df.columns = df.columns.get_level_values(0)
+                df = df.reset_index().rename(columns=str.lower)[["date","open","high","low","close","volume"]].dropna()
+                df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
+                bar_store.write(symbol, df, YF_DAILY)
+                return True
         except Exception:
             pass
+    return p.exists()
 
-    # 2) Fallback CSV
+
+def fetch_ohlcv(symbol: str, interval: Literal["D","W","M"]="D", max_points: int = 1500) -> pd.DataFrame:
+    """
+    Daily bars come from yfinance into the bar store (partition YF_DAILY); W and M are resampled
+    from them, so switching intervals costs no network. Falls back to per-interval CSVs in
+    data/ohlc, seeded once into "csv_<interval>".
+    Returns a DataFrame with ['time','open','high','low','close','volume'] plus indicators.
+    """
+    # 1) Daily series (refreshed at most every DATAFEED_REFRESH_SEC), higher timeframes derived
+    if _refresh_daily(symbol):
+        df = bar_store.read(symbol, YF_DAILY) if interval == "D" else resampled(symbol, YF_DAILY, interval, store=bar_store)
+        if not df.empty:
+            return _prepare(df, max_points, (symbol, interval, max_points))
+
+    # 2) Fallback: bar store, seeded once from CSV
+    seeded = f"csv_{interval}"
+    if bar_store.exists(symbol, seeded):
+        return _prepare(bar_store.read(symbol, seeded), max_points)
     csv_path = CSV_TEMPLATE.format(symbol=symbol.replace(":","_"), interval=interval)
     if not Path(csv_path).exists():
         raise FileNotFoundError(f"CSV not found at {csv_path}. Provide one or enable yfinance.")
-    df = pd.read_csv(csv_path)
     # Expect columns: time, open, high, low, close, volume
-    df["time"] = pd.to_datetime(df["time"]).dt.tz_localize(None)
-    df = df[["time","open","high","low","close","volume"]].dropna().tail(max_points).copy()
-    df = compute_indicators(df.set_index("time")).reset_index()
-    df.rename(columns={"index":"time"}, inplace=True)
-    return df
+    bar_store.ingest_csv(csv_path, symbol, seeded, date_col="time")
+    return _prepare(bar_store.read(symbol, seeded), max_points)
@@ -0,0 +1,224 @@
+"""
+Streaming indicator state for the compute_indicators set (services/datafeed.py)
+- IndicatorState.update(bar) costs O(1) in history length: EMAs and MACD keep their last value,
+  rolling windows (Bollinger, Ichimoku, RSI, ATR) live in fixed-size ring buffers.
+- A bar with the same time as the last one is a revision: the state rolls back one step and re-applies it.
+- to_dict()/from_dict() are JSON-safe; save_state()/load_state() keep them under
+  data_cache/indicator_state so workers and the app share one state per (symbol, interval).
+- latest() brings a stored state up to date from the bar store and returns the newest indicator row.
+"""
+from __future__ import annotations
+import copy, json, math, os
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import store as bar_store
+
+STATE_DIR = Path(os.getenv("VEGA_INDICATOR_STATE", Path(__file__).resolve().parents[2] / "data_cache" / "indicator_state"))
+
+EMA_SPANS = (9, 21, 50, 200)
+BB_LEN, BB_MULT = 20, 2.0
+ICHI_CONV, ICHI_BASE, ICHI_SPAN = 9, 26, 52
+MACD_FAST, MACD_SLOW, MACD_SIG = 12, 26, 9
+RSI_LEN, ATR_LEN = 14, 14
+NAN = float("nan")
+
+COLUMNS = ["ema9", "ema21", "ema50", "ema200", "bb_mid", "bb_up", "bb_lo",
+           "ichimoku_conv", "ichimoku_base", "ichimoku_a", "ichimoku_b", "ichimoku_lag",
+           "macd", "macd_sig", "macd_hist", "rsi", "obv", "atr", "ha_open", "ha_high", "ha_low", "ha_close"]
+
+_RINGS = {"closes": BB_LEN, "hi_conv": ICHI_CONV, "lo_conv": ICHI_CONV, "hi_base": ICHI_BASE, "lo_base": ICHI_BASE,
+          "hi_span": ICHI_SPAN, "lo_span": ICHI_SPAN, "mid_a": ICHI_BASE + 1, "mid_b": ICHI_BASE + 1,
+          "gains": RSI_LEN, "losses": RSI_LEN, "trs": ATR_LEN}
+
+def _ema_step(prev: float | None, x: float, span: int) -> float:
+    a = 2.0 / (span + 1.0)
+    return x if prev is None else (1.0 - a) * prev + a * x
+
+def _mid(hi: deque, lo: deque) -> float:
+    return (max(hi) + min(lo)) / 2.0 if len(hi) == hi.maxlen else NAN
+
+class IndicatorState:
+    def __init__(self):
+        self.time = None            # ISO timestamp of the last bar applied
+        self.bars = 0
+        self.ema: dict[int, float | None] = {s: None for s in EMA_SPANS}
+        self.macd_fast = self.macd_slow = self.macd_sig = None
+        self.prev_close = None
+        self.obv = 0.0
+        self.ha_open = self.ha_close = None
+        for name, n in _RINGS.items():
+            setattr(self, name, deque(maxlen=n))
+        self._undo: dict | None = None  # state before the last bar (for revisions)
+
+    # ---- updates -------------------------------------------------------------
+    def update(self, bar: dict) -> dict:
+        """Apply one OHLCV bar (new or a revision of the last one); returns that bar's indicator row."""
+        t = pd.Timestamp(bar["time"]).isoformat()
+        if self.time is not None and t == self.time and self._undo is not None:
+            self._restore(self._undo)
+        elif self.time is not None and t < self.time:
+            raise ValueError(f"bar {t} is older than state time {self.time}")
+        self._undo = self._snapshot()
+        return self._apply(t, bar)
+
+    def _apply(self, t: str, bar: dict) -> dict:
+        o, h, l, c = (float(bar[k]) for k in ("open", "high", "low", "close"))
+        v = float(bar.get("volume") or 0.0)
+        v = 0.0 if math.isnan(v) else v
+        row: dict = {}
+        for s in EMA_SPANS:
+            self.ema[s] = _ema_step(self.ema[s], c, s)
+            row[f"ema{s}"] = self.ema[s]
+
+        self.closes.append(c)
+        if len(self.closes) == BB_LEN:
+            arr = np.fromiter(self.closes, float)
+            mid, sd = arr.mean(), arr.std(ddof=1)
+            row.update(bb_mid=mid, bb_up=mid + BB_MULT * sd, bb_lo=mid - BB_MULT * sd)
+        else:
+            row.update(bb_mid=NAN, bb_up=NAN, bb_lo=NAN)
+
+        for hi, lo in (("hi_conv", "lo_conv"), ("hi_base", "lo_base"), ("hi_span", "lo_span")):
+            getattr(self, hi).append(h); getattr(self, lo).append(l)
+        conv, base = _mid(self.hi_conv, self.lo_conv), _mid(self.hi_base, self.lo_base)
+        self.mid_a.append((conv + base) / 2.0)
+        self.mid_b.append(_mid(self.hi_span, self.lo_span))
+        full = len(self.mid_a) == self.mid_a.maxlen
+        row.update(ichimoku_conv=conv, ichimoku_base=base,
+                   ichimoku_a=self.mid_a[0] if full else NAN, ichimoku_b=self.mid_b[0] if full else NAN,
+                   ichimoku_lag=NAN)  # close 26 bars ahead: not known yet (see lag_target)
+
+        self.macd_fast = _ema_step(self.macd_fast, c, MACD_FAST)
+        self.macd_slow = _ema_step(self.macd_slow, c, MACD_SLOW)
+        macd = self.macd_fast - self.macd_slow
+        self.macd_sig = _ema_step(self.macd_sig, macd, MACD_SIG)
+        row.update(macd=macd, macd_sig=self.macd_sig, macd_hist=macd - self.macd_sig)
+
+        pc = self.prev_close
+        d = NAN if pc is None else c - pc
+        self.gains.append(d if d > 0 else 0.0)
+        self.losses.append(-d if d < 0 else 0.0)
+        if len(self.gains) == RSI_LEN:
+            loss = sum(self.losses) / RSI_LEN
+            row["rsi"] = 100.0 - 100.0 / (1.0 + (sum(self.gains) / RSI_LEN) / (loss if loss != 0 else 1e-12))
+        else:
+            row["rsi"] = NAN
+
+        if pc is not None:
+            self.obv += v if c > pc else (-v if c < pc else 0.0)
+        row["obv"] = self.obv
+
+        self.trs.append(h - l if pc is None else max(h - l, abs(h - pc), abs(l - pc)))
+        row["atr"] = sum(self.trs) / ATR_LEN if len(self.trs) == ATR_LEN else NAN
+
+        ha_close = (o + h + l + c) / 4.0
+        self.ha_open = (o + c) / 2.0 if self.ha_open is None else (self.ha_open + self.ha_close) / 2.0
+        self.ha_close = ha_close
+        row.update(ha_open=self.ha_open, ha_high=max(h, o, c), ha_low=min(l, o, c), ha_close=ha_close)
+
+        self.prev_close = c
+        self.time = t
+        self.bars += 1
+        return row
+
+    @staticmethod
+    def lag_target() -> int:
+        """The current close is ichimoku_lag of the bar this many rows back."""
+        return ICHI_BASE
+
+    # ---- (de)serialization ---------------------------------------------------
+    def _snapshot(self) -> dict:
+        return {k: copy.copy(v) for k, v in self.__dict__.items() if k != "_undo"}
+
+    def _restore(self, snap: dict) -> None:
+        for k, v in snap.items():
+            setattr(self, k, copy.copy(v))
+
+    def to_dict(self) -> dict:
+        def enc(v):
+            if isinstance(v, deque):
+                return list(v)
+            if isinstance(v, dict):
+                return {str(k): enc(x) for k, x in v.items()}
+            return v
+        out = {k: enc(v) for k, v in self.__dict__.items() if k != "_undo"}
+        out["_undo"] = {k: enc(v) for k, v in self._undo.items()} if self._undo else None
+        return out
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IndicatorState":
+        st = cls()
+        def dec(k, v):
+            if k in _RINGS:
+                return deque(v, maxlen=_RINGS[k])
+            if k == "ema":
+                return {int(s): x for s, x in v.items()}
+            return v
+        for k, v in d.items():
+            if k != "_undo":
+                setattr(st, k, dec(k, v))
+        st._undo = {k: dec(k, v) for k, v in d["_undo"].items()} if d.get("_undo") else None
+        return st
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> tuple["IndicatorState", pd.DataFrame]:
+        """Replay an OHLCV frame ('time' column); returns the state and the indicator rows."""
+        st = cls()
+        rows = [st.update(b) for b in df.to_dict("records")]
+        out = pd.DataFrame(rows, index=df.index, columns=COLUMNS)
+        lag = ICHI_BASE
+        if len(df) > lag:
+            out.iloc[:-lag, out.columns.get_loc("ichimoku_lag")] = df["close"].to_numpy()[lag:]
+        return st, out
+
+def apply_bars(frame: pd.DataFrame, state: IndicatorState, bars: pd.DataFrame) -> pd.DataFrame:
+    """Extend an indicator frame (as returned by compute_indicators, with 'time') by new/revised bars."""
+    frame = frame.copy()
+    for b in bars.to_dict("records"):
+        row = {**b, **state.update(b)}
+        if len(frame) and pd.Timestamp(frame["time"].iloc[-1]) == pd.Timestamp(b["time"]):
+            frame.iloc[-1, [frame.columns.get_loc(k) for k in row if k in frame.columns]] = \
+                [row[k] for k in row if k in frame.columns]
+        else:
+            frame = pd.concat([frame, pd.DataFrame([row], columns=frame.columns)], ignore_index=True)
+        if len(frame) > state.lag_target():
+            frame.iloc[-1 - state.lag_target(), frame.columns.get_loc("ichimoku_lag")] = float(b["close"])
+    return frame
+
+# ---- shared persistence --------------------------------------------------------
+def _state_path(symbol: str, interval: str) -> Path:
+    return STATE_DIR / str(interval).upper() / (str(symbol).upper().replace(":", "_").replace("/", "_") + ".json")
+
+def save_state(symbol: str, interval: str, state: IndicatorState) -> None:
+    p = _state_path(symbol, interval)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state.to_dict()))
+    os.replace(tmp, p)
+
+def load_state(symbol: str, interval: str) -> IndicatorState | None:
+    p = _state_path(symbol, interval)
+    try:
+        return IndicatorState.from_dict(json.loads(p.read_text()))
+    except (OSError, ValueError, KeyError):
+        return None
+
+def latest(symbol: str, interval: str = "D") -> dict | None:
+    """Newest indicator row for symbol, applying only bars newer than the shared state."""
+    state = load_state(symbol, interval)
+    start = pd.Timestamp(state.time).tz_localize(None) if state and state.time else None
+    bars = bar_store.read(symbol, interval, start=start)
+    if bars.empty:
+        return None
+    bars = bars.rename(columns={"date": "time"})
+    if state is None:
+        state = IndicatorState()
+    row = None
+    for b in bars.to_dict("records"):
+        row = {**b, **state.update(b)}
+    save_state(symbol, interval, state)
+    return row
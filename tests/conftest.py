@@ -0,0 +1,5 @@
+# tests/conftest.py — src/ first on sys.path for every test module (the one place tests bootstrap it)
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
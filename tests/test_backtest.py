@@ -0,0 +1,141 @@
+# tests/test_backtest.py — vectorized backtests vs per-bar references (scan as-of every row, trade loop)
+import importlib.util, subprocess, sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data.panel import Panel
+from modules.backtest.engine import HistoryUniverse, screen_signals, simulate, stay_get_regimes
+from modules.scanner.rulepacks import Universe, apply_screen, compile_rulepack, load_rulepacks
+
+ROOT = Path(__file__).resolve().parents[1]
+SETTINGS = {"regions": {"US": {"min_price_local": 5, "min_avg_vol_30d": 1000, "min_dollar_turnover": 0}}}
+
+def _panel(t=300, n=6, seed=4):
+    rng = np.random.default_rng(seed)
+    c = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (t, n)), axis=0))
+    o = c * np.exp(rng.normal(0, 0.01, (t, n)))
+    h, l = np.maximum(o, c) * (1 + rng.uniform(0, 0.02, (t, n))), np.minimum(o, c) * (1 - rng.uniform(0, 0.02, (t, n)))
+    c[:40, 0] = o[:40, 0] = h[:40, 0] = l[:40, 0] = np.nan  # listed late
+    fields = {"open": o, "high": h, "low": l, "close": c, "volume": np.full((t, n), 5000.0)}
+    return Panel(pd.bdate_range("2020-01-01", periods=t), [f"S{i}" for i in range(n)], fields, ~np.isnan(c))
+
+def _reference(p: Panel, entries, exits, stop_atr, rr, max_hold):
+    """Bar-by-bar loop per symbol over its own bars with the same fill rules."""
+    o, h, l, c, atr = p["open"], p["high"], p["low"], p["close"], p.atr(14)
+    t = len(c)
+    out = []
+    for j in range(c.shape[1]):
+        own = np.flatnonzero(p.valid[:, j])
+        s = 0
+        while s < t - 1:
+            if not (entries[s, j] and p.valid[s, j] and p.valid[s + 1, j] and atr[s, j] > 0):
+                s += 1
+                continue
+            e = s + 1
+            fill, risk = o[e, j], stop_atr * atr[s, j]
+            stop, tgt = fill - risk, fill + rr * risk
+            x = None
+            bars = own[own >= e]
+            for m, r in enumerate(bars):
+                if m and exits is not None and exits[bars[m - 1], j]:
+                    x, px, why = r, o[r, j], "signal"
+                    break
+                if l[r, j] <= stop or h[r, j] >= tgt:
+                    gap_s, gap_t = o[r, j] <= stop, o[r, j] >= tgt
+                    px = o[r, j] if gap_s or gap_t else stop if l[r, j] <= stop else tgt
+                    x, why = r, "stop" if gap_s or (not gap_t and l[r, j] <= stop) else "target"
+                    break
+                if max_hold and m == max_hold - 1:
+                    x, px, why = r, c[r, j], "time"
+                    break
+            if x is None:
+                x, px, why = t - 1, c[t - 1, j], "open"
+            out.append((p.symbols[j], p.dates[e], p.dates[x], px, why, (px - fill) / risk))
+            s = x
+    return pd.DataFrame(out, columns=["symbol", "entry_date", "exit_date", "exit", "reason", "r"])
+
+def test_simulate_matches_per_bar_loop_and_equity_adds_up():
+    p = _panel()
+    rng = np.random.default_rng(1)
+    entries, exits = rng.random(p["close"].shape) < 0.05, rng.random(p["close"].shape) < 0.03
+    for ex, hold in ((None, None), (exits, 15)):
+        bt = simulate(p, entries, ex, stop_atr=1.5, min_rr=3.0, max_hold=hold, risk_pct=0.5, capital=100_000)
+        ref = _reference(p, entries, ex, 1.5, 3.0, hold).sort_values(["entry_date", "symbol"], kind="stable")
+        got = bt.trades[ref.columns]
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), ref.reset_index(drop=True), check_dtype=False)
+        assert np.isclose(bt.equity["equity"].iloc[-1], 100_000 * (1 + 0.005 * bt.trades["r"].sum()))
+    assert set(bt.trades["reason"]) >= {"stop", "target", "signal", "time"}
+    assert (bt.trades["target"] - bt.trades["entry"]).round(9).equals((3 * (bt.trades["entry"] - bt.trades["stop"])).round(9))
+
+def test_filled_rows_are_not_bars_in_the_simulation():
+    p0 = _panel(seed=7)
+    frames = {}
+    rng = np.random.default_rng(3)
+    for j, sym in enumerate(p0.symbols):
+        df = pd.DataFrame({f: p0[f][:, j] for f in ("open", "high", "low", "close", "volume")}, index=p0.dates)
+        if j % 2:  # holidays / halts: these symbols miss ~10% of the union calendar
+            df = df[rng.random(len(df)) > 0.1]
+        frames[sym] = df.dropna(subset=["close"])
+    p = Panel.from_frames(frames)
+    assert (~p.valid[40:]).any()
+    entries = np.random.default_rng(1).random(p["close"].shape) < 0.05
+    exits = np.random.default_rng(2).random(p["close"].shape) < 0.03
+    for ex, hold in ((None, None), (exits, 10)):
+        bt = simulate(p, entries, ex, stop_atr=1.0, min_rr=2.0, max_hold=hold, risk_pct=0.5, capital=100_000)
+        ref = _reference(p, entries, ex, 1.0, 2.0, hold).sort_values(["entry_date", "symbol"], kind="stable")
+        pd.testing.assert_frame_equal(bt.trades[ref.columns].reset_index(drop=True), ref.reset_index(drop=True),
+                                      check_dtype=False)
+        rows = p.dates.get_indexer(bt.trades["exit_date"])
+        cols = [p.symbols.index(s) for s in bt.trades["symbol"]]
+        done = (bt.trades["reason"] != "open").to_numpy()
+        assert p.valid[rows[done], np.asarray(cols)[done]].all()  # never exits on a filled row
+    if hold:
+        assert (bt.trades.loc[bt.trades["reason"] == "time", "bars"] == hold).all()
+
+def test_screen_signals_equal_the_scan_as_of_each_row():
+    p = _panel(t=160, n=8, seed=7)
+    fields = pd.DataFrame({"rs": np.linspace(0.5, 2.0, 8), "vst": np.linspace(1, 2, 8), "rt_delta_3d": [1, -1] * 4},
+                          index=p.symbols)
+    rules = load_rulepacks(names=["holy_grail", "ema_squeeze", "mma_industry_crossing_40ma"])
+    rules["loose"] = {"filters": [{"indicator": "price_to_ma_band", "params": {"ma": "ema", "length": 10, "lower": 0.97,
+                                   "upper": 1.03}, "op": "any", "lookback_days": 3},
+                                  {"indicator": "adx", "params": {"length": 14}, "op": "max_last_n>=", "value": 15, "lookback_days": 5}]}
+    screens = [s for r, spec in rules.items() for s in compile_rulepack(r, spec)]
+    u = HistoryUniverse(p, fields.assign(industry=["a", "b"] * 4), "US", settings=SETTINGS)
+    sig = {s.key: screen_signals(s, u) for s in screens}
+    assert sig["loose"].any()
+    for row in range(60, 160):
+        cut = Panel(p.dates[:row + 1], p.symbols, {f: p[f][:row + 1] for f in ("open", "high", "low", "close", "volume")},
+                    p.valid[:row + 1])
+        scan = Universe(cut, fields.assign(industry=["a", "b"] * 4), "US", settings=SETTINGS)
+        for s in screens:
+            res = apply_screen(s, scan)
+            expect = set(res.table["symbol"]) if res.passed <= s.top_n else None
+            got = {sym for sym, ok in zip(p.symbols, sig[s.key][row]) if ok}
+            # the scan reads each symbol's own latest bar; rows where it did not trade are not signals
+            assert expect is None or got == {x for x in expect if p.valid[row, p.symbols.index(x)]}, (s.key, row)
+
+def test_stay_get_regimes_match_decide():
+    spec = importlib.util.spec_from_file_location("stay_get_engine", ROOT / "modules" / "stay_get" / "engine.py")
+    eng = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(eng)
+    t = eng.Triggers()
+    spy = np.array([660.0, 650.0, 640.0, 635.0, 630.0, np.nan, 652.0])
+    qqq = np.array([580.0, 580.0, 580.0, 580.0, 580.0, 580.0, 570.0])
+    want = [eng.decide(eng.Inputs(spy=None if np.isnan(a) else a, qqq=b), t).regime for a, b in zip(spy, qqq)]
+    assert list(stay_get_regimes(spy, qqq, t)) == want
+
+def test_backtest_page_loads_the_engine_from_the_repo_root():
+    # a fresh interpreter started like the Streamlit pages: repo root on sys.path, src/ not bootstrapped
+    code = (
+        "import sys, types\n"
+        "try:\n    import streamlit\n"
+        "except ImportError:\n    sys.modules['streamlit'] = types.ModuleType('streamlit')  # page only calls st in render()\n"
+        "import modules.backtest_mode as page\n"
+        "assert page.simulate is not None, page._IMPORT_ERROR\n"
+        "assert page.Triggers is not None and page.Triggers.__module__ == 'modules.stay_get.engine'\n"
+    )
+    r = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
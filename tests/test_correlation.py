@@ -0,0 +1,67 @@
+# tests/test_correlation.py — incremental return moments vs direct pairwise pandas statistics
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+import data.correlation as co
+
+def _closes(n=160, seed=2):
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2024-01-01", periods=n)
+    mkt = rng.normal(0, 0.01, n)
+    r = np.c_[mkt, 1.5 * mkt + rng.normal(0, 0.01, n), -0.5 * mkt + rng.normal(0, 0.01, n), rng.normal(0, 0.02, n)]
+    c = pd.DataFrame(100 * np.exp(np.cumsum(r, axis=0)), index=days, columns=["SPY", "HI", "NEG", "NEW"])
+    c.iloc[:100, 3] = np.nan  # listed late
+    return c
+
+def _pair(c: pd.DataFrame, a: str, b: str, window: int):
+    r = c.ffill().pct_change(fill_method=None).iloc[-window:][[a, b]].dropna()
+    return r.cov().iloc[0, 1], r[b].var(), r.corr().iloc[0, 1]
+
+def test_incremental_updates_match_rebuild_and_pandas():
+    c = _closes()
+    w = 60
+    st = co.ReturnMoments.from_closes(c.iloc[:80], w)
+    for d, row in c.iloc[80:].iterrows():
+        st.update(d, row.to_numpy())
+    full = co.ReturnMoments.from_closes(c, w)
+    for name in ("n", "sx", "sxx", "sxy"):
+        np.testing.assert_allclose(getattr(st, name), getattr(full, name), rtol=1e-9, atol=1e-12)
+    for a, b in (("HI", "SPY"), ("NEG", "SPY"), ("NEW", "SPY")):
+        cov, var_b, corr = _pair(c, a, b, w)
+        assert np.isclose(st.cov(a, b), cov) and np.isclose(st.beta(a, b), cov / var_b) and np.isclose(st.corr(a, b), corr)
+    assert st.beta("HI", "SPY") > 1.2 and st.beta("NEG", "SPY") < 0
+    betas = st.beta_table(["SPY"])
+    assert np.isclose(betas.at["NEW", "SPY"], st.beta("NEW", "SPY"))
+    rs = c.iloc[-1] / c.iloc[-21] - 1
+    assert np.isclose(st.relative_strength("HI", "SPY", 20), rs["HI"] - rs["SPY"])
+
+def test_store_job_is_incremental_and_served_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setattr(co, "COV_DIR", tmp_path / "cov")
+    store = BarStore(tmp_path / "bars")
+    c = _closes()
+    for s in c.columns:
+        store.write(s, c[s].dropna().iloc[:-5].rename("close").rename_axis("date").reset_index(), "D")
+    co.update_moments("US", ["HI", "NEG", "NEW"], benchmarks=["SPY"], store=store, window=60)
+    for s in c.columns:
+        store.append(s, c[s].iloc[-5:].rename("close").rename_axis("date").reset_index(), "D")
+    monkeypatch.setattr(co.ReturnMoments, "from_closes", classmethod(lambda cls, *a, **k: (_ for _ in ()).throw(AssertionError("rebuilt"))))
+    st = co.update_moments("US", ["HI", "NEG", "NEW"], benchmarks=["SPY"], store=store, window=60)
+    assert st.dates[-1] == c.index[-1].isoformat() and st.updates == 5
+    served = co.moments("US")
+    assert isinstance(served.sxy, np.memmap)
+    assert np.isclose(served.beta("HI", "SPY"), _pair(c, "HI", "SPY", 60)[0] / _pair(c, "HI", "SPY", 60)[1])
+    closed = pd.Timestamp(c.index[-1]).tz_localize("America/New_York") + pd.Timedelta(hours=17)
+    rs = c.iloc[-1] / c.iloc[-21] - 1
+    assert np.isclose(co.relative_strength("HI", "SPY", 20, now=closed), rs["HI"] - rs["SPY"], atol=1e-6)  # float32 store
+    assert co.relative_strength("ZZZ", "SPY", now=closed) is None
+    # a day later the state is a session behind: not served
+    assert co.relative_strength("HI", "SPY", 20, now=closed + pd.tseries.offsets.BDay()) is None
+
+def test_last_session_is_the_last_completed_close():
+    ny = lambda s: pd.Timestamp(s, tz="America/New_York")
+    assert co.last_session("US", ny("2024-03-13 15:59")) == pd.Timestamp("2024-03-12")
+    assert co.last_session("US", ny("2024-03-13 16:00")) == pd.Timestamp("2024-03-13")
+    assert co.last_session("US", ny("2024-03-16 12:00")) == pd.Timestamp("2024-03-15")  # Saturday
+    assert co.last_session("US", ny("2024-03-18 09:00")) == pd.Timestamp("2024-03-15")  # Monday pre-close
+    assert co.last_session("JP", ny("2024-03-13 09:00")) == pd.Timestamp("2024-03-13")  # Tokyo closed 15:30 JST
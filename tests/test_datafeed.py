@@ -0,0 +1,57 @@
+# tests/test_datafeed.py — the chart feed keeps its yfinance bars out of the EODHD "D" partition
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+from services import datafeed as dfd
+
+DAYS = pd.bdate_range("2025-01-02", "2025-03-28")
+
+class _FakeYF:
+    calls = 0
+
+    @classmethod
+    def download(cls, symbol, **kw):
+        cls.calls += 1
+        i = np.arange(len(DAYS), dtype=float)
+        return pd.DataFrame({"Open": 10 + i, "High": 11 + i, "Low": 9 + i, "Close": 10.5 + i,
+                             "Adj Close": 10.4 + i, "Volume": 100}, index=pd.DatetimeIndex(DAYS, name="Date"))
+
+def _feed(tmp_path, monkeypatch):
+    store = BarStore(tmp_path)
+    monkeypatch.setattr(dfd, "bar_store", store)
+    monkeypatch.setattr(dfd, "yf", _FakeYF)
+    monkeypatch.setattr(dfd, "_live", type(dfd._live)())
+    monkeypatch.setattr(_FakeYF, "calls", 0)
+    return store
+
+def test_yfinance_bars_do_not_touch_the_eodhd_partition(tmp_path, monkeypatch):
+    store = _feed(tmp_path, monkeypatch)
+    eod = pd.DataFrame({"date": DAYS[:5], "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+                        "adjusted_close": 0.9, "volume": 7})
+    store.write("QQQ", eod, "D")
+    before = store.path("QQQ", "D").stat().st_mtime_ns
+
+    d = dfd.fetch_ohlcv("QQQ", "D")
+    assert len(d) == len(DAYS) and d["close"].iloc[-1] == 10.5 + len(DAYS) - 1
+    # EODHD's file is untouched: same mtime, adjusted_close kept, no yfinance rows
+    assert store.path("QQQ", "D").stat().st_mtime_ns == before
+    kept = store.read("QQQ", "D")
+    assert len(kept) == 5 and np.allclose(kept["adjusted_close"], 0.9) and (kept["volume"] == 7).all()
+    assert store.exists("QQQ", dfd.YF_DAILY)
+
+def test_weekly_and_monthly_are_resampled_from_yfinance_bars_only(tmp_path, monkeypatch):
+    store = _feed(tmp_path, monkeypatch)
+    # an EODHD series on different prices (and an extra later bar) must not leak into W/M
+    late = pd.bdate_range("2025-01-02", "2025-04-04")
+    store.write("QQQ", pd.DataFrame({"date": late, "open": 500.0, "high": 501.0, "low": 499.0,
+                                     "close": 500.0, "volume": 1}), "D")
+    d = dfd.fetch_ohlcv("QQQ", "D")
+    w = dfd.fetch_ohlcv("QQQ", "W")
+    m = dfd.fetch_ohlcv("QQQ", "M")
+    assert _FakeYF.calls == 1  # W and M derived locally from the one yfinance download
+    assert w["time"].iloc[0] == DAYS[0] and w["time"].iloc[-1] == pd.Timestamp("2025-03-24")
+    assert w["close"].iloc[-1] == d["close"].iloc[-1] and w["high"].max() == d["high"].max()
+    assert list(m["time"]) == [pd.Timestamp("2025-01-02"), pd.Timestamp("2025-02-03"), pd.Timestamp("2025-03-03")]
+    assert m["volume"].sum() == d["volume"].sum()
+    assert store.exists("QQQ", f"{dfd.YF_DAILY}@W") and not store.exists("QQQ", "D@W")
@@ -0,0 +1,109 @@
+# tests/test_eodhd_bulk.py — bulk last-day refresh against a local EODHD stub server
+import json, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import pytest
+
+from data import eodhd_adapter as eod
+from data.bar_store import BarStore
+
+DAYS = pd.bdate_range("2025-03-03", periods=10)
+HITS = []   # (path, query) per request, api_token dropped
+SCALE = {}  # symbol -> factor applied to the whole history (EODHD re-based it)
+LAST = {}   # symbol -> close of the newest bar (a bar that was still forming when first fetched)
+
+def _hist_csv(sym, start=None):
+    base = {"AAA": 10.0, "BBB": 50.0, "CCC": 5.0}[sym] * SCALE.get(sym, 1.0)
+    df = pd.DataFrame({"Date": DAYS[:-1].strftime("%Y-%m-%d"), "Open": base, "High": base + 1, "Low": base - 1,
+                       "Close": base, "Adjusted_close": base, "Volume": 1000})
+    if sym in LAST:
+        df.loc[df.index[-1], ["Close", "Adjusted_close"]] = LAST[sym]
+    if start:
+        df = df[df["Date"] >= start]
+    return df.to_csv(index=False)
+
+class _Stub(BaseHTTPRequestHandler):
+    def log_message(self, *a):
+        pass
+
+    def do_GET(self):
+        u = urlparse(self.path); q = parse_qs(u.query)
+        HITS.append((u.path, {k: v[0] for k, v in q.items() if k != "api_token"}))
+        if u.path.startswith("/eod/"):
+            body, ctype = _hist_csv(u.path.split("/")[-1], q.get("from", [None])[0]), "text/csv"
+        elif u.path.startswith("/eod-bulk-last-day/"):
+            kind = q.get("type", [""])[0]
+            if kind == "splits":
+                rows = [{"code": "CCC", "date": DAYS[-1].strftime("%Y-%m-%d"), "split": "2/1"}]
+            elif kind == "dividends":
+                rows = []
+            else:
+                rows = [{"code": c, "exchange_short_name": "US", "date": DAYS[-1].strftime("%Y-%m-%d"),
+                         "open": p, "high": p + 1, "low": p - 1, "close": p, "adjusted_close": p, "volume": 2000}
+                        for c, p in (("AAA", 11.0), ("BBB", 51.0), ("CCC", 2.6), ("ZZZ", 1.0))]
+            body, ctype = json.dumps(rows), "application/json"
+        else:
+            self.send_response(404); self.end_headers(); return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    monkeypatch.setattr(eod, "EODHD_BASE_URL", f"http://127.0.0.1:{srv.server_address[1]}")
+    monkeypatch.setattr(eod, "EODHD_API_TOKEN", "test")
+    monkeypatch.setattr(eod, "EODHD_REFRESH_SEC", 0)
+    monkeypatch.setattr(eod, "_bars", BarStore(tmp_path))
+    HITS.clear(); SCALE.clear(); LAST.clear()
+    yield
+    srv.shutdown()
+
+def test_bulk_refresh_fans_out_to_cache(stub):
+    for s in ("AAA", "BBB", "CCC"):
+        eod.get_eod_prices_csv(s, period="1y")
+    HITS.clear()
+
+    stats = eod.bulk_refresh_symbols(["AAA", "BBB", "CCC"])[0]
+    assert stats["updated"] == 2 and stats["adjusted"] == 1
+    assert all(p == "/eod-bulk-last-day/US" for p, _ in HITS)
+
+    HITS.clear()
+    df = eod.get_eod_prices_csv("AAA", period="1y")
+    assert HITS == []  # served from the bar store after the bulk pull
+    assert df["date"].iloc[-1] == DAYS[-1] and df["close"].iloc[-1] == 11.0
+
+    # split on CCC: cache dropped, next read refetches full history
+    eod.get_eod_prices_csv("CCC", period="1y")
+    assert HITS == [("/eod/CCC", {"fmt": "csv", "period": "d"})]
+
+def test_incremental_fetch_uses_from(stub):
+    eod.get_eod_prices_csv("BBB", period="1y")
+    HITS.clear()
+    eod.get_eod_prices_csv("BBB", period="1y")
+    # overlap starts at the completed bar before the last cached one
+    assert HITS == [("/eod/BBB", {"fmt": "csv", "period": "d", "from": DAYS[-3].strftime("%Y-%m-%d")})]
+    assert len(eod._bars.read("BBB")) == len(DAYS) - 1
+
+def test_changed_last_bar_is_replaced_not_treated_as_rebase(stub):
+    eod.get_eod_prices_csv("BBB", period="1y")
+    LAST["BBB"] = 50.7  # the last bar was still forming when it was cached
+    HITS.clear()
+    df = eod.get_eod_prices_csv("BBB", period="1y")
+    assert [q.get("from") for _, q in HITS] == [DAYS[-3].strftime("%Y-%m-%d")]
+    assert len(df) == len(DAYS) - 1
+    assert df["close"].iloc[-1] == pytest.approx(50.7) and df["close"].iloc[-2] == 50.0
+
+def test_shifted_history_triggers_one_full_refetch(stub):
+    eod.get_eod_prices_csv("BBB", period="1y")
+    SCALE["BBB"] = 0.5  # 2:1 split: EODHD re-based every earlier close
+    HITS.clear()
+    df = eod.get_eod_prices_csv("BBB", period="1y")
+    assert [("from" in q) for _, q in HITS] == [True, False]  # incremental probe, then one full refetch
+    assert len(df) == len(DAYS) - 1 and (df["close"] == 25.0).all()
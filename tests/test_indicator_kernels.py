@@ -0,0 +1,101 @@
+# tests/test_indicator_kernels.py — NumPy kernels vs. the pandas formulas they replaced
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicator_kernels as ik
+
+@pytest.fixture(scope="module")
+def bars():
+    rng = np.random.default_rng(7)
+    n = 3000
+    close = pd.Series(100 + np.cumsum(rng.normal(0, 1, n)))
+    open_ = close.shift(1).fillna(100) + rng.normal(0, 0.3, n)
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close})
+
+def _same(a, b, tol=1e-9):
+    a, b = np.asarray(a, float), np.asarray(b, float)
+    assert np.array_equal(np.isnan(a), np.isnan(b))
+    np.testing.assert_allclose(a[~np.isnan(a)], b[~np.isnan(b)], rtol=tol, atol=tol)
+
+def _tr(df):
+    pc = df["close"].shift(1)
+    return pd.concat([df["high"] - df["low"], (df["high"] - pc).abs(), (df["low"] - pc).abs()], axis=1).max(axis=1)
+
+@pytest.mark.parametrize("span", [9, 21, 200])
+def test_ema(bars, span):
+    c = bars["close"]
+    _same(ik.ema(c, span), c.ewm(span=span, adjust=False).mean())
+    _same(ik.ema(c, span, min_periods=span), c.ewm(span=span, adjust=False, min_periods=span).mean())
+
+def test_sma_atr(bars):
+    _same(ik.sma(bars["close"], 50), bars["close"].rolling(50).mean())
+    _same(ik.atr(bars["high"], bars["low"], bars["close"], 14), _tr(bars).rolling(14).mean())
+
+def test_rsi_variants(bars):
+    c = bars["close"]; d = c.diff()
+    up, dn = d.clip(lower=0), -d.clip(upper=0)
+    wilder = 100 - 100 / (1 + up.ewm(alpha=1/14, adjust=False).mean()
+                          / dn.ewm(alpha=1/14, adjust=False).mean().replace(0, np.nan))
+    _same(ik.rsi(c, 14), wilder)
+    gain, loss = d.where(d > 0, 0.0).rolling(14).mean(), (-d.where(d < 0, 0.0)).rolling(14).mean()
+    _same(ik.rsi(c, 14, smoothing="sma", loss_floor=1e-12), 100 - 100 / (1 + gain / loss.replace(0, 1e-12)))
+
+def test_heikin_ashi_matches_loop(bars):
+    o, h, l, c = (bars[k] for k in ("open", "high", "low", "close"))
+    ha_close = (o + h + l + c) / 4.0
+    ha_open = np.empty(len(bars)); ha_open[0] = (o.iloc[0] + c.iloc[0]) / 2.0
+    for i in range(1, len(bars)):
+        ha_open[i] = (ha_open[i-1] + ha_close.iloc[i-1]) / 2.0
+    got_open, got_high, got_low, got_close = ik.heikin_ashi(o, h, l, c)
+    _same(got_open, ha_open); _same(got_close, ha_close)
+    _same(got_high, np.maximum(h, np.maximum(ha_open, ha_close)))
+    _same(got_low, np.minimum(l, np.minimum(ha_open, ha_close)))
+
+def test_2d_matches_columnwise(bars):
+    c = bars["close"]
+    panel = pd.DataFrame({"a": c, "b": c * 3 + 7, "c": c.shift(40)})  # leading NaNs in one column
+    _same(ik.ema(panel, 21), panel.ewm(span=21, adjust=False).mean())
+    _same(ik.sma(panel, 20), panel.rolling(20).mean())
+    cols = [ik.heikin_ashi(c, c + 1, c - 1, c * 1.001)[0], ik.heikin_ashi(c * 2, c * 2 + 1, c * 2 - 1, c * 2.002)[0]]
+    got = ik.heikin_ashi(np.c_[c, c * 2], np.c_[c + 1, c * 2 + 1], np.c_[c - 1, c * 2 - 1], np.c_[c * 1.001, c * 2.002])[0]
+    _same(got, np.c_[cols[0], cols[1]])
+
+@pytest.mark.parametrize("length", [9, 55])
+def test_wma_hull_match_rolling_apply(bars, length):
+    c = bars["close"]
+    wma = lambda s, l: s.rolling(l).apply(lambda x: np.dot(x, np.arange(1, l+1)) / np.arange(1, l+1).sum(), raw=True)
+    _same(ik.wma(c, length), wma(c, length))
+    _same(ik.hull(c, length), wma(2 * wma(c, int(length / 2)) - wma(c, length), int(np.sqrt(length))))
+
+def test_rolling_stats_and_roc(bars):
+    c, h, l = bars["close"], bars["high"], bars["low"]
+    _same(ik.stdev(c, 63), c.rolling(63).std())
+    _same(ik.rolling_max(h, 20), h.rolling(20).max()); _same(ik.rolling_min(l, 20), l.rolling(20).min())
+    _same(ik.roc(c, 5), c.pct_change(5) * 100)
+
+def test_rolling_slope_matches_polyfit(bars):
+    c = bars["close"].copy()
+    c.iloc[:10] = np.nan
+    x = np.arange(40)
+    ref = c.rolling(40).apply(lambda w: np.polyfit(x, w, 1)[0], raw=True)
+    _same(ik.rolling_slope(c, 40), ref, tol=1e-7)
+
+@pytest.mark.parametrize("n", [1, 7, 50])
+def test_rolling_max_drawdown_matches_rolling_apply(bars, n):
+    c = bars["close"].iloc[:600].copy()
+    c.iloc[:5] = np.nan
+    ref = c.rolling(n).apply(lambda w: (w / np.maximum.accumulate(w) - 1).min(), raw=True)
+    _same(ik.rolling_max_drawdown(c, n), ref)
+
+def test_adx_matches_wilder(bars):
+    h, l, c = bars["high"], bars["low"], bars["close"]
+    up, dn = h.diff(), -l.diff()
+    pdm = up.where((up > dn) & (up > 0), 0.0).where(up.notna())
+    mdm = dn.where((dn > up) & (dn > 0), 0.0).where(dn.notna())
+    tr = _tr(bars); tr.iloc[0] = np.nan
+    rma = lambda s: s.ewm(alpha=1/14, adjust=False, min_periods=14).mean()
+    pdi, mdi = 100 * rma(pdm) / rma(tr), 100 * rma(mdm) / rma(tr)
+    _same(ik.adx(h, l, c, 14), rma(100 * (pdi - mdi).abs() / (pdi + mdi)))
@@ -0,0 +1,43 @@
+# tests/test_liquidity.py — nightly liquidity prefilter tables
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+import data.liquidity as liq
+
+SETTINGS = {"regions": {"US": {"min_price_local": 5, "min_avg_vol_30d": 100000, "min_dollar_turnover": 2000000}},
+            "pass_through_rules": {"US": {"min_dollar_turnover": 1000000, "max_spread_pct": 0.75}}}
+
+def _bars(days, price, volume, spread=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    mid = price * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+    close = mid * (1 + rng.choice([-0.5, 0.5], len(days)) * spread)  # trades at bid or ask
+    return pd.DataFrame({"date": days, "open": mid, "high": np.maximum(mid * 1.01, close),
+                         "low": np.minimum(mid * 0.99, close), "close": close, "volume": volume})
+
+def test_spread_estimate_recovers_bid_ask_bounce():
+    days = pd.bdate_range("2024-01-01", periods=400)
+    est = {}
+    for s in (0.0, 0.02):
+        d = _bars(days, 50.0, 1000, spread=s, seed=1)
+        est[s] = liq.spread_estimate(*(d[c].to_numpy()[:, None] for c in ("high", "low", "close")), n=400)[0]
+    assert est[0.0] < 0.5 and 1.0 < est[0.02] < 3.0
+
+def test_table_flags_and_prefilter(tmp_path, monkeypatch):
+    monkeypatch.setattr(liq, "LIQUIDITY_DIR", tmp_path / "liq")
+    store = BarStore(tmp_path / "bars")
+    days = pd.bdate_range("2024-01-01", periods=80)
+    store.write("BIG", _bars(days, 50.0, 500000), "D")            # passes the minimums
+    store.write("THIN", _bars(days, 50.0, 30000), "D")            # $1.5M turnover, tight spread: pass-through
+    store.write("PENNY", _bars(days, 2.0, 50000, spread=0.03), "D")  # fails both
+    store.write("GONE", _bars(days[:40], 50.0, 500000), "D")      # no recent bars
+    table = liq.build_liquidity("US", ["BIG", "THIN", "PENNY", "GONE"], store=store, settings=SETTINGS)
+    assert table.loc["BIG", "adv_30d"] == 500000 and table.loc["BIG", "pass"]
+    assert not table.loc["THIN", "pass"] and table.loc["THIN", "pass_through"]
+    assert not (table.loc["PENNY", "pass"] or table.loc["PENNY", "pass_through"])
+    assert not (table.loc["GONE", "pass"] or table.loc["GONE", "pass_through"])
+
+    assert liq.liquid_symbols("US") is None  # no table yet: callers keep everything
+    liq.write_liquidity("US", table)
+    assert liq.liquid_symbols("US") == ["BIG", "THIN"]
+    assert liq.liquid_symbols("US", ["NEW", "PENNY", "BIG"]) == ["NEW", "BIG"]
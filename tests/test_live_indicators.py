@@ -0,0 +1,37 @@
+# tests/test_live_indicators.py — streaming indicator state vs. compute_indicators
+import json
+
+import numpy as np
+import pandas as pd
+
+from services.datafeed import compute_indicators
+from services.live_indicators import COLUMNS, IndicatorState, apply_bars
+
+def _bars(n=400):
+    rng = np.random.default_rng(11)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.r_[100, close[:-1]] + rng.normal(0, 0.3, n)
+    return pd.DataFrame({"time": pd.date_range("2022-01-03", periods=n, freq="B"), "open": open_,
+                         "high": np.maximum(open_, close) + rng.random(n), "low": np.minimum(open_, close) - rng.random(n),
+                         "close": close, "volume": rng.integers(1, 10_000, n).astype(float)})
+
+def _same(a, b):
+    for k in COLUMNS:
+        x, y = np.asarray(a[k], float), np.asarray(b[k], float)
+        assert np.array_equal(np.isnan(x), np.isnan(y)), k
+        np.testing.assert_allclose(x[~np.isnan(x)], y[~np.isnan(y)], rtol=1e-9, atol=1e-8, err_msg=k)
+
+def test_replay_matches_batch():
+    df = _bars()
+    _, rows = IndicatorState.from_frame(df)
+    _same(rows, compute_indicators(df.set_index("time")))
+
+def test_incremental_with_revision_and_roundtrip():
+    df = _bars()
+    frame = compute_indicators(df.iloc[:300].set_index("time")).reset_index()
+    state, _ = IndicatorState.from_frame(df.iloc[:300])
+    forming = df.iloc[300:301].assign(close=lambda d: d["close"] + 3, high=lambda d: d["high"] + 3)
+    frame = apply_bars(frame, state, forming)
+    state = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+    frame = apply_bars(frame, state, df.iloc[300:])  # revises bar 300, then appends
+    _same(frame, compute_indicators(df.set_index("time")).reset_index())
@@ -0,0 +1,49 @@
+# tests/test_panel.py — universe panel alignment and read-back
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+from data.panel import Panel
+
+def _frame(dates, seed):
+    c = 50 + np.cumsum(np.random.default_rng(seed).normal(0, 1, len(dates)))
+    return pd.DataFrame({"date": dates, "open": c, "high": c + 1, "low": c - 1, "close": c, "volume": 1000})
+
+def test_panel_matches_per_symbol(tmp_path):
+    store = BarStore(tmp_path)
+    days = pd.bdate_range("2023-01-02", periods=300)
+    store.write("AAA", _frame(days, 1), "D")
+    store.write("BBB", _frame(days[40:], 2).drop(index=[100, 101]), "D")  # late listing + gap
+    p = Panel.from_store(store=store)
+    assert p["close"].shape == (300, 2)
+
+    for sym in ("AAA", "BBB"):
+        ref = store.read(sym, "D")
+        got = p.by_symbol(sym, ["close", "ema20", "atr14"])
+        assert list(got.index) == list(ref["date"])
+        np.testing.assert_allclose(got["close"], ref["close"])
+    a = store.read("AAA", "D")
+    np.testing.assert_allclose(p.by_symbol("AAA", ["ema20"])["ema20"], a["close"].ewm(span=20, adjust=False).mean())
+
+    snap = p.by_date(days[141], ["close"])
+    assert snap.loc["BBB", "date"] == days[139]  # its own last bar before the gap
+    assert p.by_date()["date"].eq(days[-1]).all()
+
+def test_tail_matches_full_history(tmp_path):
+    days = pd.bdate_range("2023-01-02", periods=200)
+    p = Panel.from_frames({"A": _frame(days, 3), "B": _frame(days, 4)})
+    for name in ("sma50", "std20", "max20_high", "roc5", "atr14", "rsi14"):
+        part = p.tail(name, 3)
+        np.testing.assert_allclose(part, p[name][-3:], rtol=1e-9)
+
+def test_indicators_use_each_symbols_own_bars():
+    days = pd.bdate_range("2023-01-02", periods=200)
+    gappy = _frame(days, 5).drop(index=[60, 61, 62, 120, 150])  # halts: A trades, B does not
+    p = Panel.from_frames({"A": _frame(days, 6), "B": gappy})
+    alone = Panel.from_frames({"B": gappy})
+    rows = np.flatnonzero(p.valid[:, 1])
+    for name in ("roc5", "sma10", "atr14", "ema20", "max20_high"):
+        np.testing.assert_allclose(p[name][rows, 1], alone[name][:, 0], rtol=1e-9)
+        filled = p[name][[60, 61, 62], 1]
+        np.testing.assert_array_equal(filled, p[name][59, 1])  # as of the last own bar
+        np.testing.assert_allclose(p.tail(name, 60), p[name][-60:], rtol=1e-9)
@@ -0,0 +1,62 @@
+# tests/test_patterns.py — batched wedge / bearish-setup patterns vs the per-symbol reference
+import numpy as np
+import pandas as pd
+
+from modules.scanner import patterns as pt
+
+def _ref_wedge(prices: pd.Series, lookback: int, rising: bool) -> bool:
+    """The original per-symbol implementation (centered envelopes + lstsq fits)."""
+    if len(prices) < lookback + 5:
+        return False
+    s = prices.iloc[-lookback:]
+    highs = s.rolling(5, center=True).max().dropna()
+    lows = s.rolling(5, center=True).min().dropna()
+    x = np.arange(len(highs))
+    A = np.vstack([x, np.ones(len(x))]).T
+    us = np.linalg.lstsq(A, highs.values, rcond=None)[0][0]
+    ls = np.linalg.lstsq(A, lows.values, rcond=None)[0][0]
+    chg = s.pct_change(10).iloc[-1]
+    if rising:
+        return bool(us > 0 and ls > 0 and us < ls and chg < 0)
+    return bool(us < 0 and ls < 0 and us > ls and chg > 0)
+
+def _ref_bearish(s: pd.Series, window: int) -> float:
+    if len(s) < window + 5:
+        return 0.0
+    ma = s.rolling(window).mean()
+    below = float(s.iloc[-1] < ma.iloc[-1])
+    mom = float(s.iloc[-1] / s.iloc[-window] - 1.0 < 0)
+    bounce = float(s.iloc[-1] < s.rolling(3).max().iloc[-1] * 0.98)
+    return round(100.0 * (0.5 * below + 0.35 * mom + 0.15 * bounce), 2)
+
+def _closes(n_sym=12, n=220, seed=3):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)[:, None]
+    trend = rng.normal(0, 0.002, n_sym) * t + 0.15 * np.sin(t / rng.uniform(5, 15, n_sym)) * np.exp(-t / 300)
+    c = 40 * np.exp(trend + np.cumsum(rng.normal(0, 0.01, (n, n_sym)), axis=0))
+    c[:30, 0] = np.nan  # late listing
+    return pd.DataFrame(c, columns=[f"S{i}" for i in range(n_sym)])
+
+def test_history_matches_reference_on_every_row():
+    df = _closes()
+    rising, falling = pt.rising_wedges(df, 40), pt.falling_wedges(df, 40)
+    bearish = pt.bearish_setup_scores(df, 20)
+    hits = 0
+    for sym in df.columns:
+        s = df[sym].dropna()
+        for t in range(len(df) - len(s) + 20, len(df)):
+            hist = s.loc[:t]
+            assert rising.at[t, sym] == _ref_wedge(hist, 40, True)
+            assert falling.at[t, sym] == _ref_wedge(hist, 40, False)
+            assert bearish.at[t, sym] == _ref_bearish(hist, 20)
+            hits += rising.at[t, sym] + falling.at[t, sym]
+    assert hits > 0
+
+def test_scan_latest_matches_single_series_api():
+    df = _closes(seed=8)
+    closes = {s: df[s].dropna().iloc[: len(df) - 7 * i] for i, s in enumerate(df.columns)}  # ragged histories
+    table = pt.scan_latest(closes, lookback=60, window=20)
+    for s, c in closes.items():
+        assert table.at[s, "rising_wedge"] == pt.rising_wedge(c, 60) == _ref_wedge(c, 60, True)
+        assert table.at[s, "falling_wedge"] == pt.falling_wedge(c, 60) == _ref_wedge(c, 60, False)
+        assert table.at[s, "bearish_score"] == pt.bearish_setup_score(c, 20) == _ref_bearish(c, 20)
@@ -0,0 +1,39 @@
+# tests/test_polygon_aggs.py — cached Polygon aggregates: requested-start bookkeeping and incremental refresh
+import pandas as pd
+import pytest
+
+from data import polygon_aggs as pa_
+from data.bar_store import BarStore
+
+LISTED = pd.Timestamp("2025-03-03")  # first bar Polygon has for the ticker
+CALLS = []
+
+def _fake_fetch(ticker, multiplier, timespan, start, end, api_key):
+    CALLS.append(pd.Timestamp(start))
+    days = pd.bdate_range(max(pd.Timestamp(start), LISTED), "2025-03-14")
+    return pd.DataFrame({"date": days, "open": 10.0, "high": 11.0, "low": 9.0, "close": 10.0, "volume": 100.0})
+
+@pytest.fixture
+def poly(tmp_path, monkeypatch):
+    monkeypatch.setattr(pa_, "_bars", BarStore(tmp_path))
+    monkeypatch.setattr(pa_, "_fetch", _fake_fetch)
+    monkeypatch.setattr(pa_, "POLYGON_AGGS_REFRESH_SEC", 0)
+    CALLS.clear()
+    return pa_
+
+def test_short_history_is_not_refetched_for_the_same_start(poly):
+    start = "2025-01-02"  # well before the listing: the cache can never reach back this far
+    assert len(poly.get_aggs("NEW", 1, "day", start, api_key="k")) == 10
+    assert CALLS == [pd.Timestamp(start)]
+    poly.get_aggs("NEW", 1, "day", start, api_key="k")
+    poly.get_aggs("NEW", 1, "day", "2025-02-01", api_key="k")
+    # only incremental calls from the last stored bar
+    assert CALLS[1:] == [pd.Timestamp("2025-03-14")] * 2
+
+def test_earlier_start_refetches_and_is_recorded(poly):
+    poly.get_aggs("NEW", 1, "day", "2025-02-01", api_key="k")
+    poly.get_aggs("NEW", 1, "day", "2024-06-03", api_key="k")
+    assert CALLS == [pd.Timestamp("2025-02-01"), pd.Timestamp("2024-06-03")]
+    assert poly._asked("NEW", poly.interval_key(1, "day")) == pd.Timestamp("2024-06-03")
+    poly.get_aggs("NEW", 1, "day", "2024-12-02", api_key="k")
+    assert CALLS[2:] == [pd.Timestamp("2025-03-14")]
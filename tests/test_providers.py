@@ -0,0 +1,125 @@
+# tests/test_providers.py — latency-ranked routing, hedged requests and the circuit breaker with fake providers
+import threading, time
+
+import pandas as pd
+import pytest
+
+import providers as pv
+
+def _frame(tag):
+    return pd.DataFrame({"close": [1.0], "src": [tag]})
+
+class Fake(pv.MarketDataProvider):
+    """Providers are methods named _fetch_<name>; behaviour per name is set by the test."""
+
+    def __init__(self, order, **behaviour):
+        super().__init__(order)
+        self.behaviour, self.calls, self.started = behaviour, [], {}
+        for name in order:
+            setattr(self, f"_fetch_{name}", self._make(name))
+
+    def _make(self, name):
+        def fetch(symbol, period, interval):
+            self.calls.append(name)
+            self.started[name] = time.perf_counter()
+            return self.behaviour[name]()
+        return fetch
+
+@pytest.fixture(autouse=True)
+def fresh_health(monkeypatch):
+    monkeypatch.setattr(pv, "_health", {})
+    monkeypatch.setattr(pv, "ROUTE_BREAKER_FAILS", 3)
+    monkeypatch.setattr(pv, "ROUTE_BREAKER_SEC", 0.2)
+
+def _raise():
+    raise RuntimeError("down")
+
+def test_ranking_prefers_lower_latency_then_configured_order():
+    p = Fake(["a", "b", "c"], a=lambda: _frame("a"), b=lambda: _frame("b"), c=lambda: _frame("c"))
+    assert p._ranked() == ["a", "b", "c"]  # no history: configured order
+    for _ in range(5):
+        pv._health_of("a").record(True, 0.30)
+        pv._health_of("b").record(True, 0.05)
+        pv._health_of("c").record(False, 0.0)  # all misses
+    assert p._ranked() == ["b", "a", "c"]
+    assert p.fetch_ohlc("X")["src"].iloc[0] == "b"
+
+def test_hedge_fires_after_first_providers_p90():
+    release = threading.Event()
+    p = Fake(["slow", "fast"], slow=lambda: release.wait(2) and None, fast=lambda: _frame("fast"))
+    for _ in range(10):
+        pv._health_of("slow").record(True, 0.10)  # p90 = 0.10 s
+        pv._health_of("fast").record(True, 0.50)
+    try:
+        t0 = time.perf_counter()
+        df = p.fetch_ohlc("X")
+        elapsed = time.perf_counter() - t0
+    finally:
+        release.set()
+    assert df["src"].iloc[0] == "fast"
+    assert 0.09 <= p.started["fast"] - t0 < 0.5  # hedge leg launched at the p90, not before
+    assert elapsed < 1.0                          # did not wait for the slow leg
+
+def test_breaker_opens_after_consecutive_errors():
+    p = Fake(["bad", "good"], bad=_raise, good=lambda: _frame("good"))
+    assert p.fetch_ohlc("X")["src"].iloc[0] == "good"  # fails over; "bad" now ranks last
+    assert p._ranked() == ["good", "bad"]
+    for _ in range(2):
+        assert p._timed("bad", "X", "6mo", "1d") is None
+    assert p.calls.count("bad") == 3
+    h = pv._health_of("bad")
+    assert not h.available() and h.stats()["breaker_open"]
+    p.fetch_ohlc("X")
+    assert p.calls.count("bad") == 3  # skipped while open
+    assert p._ranked() == ["good"]
+
+def _trip(name):
+    for _ in range(3):
+        pv._health_of(name).record(False, 0.0, error=True)
+    time.sleep(0.25)  # past the cool-down: half-open
+
+def test_half_open_admits_a_single_probe():
+    _trip("bad")
+    h = pv._health_of("bad")
+    assert h.available()
+    barrier = threading.Barrier(8)
+    admitted = []
+    def claim():
+        barrier.wait()
+        admitted.append(h.admit())
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert admitted.count(True) == 1
+    assert not h.available() and h.stats()["probing"]
+
+def test_concurrent_callers_send_one_probe_and_success_closes():
+    _trip("flaky")
+    gate = threading.Event()
+    p = Fake(["flaky"], flaky=lambda: gate.wait(2) and _frame("flaky"))
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(p._timed("flaky", "X", "6mo", "1d"))) for _ in range(6)]
+    for t in threads: t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads: t.join()
+    assert p.calls == ["flaky"]
+    assert sum(df is not None for df in out) == 1
+    h = pv._health_of("flaky")
+    assert h.available() and h.admit() and h.admit()  # closed again: no probe bookkeeping
+    assert not h.stats()["breaker_open"]
+
+def test_failed_probe_reopens_immediately():
+    _trip("bad")
+    p = Fake(["bad"], bad=_raise)
+    assert p._timed("bad", "X", "6mo", "1d") is None
+    h = pv._health_of("bad")
+    assert not h.available() and h.stats()["breaker_open"] and not h.stats()["probing"]
+    assert p.fetch_ohlc("X") is None and p.calls == ["bad"]
+
+def test_empty_probe_keeps_the_breaker_open():
+    _trip("hollow")
+    p = Fake(["hollow"], hollow=lambda: pd.DataFrame())
+    assert p._timed("hollow", "X", "6mo", "1d") is None
+    h = pv._health_of("hollow")
+    assert not h.available() and h.stats()["breaker_open"] and not h.stats()["probing"]
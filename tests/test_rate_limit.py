@@ -0,0 +1,96 @@
+# tests/test_rate_limit.py — token buckets: atomic blocking wait, reroute when empty, delay counters
+import importlib.util, threading, time
+from pathlib import Path
+
+import pytest
+
+from data import rate_limit as rl
+from data.rate_limit import TokenBucket
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def test_concurrent_waiters_never_exceed_the_limit():
+    rate, cap, workers = 20.0, 4, 16
+    b = TokenBucket(rate, cap)
+    barrier = threading.Barrier(workers)
+    t0, got = time.monotonic(), []
+    lock = threading.Lock()
+    def worker():
+        barrier.wait()
+        assert b.wait(max_sec=5.0)
+        with lock:
+            got.append(time.monotonic() - t0)
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    got.sort()
+    # the i-th call (0-based) cannot start before its token exists: (i + 1 - cap) / rate
+    for i, at in enumerate(got):
+        assert at >= (i + 1 - cap) / rate - 0.01, (i, at)
+    s = b.stats()
+    assert s["granted"] == workers and s["rerouted"] == 0
+    assert s["delayed"] == workers - cap
+    expected = sum((i + 1) / rate for i in range(workers - cap))
+    assert s["delay_sec"] == pytest.approx(expected, abs=0.05)
+
+def test_wait_refuses_beyond_max_sec_without_taking_tokens():
+    b = TokenBucket(1.0, 1)
+    assert b.try_acquire()
+    assert not b.wait(max_sec=0.1)
+    s = b.stats()
+    assert s["granted"] == 1 and s["delayed"] == 0 and s["delay_sec"] == 0.0
+    assert b.wait_time() == pytest.approx(1.0, abs=0.05)
+
+@pytest.fixture
+def pc(monkeypatch):
+    monkeypatch.setattr(rl, "_buckets", {})
+    monkeypatch.setenv("RATE_LIMIT_POLYGON", "1/1")
+    monkeypatch.setenv("RATE_LIMIT_YFINANCE", "1/1")
+    spec = importlib.util.spec_from_file_location("price_client_under_test", ROOT / "price_client.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    monkeypatch.setattr(mod, "POLYGON_KEY", "k")
+    monkeypatch.setattr(mod, "PROVIDERS", ["polygon", "yfinance"])
+    calls = []
+
+    class _Resp:
+        status_code = 200
+        def json(self):
+            return {"results": {"p": 101.5}}
+
+    def fake_http_get(url, timeout=None):
+        calls.append("polygon")
+        return _Resp()
+
+    def fake_yf(sym, queued=False):
+        if not queued and not rl.limiter("yfinance").try_acquire():
+            raise mod.RateLimited("yfinance")
+        calls.append("yfinance")
+        return 99.0
+
+    monkeypatch.setattr(mod, "http_get", fake_http_get)
+    monkeypatch.setitem(mod._PROVIDER_FUN, "yfinance", fake_yf)
+    mod.calls = calls
+    return mod
+
+def test_empty_bucket_reroutes_to_next_provider(pc):
+    assert rl.limiter("polygon").try_acquire()  # drain polygon's single token
+    assert pc._get_price_live("AAPL") == 99.0
+    assert pc.calls == ["yfinance"]
+    s = rl.stats()
+    assert s["polygon"]["rerouted"] == 1 and s["polygon"]["delayed"] == 0
+    assert s["yfinance"]["granted"] == 1
+
+def test_all_empty_queues_once_on_the_soonest_bucket(pc, monkeypatch):
+    monkeypatch.setattr(pc, "_QUEUE_MAX_SEC", 2.0)
+    assert rl.limiter("polygon").try_acquire() and rl.limiter("yfinance").try_acquire()
+    t0 = time.monotonic()
+    assert pc._get_price_live("AAPL") in (101.5, 99.0)
+    assert 0.5 < time.monotonic() - t0 < 1.5
+    assert len(pc.calls) == 1
+    s = rl.stats()
+    waited = [n for n in ("polygon", "yfinance") if s[n]["delayed"]]
+    assert len(waited) == 1
+    w = s[waited[0]]
+    # one reroute before queueing, then the token taken by wait(); no second try_acquire
+    assert w["rerouted"] == 1 and w["granted"] == 2 and w["delay_sec"] > 0.5 and w["tokens"] == 0
@@ -0,0 +1,99 @@
+# tests/test_resample.py — calendar and session-aligned bars derived from the bar store
+import os
+
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+from data.resample import resample_bars, resampled
+
+HOLIDAYS = pd.to_datetime(["2025-01-01", "2025-01-20", "2025-04-18", "2025-05-26"])
+
+def _daily(start="2024-12-23", end="2025-06-06"):
+    days = pd.bdate_range(start, end)
+    days = days[~days.isin(HOLIDAYS)]
+    i = np.arange(len(days), dtype=float)
+    return pd.DataFrame({"date": days, "open": 100 + i, "high": 101 + i, "low": 99 + i,
+                         "close": 100.5 + i, "volume": 1000 + np.arange(len(days))})
+
+def _row(df, date):
+    return df.set_index("date").loc[pd.Timestamp(date)]
+
+def test_weekly_bars_at_holiday_and_month_edges():
+    d = _daily()
+    w = resample_bars(d, "W")
+    # Good Friday: the week runs Mon 14 - Thu 17 April and closes on Thursday
+    gf = _row(w, "2025-04-14")
+    week = d[(d["date"] >= "2025-04-14") & (d["date"] <= "2025-04-18")]
+    assert len(week) == 4
+    assert gf["open"] == week["open"].iloc[0] and gf["close"] == week["close"].iloc[-1]
+    assert gf["high"] == week["high"].max() and gf["volume"] == week["volume"].sum()
+    # New Year's Day: the week is labelled with its first session (Mon 30 Dec) and spans the year end
+    ny = _row(w, "2024-12-30")
+    assert ny["close"] == _row(d, "2025-01-03")["close"]
+    # MLK day: the week starts on Tuesday
+    assert pd.Timestamp("2025-01-21") in set(w["date"]) and pd.Timestamp("2025-01-20") not in set(w["date"])
+    # a week across a month boundary stays one bar
+    mb = _row(w, "2025-03-31")
+    assert mb["open"] == _row(d, "2025-03-31")["open"] and mb["close"] == _row(d, "2025-04-04")["close"]
+    assert w["date"].is_monotonic_increasing and len(w) == d["date"].dt.to_period("W-FRI").nunique()
+
+def test_monthly_bars_at_month_and_holiday_edges():
+    d = _daily()
+    m = resample_bars(d, "M")
+    # January opens on the 2nd (1 Jan holiday); the label is that first session
+    jan = _row(m, "2025-01-02")
+    assert jan["open"] == _row(d, "2025-01-02")["open"] and jan["close"] == _row(d, "2025-01-31")["close"]
+    # March ends on Monday the 31st, which belongs to March, not to the April week it starts
+    mar = _row(m, "2025-03-03")
+    assert mar["close"] == _row(d, "2025-03-31")["close"]
+    assert _row(m, "2025-04-01")["open"] == _row(d, "2025-04-01")["open"]
+    # May ends after the Memorial Day holiday
+    may = d[(d["date"] >= "2025-05-01") & (d["date"] <= "2025-05-31")]
+    assert _row(m, "2025-05-01")["volume"] == may["volume"].sum()
+    assert list(m["date"].dt.month) == [12, 1, 2, 3, 4, 5, 6]
+
+def _fifteen(days):
+    # regular-session 15m bars, stored as naive UTC like the Polygon series
+    idx = pd.DatetimeIndex([])
+    for day in days:
+        local = pd.date_range(f"{day} 09:30", f"{day} 15:45", freq="15min", tz="America/New_York")
+        idx = idx.append(local.tz_convert("UTC").tz_localize(None))
+    i = np.arange(len(idx), dtype=float)
+    return pd.DataFrame({"date": idx, "open": i, "high": i + 0.5, "low": i - 0.5, "close": i + 0.25,
+                         "volume": np.full(len(idx), 10)})
+
+def test_hourly_from_15m_is_session_aligned_across_days_and_dst():
+    # Friday in EST, Monday in EDT: the session opens at 14:30 UTC, then 13:30 UTC
+    b = _fifteen(["2025-03-07", "2025-03-10"])
+    h = resample_bars(b, "1h", "US")
+    local = pd.DatetimeIndex(h["date"]).tz_localize("UTC").tz_convert("America/New_York")
+    per_day = pd.Series(local.strftime("%H:%M")).groupby(local.date).apply(list)
+    want = ["09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"]
+    assert per_day.tolist() == [want, want]
+    # the last bin of a session holds only 15:30 and 15:45 and never reaches into the next day
+    fri_last = h.iloc[6]
+    assert fri_last["volume"] == 20 and fri_last["close"] == b["close"].iloc[25]
+    mon_first = h.iloc[7]
+    assert mon_first["open"] == b["open"].iloc[26] and mon_first["volume"] == 40
+    assert h["volume"].sum() == b["volume"].sum()
+
+def test_cached_series_rebuilds_after_base_append(tmp_path):
+    store = BarStore(tmp_path)
+    d = _daily()
+    store.write("SPY", d.iloc[:-3])
+    first = resampled("SPY", "D", "W", store=store)
+    target = store.path("SPY", "D@W")
+    stamp = target.stat().st_mtime_ns
+    assert stamp == store.path("SPY", "D").stat().st_mtime_ns
+    assert resampled("SPY", "D", "W", store=store).equals(first)
+    assert target.stat().st_mtime_ns == stamp  # unchanged base: served from the cache
+    # make sure the append lands on a different mtime even on coarse filesystem clocks
+    os.utime(store.path("SPY", "D"), ns=(stamp - 10**9, stamp - 10**9))
+    store.append("SPY", d.iloc[-3:])
+    again = resampled("SPY", "D", "W", store=store)
+    assert again.equals(resample_bars(store.read("SPY"), "W").astype(again.dtypes.to_dict()))
+    assert again["date"].iloc[-1] == pd.Timestamp("2025-06-02") and again["close"].iloc[-1] == d["close"].iloc[-1]
+    # the appended days extend the still-open week rather than adding a bar
+    assert len(again) == len(first) and first["close"].iloc[-1] == d["close"].iloc[-4]
+    assert again["volume"].iloc[-1] == d["volume"].iloc[-5:].sum()
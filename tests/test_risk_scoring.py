@@ -0,0 +1,70 @@
+# tests/test_risk_scoring.py — batch and rolling risk metrics vs the single-series report
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.risk import risk_scoring as rs
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(4)
+    days = pd.bdate_range("2022-01-03", periods=400)
+    r = rng.normal(0.0004, 0.015, (len(days), 5)) + rng.normal(0, 0.01, (len(days), 1))
+    p = pd.DataFrame(50 * np.exp(np.cumsum(r, axis=0)), index=days, columns=list("ABCDE"))
+    p.iloc[:120, 3] = np.nan  # listed later
+    bench = pd.Series(300 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(days)))), index=days)
+    return p, bench
+
+def _close(a: dict, b: dict):
+    for k, v in a.items():
+        assert b[k] == pytest.approx(v, rel=1e-8, abs=1e-10, nan_ok=True), k
+
+def test_batch_matches_full_report(prices):
+    p, bench = prices
+    table = rs.batch_report(p, bench)
+    for sym in p.columns:
+        _close(rs.full_report(p[sym].dropna(), bench), table.loc[sym].to_dict())
+
+def test_rolling_matches_full_report_on_each_window(prices):
+    p, bench = prices
+    w = 60
+    roll = rs.rolling_report(p, w, bench)
+    for t in (w, 150, 200, len(p) - 1):
+        for sym in p.columns:
+            hist = p[sym].iloc[t - w: t + 1]
+            got = {k: v.iloc[t][sym] for k, v in roll.items()}
+            if hist.isna().any():
+                assert np.isnan(got["sharpe"]) and np.isnan(got["max_drawdown"])
+                continue
+            _close(rs.full_report(hist, bench.loc[hist.index]), got)
+
+def test_missing_metric_scores_zero_points():
+    assert rs.composite_score({"sharpe": np.nan}) == rs.composite_score({}) == rs.composite_score({"sharpe": 0.0})
+
+def test_nan_metrics_score_as_zero_not_full_marks():
+    good = {"sharpe": 1.5, "sortino": 2.0, "volatility": 0.2, "max_drawdown": -0.1, "cvar": -0.02, "cagr": 0.1}
+    base = rs.composite_score(good)
+    # a NaN Sharpe / CAGR used to fall through clamp() and earn all 25 / 20 points
+    assert rs.composite_score({**good, "sharpe": np.nan}) == pytest.approx(base - 25 * 0.5)
+    assert rs.composite_score({**good, "cagr": np.nan}) == pytest.approx(base - 20 * 0.4)
+    # flat prices: Sharpe and Sortino are NaN (zero volatility) and score nothing;
+    # vol 0, drawdown 0 and CVaR 0 are the best values: 10 + 15 + 10 points
+    flat = rs.full_report(pd.Series(100.0, index=pd.bdate_range("2024-01-01", periods=60)))
+    assert np.isnan(flat["sharpe"]) and np.isnan(flat["sortino"])
+    assert flat["score"] == 35.0
+    table = rs.batch_report(pd.DataFrame({"F": 100.0}, index=pd.bdate_range("2024-01-01", periods=60)))
+    assert table.loc["F", "score"] == 35.0
+
+def test_rolling_cvar_with_ties():
+    z = pd.DataFrame(np.round(np.random.default_rng(1).normal(0, 0.01, (200, 2)), 3))
+    for w in (20, 21):
+        ref = z.rolling(w).apply(lambda v: rs.cvar(pd.Series(v)), raw=True)
+        pd.testing.assert_frame_equal(rs.rolling_cvar(z, w), ref)
+
+@pytest.mark.parametrize("w, alpha", [(30, 0.05), (12, 0.5), (5, 1.0)])
+def test_rolling_cvar_across_nan_gaps(w, alpha):
+    z = pd.DataFrame(np.random.default_rng(2).normal(0, 0.01, (300, 3)))
+    z.iloc[:80, 1] = np.nan   # listed later
+    z.iloc[150, 2] = np.nan   # one missing print restarts the window
+    ref = z.rolling(w).apply(lambda v: rs.cvar(pd.Series(v), alpha), raw=True)
+    pd.testing.assert_frame_equal(rs.rolling_cvar(z, w, alpha), ref, rtol=1e-12, atol=1e-15)
@@ -0,0 +1,66 @@
+# tests/test_rulepacks.py — rulepack compiler/executor on a small synthetic universe
+import numpy as np
+import pandas as pd
+
+from data.panel import Panel
+from modules.scanner.rulepacks import (Universe, apply_screen, compile_rulepack, execute, load_rulepacks,
+                                      plan_screens, run_rulepacks, top_n)
+
+SETTINGS = {"regions": {"US": {"min_price_local": 5, "min_avg_vol_30d": 1000, "min_dollar_turnover": 0}}}
+
+def _universe(fields=None):
+    days = pd.bdate_range("2024-01-01", periods=120)
+    flat = np.full(120, 20.0)
+    frames = {
+        "UP": np.r_[flat[:-1], 25.0],          # crosses above every MA on the last bar
+        "FLAT": np.linspace(21.0, 20.0, 120),  # drifting down, below its MAs
+        "PENNY": np.full(120, 2.0),            # fails the region price floor
+    }
+    frames = {s: pd.DataFrame({"date": days, "open": c, "high": c, "low": c, "close": c, "volume": 5000})
+              for s, c in frames.items()}
+    return Universe(Panel.from_frames(frames), fields, "US", settings=SETTINGS)
+
+def test_filters_and_liquidity():
+    u = _universe(pd.DataFrame({"vst": [1.5, 1.0, 2.0]}, index=["UP", "FLAT", "PENNY"]))
+    spec = {"liquidity": {"use_region_defaults": True}, "top_n": 10, "sort": ["vst_desc"],
+            "filters": [{"indicator": "cross", "params": {"a": "close", "b": "ema20"}, "op": "bullish_within", "lookback_days": 1}]}
+    (screen,) = compile_rulepack("t", spec)
+    res = apply_screen(screen, u)
+    assert list(res.table["symbol"]) == ["UP"] and not res.missing
+
+def test_unknown_field_is_reported():
+    u = _universe()
+    (screen,) = compile_rulepack("t", {"filters": [{"field": "grt", "op": ">=", "value": 0.1}]})
+    res = apply_screen(screen, u)
+    assert res.passed == 0 and res.missing == {"grt"}
+
+def test_top_n_lexicographic_with_ties():
+    a = np.array([3.0, 5.0, 5.0, np.nan, 1.0, 5.0])
+    b = np.array([0.0, 1.0, 3.0, 9.0, 9.0, 2.0])
+    assert list(top_n([(a, True), (b, True)], np.arange(6), 3)) == [2, 5, 1]
+
+def test_all_rule_files_compile_and_run():
+    rules = load_rulepacks()
+    assert len(rules) >= 13
+    results = run_rulepacks(_universe(), rules)
+    assert {r.screen.key for r in results} >= {"ema_squeeze:base", "ema_squeeze:plus50", "holy_grail"}
+
+def test_plan_shares_and_releases_intermediates(monkeypatch):
+    calls = []
+    compute = Panel._compute
+    monkeypatch.setattr(Panel, "_compute", lambda self, name, rows=None: calls.append(name) or compute(self, name, rows))
+    u = _universe(pd.DataFrame({"vst": [1.5, 1.0, 2.0]}, index=["UP", "FLAT", "PENNY"]))
+    rules = load_rulepacks(names=["ema_squeeze", "holy_grail", "long_term_winners"])
+    screens = [s for r, spec in rules.items() for s in compile_rulepack(r, spec)]
+    singles = [apply_screen(s, Universe(u.panel, u.fields, "US", settings=SETTINGS)).table for s in screens]
+    for n in u.panel.names():
+        u.panel.drop(n)
+    calls.clear()
+
+    plan = plan_screens(screens)
+    results = execute(plan, u)
+    assert len(calls) == len(set(calls))  # every column computed once across all screens
+    assert set(u.panel.names()) == {"open", "high", "low", "close", "volume"}
+    assert [r.screen.key for r in results] == [s.key for s in screens]
+    for r, t in zip(results, singles):
+        pd.testing.assert_frame_equal(r.table, t)
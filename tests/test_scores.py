@@ -0,0 +1,39 @@
+# tests/test_scores.py — cross-sectional Vega scores and the incremental daily table
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+import modules.scanner.scores as sc
+
+def test_score_ranks_inverts_and_reweights():
+    inputs = pd.DataFrame({"roc_1": [1.0, 2.0, 3.0], "stdev_63": [30.0, 20.0, 10.0]}, index=list("abc"))
+    spec = {"rt": {"inputs": ["roc_1"], "scale_to": [0, 2]},
+            "rs": {"inputs": ["stdev_63", "beta_252"], "invert": ["stdev_63", "beta_252"], "scale_to": [0, 2]},
+            "rv": {"inputs": ["fcf_yield_ttm"], "scale_to": [0, 2]},
+            "vst": {"formula": "0.4*rt + 0.3*rs + 0.3*rv", "scale_to": [0, 2]}}
+    out = sc.score(inputs, spec)
+    assert list(out["rt"].round(6)) == [round(2 / 3, 6), round(4 / 3, 6), 2.0]
+    assert out["rs"].equals(out["rt"])       # lower volatility ranks higher
+    assert out["rv"].isna().all()            # no fundamentals: rv absent ...
+    np.testing.assert_allclose(out["vst"], out["rt"])  # ... and vst re-weights over rt/rs
+
+def test_update_only_recomputes_symbols_with_new_bars(tmp_path, monkeypatch):
+    monkeypatch.setattr(sc, "SCORES_DIR", tmp_path / "scores")
+    store = BarStore(tmp_path / "bars")
+    days = pd.bdate_range("2022-01-03", periods=320)
+    rng = np.random.default_rng(5)
+    for s in ("AAA", "BBB", "CCC", "SPY"):
+        c = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+        store.write(s, pd.DataFrame({"date": days, "open": c, "high": c * 1.01, "low": c * 0.99, "close": c, "volume": 1000}), "D")
+    first = sc.update_scores("US", ["AAA", "BBB", "CCC", "SPY"], store=store)
+    assert first["vst"].between(0, 2).all()
+
+    store.append("AAA", pd.DataFrame({"date": [days[-1] + pd.offsets.BDay()], "open": [60.0], "high": [61.0],
+                                      "low": [59.0], "close": [60.0], "volume": [1000]}), "D")
+    loaded = []
+    real = sc.compute_inputs
+    monkeypatch.setattr(sc, "compute_inputs", lambda panel, bench=None: loaded.append(set(panel.symbols)) or real(panel, bench))
+    sc.update_scores("US", ["AAA", "BBB", "CCC", "SPY"], store=store)
+    assert loaded == [{"AAA", "SPY"}]  # only the symbol with a new bar (plus the benchmark)
+    hist = pd.read_feather(tmp_path / "scores" / "US_scores.feather")
+    assert hist["date"].nunique() == 2 and len(sc.latest_scores("US")) == 4
@@ -0,0 +1,45 @@
+# tests/test_sweep.py — sharded rulepack sweeps match a single-process run
+import numpy as np
+import pandas as pd
+
+from data.bar_store import BarStore
+from modules.scanner.rulepacks import load_rulepacks, load_universe, run_rulepacks
+from modules.scanner.sweep import expand_regions, shard_symbols, sweep
+
+def _store(tmp_path, n=48):
+    store = BarStore(tmp_path / "bars")
+    days = pd.bdate_range("2023-01-02", periods=260)
+    rng = np.random.default_rng(11)
+    syms = [f"S{i:02d}" for i in range(n)]
+    for s in syms:
+        c = 30 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, len(days))))
+        store.write(s, pd.DataFrame({"date": days, "open": c, "high": c * 1.01, "low": c * 0.99,
+                                     "close": c, "volume": 200000}), "D")
+    fields = pd.DataFrame({"vst": rng.uniform(0, 2, n), "rt": rng.uniform(0, 2, n),
+                           "industry": [f"IND{i % 5}" for i in range(n)]}, index=syms)
+    return store, fields
+
+def test_shards_keep_industries_together():
+    syms = [f"S{i:02d}" for i in range(30)]
+    groups = pd.Series([f"G{i % 4}" for i in range(30)], index=syms)
+    shards = shard_symbols(syms, 8, groups)
+    assert sorted(s for part in shards for s in part) == syms
+    for part in shards:
+        assert part == sorted(part)
+        for other in shards:
+            if other is not part:
+                assert not set(groups[part]) & set(groups[other])
+    assert expand_regions(["US", "APAC", "us"]) == ["US", "JP", "AU", "HK"]
+
+def test_sharded_sweep_matches_single_process(tmp_path):
+    store, fields = _store(tmp_path)
+    rules = load_rulepacks(names=["mma_industry_crossing_40ma", "ema_squeeze", "holy_grail"])
+    rules["by_vst"] = {"top_n": 7, "sort": ["vst_desc", "rt_desc"],
+                       "filters": [{"indicator": "ma_relation", "params": {"a": 1, "b": 50, "rel": ">"}}]}
+    single = run_rulepacks(load_universe("US", list(fields.index), fields=fields, store=store, prefilter=False), rules)
+    for workers in (1, 2):
+        (run,) = sweep(["US"], rules, workers=workers, shard_size=10, store=store, fields=fields)
+        assert run.universe == 48 and run.shards == 5
+        for a, b in zip(single, run.results):
+            assert a.screen.key == b.screen.key and a.passed == b.passed
+            pd.testing.assert_frame_equal(a.table.reset_index(drop=True), b.table, check_dtype=False)
@@ -2,7 +2,9 @@ import os
 import datetime as dt
 import pytz
 import requests
-import yfinance as yf
+
+from data.quotes import quote_snapshot  # batched, single-flight yf.download
+from data.quote_cache import quote_cache
 
 # --- Robust timezone with fallback ---
 tz_pref = os.getenv("TZ_PREF") or "America/Los_Angeles"
@@ -24,24 +26,18 @@ def in_apac_window(ts=None):
     ts = ts or now_pt()
     return 18 <= ts.hour < 22
 
+def _snapshot(ticker):
+    # served from the shared quote cache; last and prev close come from the same daily frame
+    return quote_cache.get(ticker, lambda s: quote_snapshot([s])[s], ns="snapshot")
+
 def last_price(ticker):
-    df = yf.download(ticker, period="1d", interval="1m", progress=False, auto_adjust=False)
-    if df.empty:
-        return None
-    return float(df["Close"].dropna().iloc[-1])
+    return quote_cache.get(ticker, lambda s: _snapshot(s)["last"])
 
 def prev_close(ticker):
-    df = yf.download(ticker, period="5d", interval="1d", progress=False, auto_adjust=False)
-    if df.empty or len(df["Close"]) < 2:
-        return None
-    return float(df["Close"].iloc[-2])
+    return _snapshot(ticker)["prev_close"]
 
 def pct_from_prev_close(ticker):
-    p0 = prev_close(ticker)
-    p = last_price(ticker)
-    if p0 is None or p is None:
-        return None
-    return (p / p0 - 1.0) * 100.0
+    return _snapshot(ticker)["pct"]
 
 def fmt_num(x, n=2):
     return "n/a" if x is None else f"{x:.{n}f}"
@@ -1,16 +1,22 @@
 # utils/data.py
 import datetime as dt
-import yfinance as yf
 import pandas as pd
 
+from data.quotes import download
+from data.quote_cache import quote_cache
+
 def _hist(ticker, period="6mo", interval="1d"):
-    return yf.download(ticker, period=period, interval=interval, progress=False)
+    # concurrent callers asking for the same ticker/period/interval share one download
+    return download(ticker, period=period, interval=interval)
 
-def get_price(ticker: str) -> float:
+def _live_price(ticker: str) -> float:
     df = _hist(ticker, period="5d", interval="1m")
     if df.empty: raise RuntimeError(f"No data for {ticker}")
     return float(df["Close"].dropna().iloc[-1])
 
+def get_price(ticker: str) -> float:
+    return quote_cache.get(ticker, _live_price)
+
 def get_close(ticker: str) -> float:
     df = _hist(ticker, period="3mo", interval="1d")
     if df.empty: raise RuntimeError(f"No data for {ticker}")
@@ -0,0 +1,14 @@
+"""
+src/ on sys.path for repo-root entry points (Streamlit scripts, reports, workers run directly)
+- Import it first in an entry point; library modules never touch sys.path themselves.
+- src/ goes first, so its packages (data, services, modules, ...) win over same-named
+  repo-root directories.
+"""
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parent / "src")
+if sys.path[:1] != [SRC]:
+    if SRC in sys.path:
+        sys.path.remove(SRC)
+    sys.path.insert(0, SRC)
@@ -1,50 +1,40 @@
 # vega_tradeability_meter.py — Polygon LIVE (15m / 1h / Daily) + Journal + Sheets sync + Test button
 import os
 import io
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 import streamlit as st
 
+import vega_paths  # noqa: F401  (src/ first on sys.path)
+from data.polygon_aggs import get_aggs, get_resampled
+import indicator_kernels as ik
+
 POLY_KEY = os.getenv("POLYGON_API_KEY") or os.getenv("POLYGON_KEY")
 SHEETS_SPREADSHEET_ID = os.getenv("SHEETS_SPREADSHEET_ID")
 SHEETS_WORKSHEET = os.getenv("SHEETS_WORKSHEET_NAME", "tradeability_log")
 
-def _poly_range_url(ticker: str, mult: int, span: str, start_dt, end_dt) -> str:
-    return (
-        f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{mult}/{span}/"
-        f"{start_dt.date()}/{end_dt.date()}?adjusted=true&sort=asc&limit=50000&apiKey={POLY_KEY}"
-    )
-
-@st.cache_data(show_spinner=False, ttl=60)
 def fetch_polygon(ticker: str, timeframe: str) -> pd.DataFrame:
-    if not POLY_KEY:
-        raise RuntimeError("Missing Polygon API key (set POLYGON_API_KEY or POLYGON_KEY in Render).")
-    ticker = ticker.upper().strip()
+    # shared Polygon aggregates cache: only bars newer than the stored series are downloaded;
+    # 1h is resampled (session-aligned) from the same 15m series, so 15m <-> 1h costs no request
     now = datetime.now(timezone.utc)
     if timeframe == "15m":
         mult, span = 15, "minute"; start = now - timedelta(days=10)
     elif timeframe == "1h":
-        mult, span = 1, "hour"; start = now - timedelta(days=60)
+        df = get_resampled(ticker, 15, "minute", "1h", now - timedelta(days=60), api_key=POLY_KEY)
+        if df.empty:
+            raise RuntimeError(f"No data returned for {ticker.upper().strip()} ({timeframe}).")
+        return df
     else:
         mult, span = 1, "day"; start = (now - relativedelta(months=6, days=3))
-    url = _poly_range_url(ticker, mult, span, start, now)
-    r = requests.get(url, timeout=20); r.raise_for_status()
-    data = r.json().get("results", [])
-    if not data:
-        raise RuntimeError(f"No data returned for {ticker} ({timeframe}).")
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["t"], unit="ms", utc=True)
-    df.rename(columns={"o":"open","h":"high","l":"low","c":"close","v":"volume"}, inplace=True)
-    return df.set_index("date")[["open","high","low","close","volume"]].sort_index()
+    df = get_aggs(ticker, mult, span, start, api_key=POLY_KEY)
+    if df.empty:
+        raise RuntimeError(f"No data returned for {ticker.upper().strip()} ({timeframe}).")
+    return df
 
 def atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
-    h, l, c = df["high"], df["low"], df["close"]
-    prev_c = c.shift(1)
-    tr = pd.concat([(h - l), (h - prev_c).abs(), (l - prev_c).abs()], axis=1).max(axis=1)
-    return tr.rolling(n).mean()
+    return ik.atr(df["high"], df["low"], df["close"], n)
 
 def score_tradeability(df: pd.DataFrame) -> dict:
     if len(df) < 60:
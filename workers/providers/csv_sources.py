@@ -1,9 +1,11 @@
-import os, io, csv, requests
+import os, io, csv
 from datetime import datetime, timezone
 from dateutil import parser
 
+from data.http_client import http_get
+
 def fetch_csv(url: str) -> list[dict]:
-    r = requests.get(url, timeout=30)
+    r = http_get(url, timeout=30)
     r.raise_for_status()
     text = r.text
     sniffer = csv.Sniffer()
@@ -1,25 +1,25 @@
-import os, time, requests
+import os
+
+from data.http_client import session
+from data.polygon_aggs import get_aggs, as_results
+import pandas as pd
 
 class Polygon:
     def __init__(self, api_key: str, base="https://api.polygon.io"):
         self.key = api_key
         self.base = base
-        self.s = requests.Session()
-        self.s.headers.update({"Authorization": f"Bearer {self.key}"})
+        self.s = session()  # shared keep-alive pool; retries/backoff live in the adapter
+        self.headers = {"Authorization": f"Bearer {self.key}"}
 
-    def _get(self, path, params=None, retries=3, backoff=1.0):
-        url = f"{self.base}{path}"
-        for i in range(retries):
-            r = self.s.get(url, params=params, timeout=20)
-            if r.ok:
-                return r.json()
-            time.sleep(backoff * (2**i))
+    def _get(self, path, params=None):
+        r = self.s.get(f"{self.base}{path}", params=params, headers=self.headers, timeout=20)
         r.raise_for_status()
+        return r.json()
 
     def aggregates_day(self, ticker, limit=60):
-        # last 60 daily bars (enough for EMA/ATR/RS)
-        return self._get(f"/v2/aggs/ticker/{ticker}/range/1/day/1970-01-01/2100-01-01",
-                         params={"limit": limit, "adjusted": "true"})["results"]
+        # last `limit` daily bars (enough for EMA/ATR/RS), served from the shared aggregates cache
+        start = pd.Timestamp.now("UTC") - pd.Timedelta(days=int(limit * 1.5) + 10)
+        return as_results(get_aggs(ticker, 1, "day", start, api_key=self.key).tail(limit))
 
     def avg_volume_30d(self, ticker):
         bars = self.aggregates_day(ticker, 35)
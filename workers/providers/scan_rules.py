@@ -1,17 +1,13 @@
 import numpy as np
 import pandas as pd
 
+import indicator_kernels as ik
+
 def ema(series, n):  # simple, stable EMA
-    return series.ewm(span=n, adjust=False).mean()
+    return ik.ema(series, n)
 
 def atr(df, n=14):
-    h, l, c = df["high"], df["low"], df["close"]
-    tr = pd.concat([
-        (h - l),
-        (h - c.shift(1)).abs(),
-        (l - c.shift(1)).abs()
-    ], axis=1).max(axis=1)
-    return tr.rolling(n).mean()
+    return ik.atr(df["high"], df["low"], df["close"], n)
 
 def rs_against(df_stock, df_bench, lookback=20):
     # ratio of cumulative returns over lookback
@@ -1,4 +1,6 @@
-import requests, time
+import time
+
+from data.http_client import http_get
 
 class SectorResolver:
     def __init__(self):
@@ -10,7 +12,7 @@ class SectorResolver:
             return self._cache[t]
         try:
             # Unofficial JSON: fast & small; acceptable for CI usage
-            r = requests.get(f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{t}?modules=assetProfile", timeout=10)
+            r = http_get(f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{t}?modules=assetProfile", timeout=10)
             if r.ok:
                 j = r.json()
                 sector = j["quoteSummary"]["result"][0]["assetProfile"].get("sector")
@@ -1,7 +1,11 @@
+import sys
 from pathlib import Path
 import pandas as pd, numpy as np
 import yfinance as yf
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))  # entry point: src/ packages first
+from data.panel import Panel
+
 OUT = Path("data/snapshots"); OUT.mkdir(parents=True, exist_ok=True)
 
 REGIONS = {
@@ -28,13 +32,6 @@ REGIONS = {
     },
 }
 
-def sma(s, n): return s.rolling(n).mean()
-def slope(s): return float(s.iloc[-1] - s.iloc[-5]) / 5.0 if len(s) >= 5 else 0.0
-def atr_pct(df, n=14):
-    hl=(df["High"]-df["Low"]).abs(); hc=(df["High"]-df["Close"].shift(1)).abs(); lc=(df["Low"]-df["Close"].shift(1)).abs()
-    tr=pd.concat([hl,hc,lc],axis=1).max(axis=1); atr=tr.rolling(n).mean()
-    return float((atr.iloc[-1]/df["Close"].iloc[-1])*100)
-
 def decision_rule(row):
     above50, above200 = bool(row.get("above_50d")), bool(row.get("above_200d"))
     slope50, rs, atrp, room = row.get("sma50_slope",0.0), row.get("rs",0.0), row.get("atr_pct",0.0), row.get("room_atr",1.2)
@@ -52,32 +49,44 @@ def safe_download(sym, **kw):
     except Exception:
         return None
 
+def _series(daily, sym):
+    if isinstance(daily.columns, pd.MultiIndex):
+        return daily[sym] if sym in daily.columns.levels[0] else None
+    return safe_download(sym, period="1y", interval="1d")
+
 def build_region(key):
     r = REGIONS[key]
     bench = r["bench"]; proxy = r["proxy"]
     syms = list(set(r["indices"]+[bench]+list(proxy.values())+r["fxcmd"]))
     daily = yf.download(syms, period="1y", interval="1d", group_by="ticker", progress=False, threads=False)
 
+    # one panel (dates x symbols) for the indices and the benchmark; indicators run across all columns
+    frames = {}
+    for sym in r["indices"] + [bench]:
+        src = sym if (isinstance(daily.columns, pd.MultiIndex) and sym in daily.columns.levels[0]) else proxy.get(sym, sym)
+        frames[sym] = _series(daily, src)
+    panel = Panel.from_frames(frames)
+    sma50 = panel.sma(50)
+    slope50 = np.full_like(sma50, np.nan); slope50[4:] = (sma50[4:] - sma50[:-4]) / 5.0
+    panel.put("sma50_slope", slope50)
+    panel.put("atr_pct", panel.atr(14) / panel["close"] * 100)
+    snap = panel.by_date(names=["close", "sma50", "sma200", "sma50_slope", "roc1", "roc4", "roc20", "atr_pct"])
+    bars = pd.Series(panel.valid.sum(axis=0), index=panel.symbols)
+    num = lambda v: 0.0 if v != v else float(v)
+    br = num(snap.at[bench, "roc4"]) if bench in snap.index else 0.0
+
     rows=[]
     for sym in r["indices"]:
-        src = sym if (isinstance(daily.columns, pd.MultiIndex) and sym in daily.columns.levels[0]) else proxy.get(sym, sym)
-        d = daily[src] if isinstance(daily.columns, pd.MultiIndex) else safe_download(src, period="1y", interval="1d")
-        if d is None or d.empty: continue
-        close=float(d["Close"].iloc[-1])
-        chg1d=float((d["Close"].iloc[-1]/d["Close"].iloc[-2]-1)*100) if len(d)>=2 else 0.0
-        chg1w=float((d["Close"].iloc[-1]/d["Close"].iloc[-5]-1)*100) if len(d)>=5 else 0.0
-        chg1m=float((d["Close"].iloc[-1]/d["Close"].iloc[-21]-1)*100) if len(d)>=21 else 0.0
-        sma50=float(sma(d["Close"],50).iloc[-1]); above50=close>sma50
-        sma200=float(sma(d["Close"],200).iloc[-1]) if len(d)>=200 else float("nan"); above200=close>sma200 if sma200==sma200 else False
-        slope50=float(slope(sma(d["Close"],50)))
-        b = daily[bench] if isinstance(daily.columns, pd.MultiIndex) and bench in daily.columns.levels[0] else safe_download(bench, period="1y", interval="1d")
-        br=float((b["Close"].iloc[-1]/b["Close"].iloc[-5]-1)*100) if b is not None and not b.empty and len(b)>=5 else 0.0
-        rs=chg1w-br
-        atrp=atr_pct(d) if len(d)>=20 else None
+        if sym not in snap.index: continue
+        s = snap.loc[sym]
+        close=float(s["close"])
+        above50 = bool(close > s["sma50"]); above200 = bool(close > s["sma200"])
+        rs = num(s["roc4"]) - br
+        atrp = float(s["atr_pct"]) if bars[sym] >= 20 else None
         room=room_to_levels(close, atr=(atrp/100.0*close if atrp else None))
-        rows.append({"symbol": proxy.get(sym, sym), "price": round(close,2), "chg_1d": round(chg1d,2),
-                     "chg_1w": round(chg1w,2), "chg_1m": round(chg1m,2), "ytd": "",
-                     "above_50d": above50, "above_200d": above200, "sma50_slope": round(slope50,4),
+        rows.append({"symbol": proxy.get(sym, sym), "price": round(close,2), "chg_1d": round(num(s["roc1"]),2),
+                     "chg_1w": round(num(s["roc4"]),2), "chg_1m": round(num(s["roc20"]),2), "ytd": "",
+                     "above_50d": above50, "above_200d": above200, "sma50_slope": round(num(s["sma50_slope"]),4),
                      "atr_pct": round(atrp,2) if atrp is not None else "", "rs": round(rs,2),
                      "breadth_50":"", "breadth_200":"", "room_atr": round(room,2), "mom_flag":"", "earnings_window":"", "contras":""})
     df=pd.DataFrame(rows)